@@ -8,25 +8,62 @@ Uso:
 
 Endpoints:
     GET /api/pesquisa?consulta={termo}&pagina=1&por_pagina=20
+    GET /api/pesquisa?consulta={termo}&modo=fuzzy
     GET /api/pesquisa/avancada?campo={coluna}&consulta={termo}&pagina=1&por_pagina=20
+    GET /api/pesquisa/avancada?filtro=UF:igual:SP&filtro=Cidade:contem:campinas
+    GET /api/pesquisa/exportar?consulta={termo}&campo={coluna}&formato=ndjson|csv
+    POST /api/pesquisa/lote
+    GET /api/facetas?consulta={termo}&facetas=UF,Modalidade
+    GET /api/autocompletar?prefixo={texto}&limite=10
+    GET /api/operadoras/{registro_ans}
+    GET /api/operadoras/cnpj/{cnpj}
     GET /api/campos
+    GET /api/estatisticas
+    GET /metrics
+    POST /api/admin/recarregar
     GET /teste
 
 Autor: Dave
 Data: Janeiro/2026
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, has_request_context, request, jsonify, send_from_directory
+from werkzeug.security import safe_join
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+import codecs
+import csv
+import io
+import json
 import os
 import logging
-import sys
-
-# Configuração de logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout
+import mimetypes
+import gc
+import hmac
+import itertools
+import threading
+import time
+import zlib
+
+from busca import BACKENDS
+from busca_sqlite import BuscaSqlite
+from cache import CacheConsultas
+from cache_http import comprimir_resposta, escolher_codificacao, gerar_etag
+from cursor import CursorInvalido, identificar_consulta, paginar_por_cursor
+from dados import ConjuntoDados, MonitorArquivo, assinatura_arquivo, hash_arquivo
+from filtros import Filtro, FiltroInvalido, buscar_filtros, identificar_filtros, ler_filtro
+import logs
+import metricas
+from normalizacao import normalizar, normalizar_cnpj
+from serializacao import codificar
+from snapshot import carregar_snapshot, salvar_snapshot
+
+# Configuração de logging (em produção: LOG_NIVEL=INFO, LOG_ASSINCRONO=1; ver logs.py)
+logs.configurar_logging(
+    nivel=os.environ.get('LOG_NIVEL', 'DEBUG'),
+    amostragem=float(os.environ.get('LOG_AMOSTRAGEM', 1)),
+    assincrono=os.environ.get('LOG_ASSINCRONO', '0') == '1'
 )
 logger = logging.getLogger(__name__)
 
@@ -39,7 +76,92 @@ app = Flask(__name__,
 # Cache do DataFrame (Performance)
 # =============================================================================
 
-_df_cache = None
+ARQUIVO_CSV = os.environ.get('ARQUIVO_CSV', 'dados_cadastrais_op.csv')
+
+# Intervalo (segundos) entre verificações de mudança no CSV; 0 desabilita
+RECARGA_INTERVALO = float(os.environ.get('RECARGA_INTERVALO', 30))
+
+# Grava/usa o snapshot binário ao lado do CSV (ver snapshot.py)
+USAR_SNAPSHOT = os.environ.get('USAR_SNAPSHOT', '1') == '1'
+
+# Mapeia os arrays do snapshot em memória: as páginas do arquivo são
+# compartilhadas por todos os workers em vez de copiadas para cada um
+SNAPSHOT_MMAP = os.environ.get('SNAPSHOT_MMAP', '0') == '1'
+
+# Backend da busca por substring: memoria (IndiceNgramas) ou sqlite (FTS5 em
+# arquivo ao lado do CSV, compartilhado pelos workers); ver busca.py
+BACKEND_BUSCA = os.environ.get('BACKEND_BUSCA', 'memoria')
+if BACKEND_BUSCA not in BACKENDS:
+    raise ValueError(f"BACKEND_BUSCA inválido: {BACKEND_BUSCA} (use {', '.join(BACKENDS)})")
+
+# Colunas com até esta fração de valores distintos viram categóricas
+LIMITE_CATEGORICA = 0.5
+
+# Bytes do início do CSV usados para detectar o encoding
+AMOSTRA_ENCODING = 1024 * 1024
+
+# Linhas lidas e limpas por vez ao carregar o CSV
+TAMANHO_LOTE_CSV = 100000
+
+# Encoding usado quando a amostra não é UTF-8 válido (e para bytes inválidos
+# que apareçam depois da amostra num arquivo UTF-8)
+ENCODING_ALTERNATIVO = 'latin1'
+
+# Colunas usadas por /api/facetas quando o parâmetro facetas não é informado
+FACETAS_PADRAO = ['UF', 'Modalidade', 'Regiao_de_Comercializacao']
+
+# Valores do parâmetro ordenar: ordem do arquivo (default) ou relevância
+ORDENACOES = ('arquivo', 'relevancia')
+
+# Máximo de sugestões do autocompletar por requisição
+MAX_SUGESTOES = 50
+
+# Limites de POST /api/pesquisa/lote: itens por requisição e resultados por item
+MAX_ITENS_LOTE = 1000
+MAX_POR_PAGINA_LOTE = 20
+
+# Linhas convertidas por vez na exportação em streaming
+TAMANHO_BLOCO_EXPORTACAO = 1000
+
+# Respostas JSON menores que isso (bytes) não são comprimidas
+COMPRESSAO_MINIMA = int(os.environ.get('COMPRESSAO_MINIMA', 1024))
+
+# Respostas que dependem só dos dados e da URL: revalidadas por ETag
+ROTAS_COM_ETAG = {
+    'pesquisar', 'pesquisa_avancada', 'obter_facetas', 'autocompletar',
+    'obter_operadora', 'obter_operadora_por_cnpj', 'obter_campos'
+}
+CACHE_CONTROL_API = 'public, max-age=0, must-revalidate'
+
+# js/css do build do Vue têm hash no nome: podem ficar em cache para sempre
+CACHE_CONTROL_ESTATICOS = 'public, max-age=31536000, immutable'
+
+# Versões pré-comprimidas dos estáticos gravadas por estaticos.py
+EXTENSOES_COMPRIMIDAS = {'br': '.br', 'gzip': '.gz'}
+
+# Token exigido por POST /api/admin/recarregar; vazio desabilita o endpoint
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Snapshot atual e o substituído na última troca (requisições em andamento).
+# A leitura nunca usa lock: basta pegar a referência uma vez por requisição.
+_dados = None
+_dados_anterior = None
+
+# Snapshot de um DataFrame que não veio do CSV (ex: testes)
+_dados_avulsos = None
+_contador_avulsos = itertools.count(1)
+
+# Serializa cargas e recargas (nunca usado no caminho de leitura)
+_lock_carga = threading.Lock()
+_monitor = None
+_recargas = 0
+
+# Cache LRU de resultados: (versão, campo, consulta normalizada) -> posições das linhas
+_cache_consultas = CacheConsultas(
+    max_entradas=int(os.environ.get('CACHE_MAX_ENTRADAS', 1024)),
+    max_bytes=int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    observador=metricas.registrar_consulta_cache
+)
 
 
 def limpar_valor(valor):
@@ -54,6 +176,292 @@ def limpar_valor(valor):
     return str(valor)
 
 
+def compactar_colunas(df, limite=None):
+    """
+    Converte colunas de baixa cardinalidade (Modalidade, UF, Cidade...) para
+    o dtype category: cada valor distinto é guardado uma vez e as linhas
+    guardam só um código inteiro.
+
+    Args:
+        df: DataFrame já limpo (valores str)
+        limite: Fração máxima de valores distintos por linha (padrão: LIMITE_CATEGORICA)
+
+    Returns:
+        O mesmo DataFrame, com as colunas convertidas
+    """
+    limite = LIMITE_CATEGORICA if limite is None else limite
+    for col in df.columns:
+        if df[col].nunique() <= limite * len(df):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _decodificar_alternativo(erro):
+    """Decodifica com o ENCODING_ALTERNATIVO os bytes que não são UTF-8 válido"""
+    return erro.object[erro.start:erro.end].decode(ENCODING_ALTERNATIVO), erro.end
+
+
+# Tratamento de erro de decodificação passado ao pandas (encoding_errors)
+ERROS_ENCODING = 'intuitivex_alternativo'
+codecs.register_error(ERROS_ENCODING, _decodificar_alternativo)
+
+
+def detectar_encoding(caminho, tamanho=None):
+    """
+    Detecta o encoding do CSV por uma amostra do início do arquivo.
+
+    Args:
+        caminho: Caminho do arquivo CSV
+        tamanho: Bytes lidos (padrão: AMOSTRA_ENCODING)
+
+    Returns:
+        'utf-8' se a amostra é UTF-8 válido, senão ENCODING_ALTERNATIVO
+    """
+    tamanho = AMOSTRA_ENCODING if tamanho is None else tamanho
+    with open(caminho, 'rb') as arquivo:
+        amostra = arquivo.read(tamanho)
+
+    # A amostra pode terminar no meio de um caractere multibyte
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decodificador.decode(amostra, final=len(amostra) < tamanho)
+    except UnicodeDecodeError:
+        return ENCODING_ALTERNATIVO
+    return 'utf-8'
+
+
+def limpar_coluna(serie):
+    """
+    Versão vetorizada de limpar_valor para uma coluna inteira.
+
+    Args:
+        serie: Coluna como lida pelo pandas (object, int, float ou bool)
+
+    Returns:
+        Series de str com o mesmo índice
+    """
+    if serie.dtype == object:
+        # read_csv só produz str e NaN em colunas object
+        return serie.fillna('')
+
+    if serie.dtype.kind != 'f':
+        return serie.astype(str)
+
+    valores = serie.to_numpy()
+    nulos = np.isnan(valores)
+    inteiros = ~nulos & (np.floor(valores) == valores)
+    texto = valores.astype(str).astype(object)
+    texto[nulos] = ''
+
+    # Inteiros fora do int64 (raros) passam por limpar_valor
+    cabem = inteiros & (np.abs(valores) < 2 ** 63)
+    texto[cabem] = valores[cabem].astype(np.int64).astype(str)
+    grandes = inteiros & ~cabem & np.isfinite(valores)
+    texto[grandes] = [limpar_valor(valor) for valor in valores[grandes]]
+    return pd.Series(texto, index=serie.index)
+
+
+# Textos que o read_csv interpreta como booleanos
+BOOLEANOS = {'True': 'True', 'TRUE': 'True', 'true': 'True',
+             'False': 'False', 'FALSE': 'False', 'false': 'False'}
+
+
+def _limpar_valores_distintos(valores):
+    """
+    Aplica aos valores distintos (texto) de uma coluna a mesma conversão do
+    read_csv sem lotes + limpar_valor: uma coluna só de números vira número
+    e depois texto limpo ("712.0" -> "712"), uma só de booleanos vira
+    "True"/"False"; nas demais o texto fica como está.
+
+    Args:
+        valores: Array de str com os valores distintos ('' = vazio)
+
+    Returns:
+        Array de str com o valor limpo de cada posição
+    """
+    vazios = valores == ''
+    preenchidos = pd.Series(valores[~vazios])
+
+    if len(preenchidos) and not vazios.any() and preenchidos.isin(BOOLEANOS.keys()).all():
+        return np.array([BOOLEANOS[valor] for valor in valores], dtype=object)
+
+    try:
+        numeros = pd.to_numeric(preenchidos)
+    except (ValueError, TypeError):
+        return valores
+
+    # Com valores vazios o read_csv lê a coluna como float
+    if vazios.any():
+        numeros = numeros.astype(float)
+    limpos = np.full(len(valores), '', dtype=object)
+    limpos[~vazios] = limpar_coluna(numeros).to_numpy()
+    return limpos
+
+
+def _juntar_lotes(partes, total):
+    """
+    Junta as partes categóricas (texto cru) de uma coluna lida em lotes.
+
+    Args:
+        partes: Series categóricas da coluna, uma por lote
+        total: Total de linhas do arquivo
+
+    Returns:
+        Series categórica ou de str, pelo mesmo critério de compactar_colunas
+    """
+    coluna = union_categoricals(partes)
+
+    # A limpeza é feita uma vez por valor distinto, não por linha
+    limpos = _limpar_valores_distintos(np.asarray(coluna.categories, dtype=object))
+    novos_codigos, categorias = pd.factorize(limpos, sort=True)
+    coluna = pd.Categorical.from_codes(novos_codigos[coluna.codes], categories=categorias)
+
+    if len(categorias) <= LIMITE_CATEGORICA * total:
+        return pd.Series(coluna)
+    return pd.Series(np.asarray(coluna, dtype=object))
+
+
+def ler_csv(caminho, tamanho_lote=None):
+    """
+    Lê o arquivo CSV com tratamento de encoding e limpa os valores.
+
+    O encoding é detectado uma vez, pela amostra do início do arquivo; num
+    arquivo UTF-8, bytes inválidos que apareçam depois são decodificados
+    com o ENCODING_ALTERNATIVO em vez de recomeçar a leitura. O CSV é lido
+    em lotes e cada lote é limpo e guardado como categórico (cada valor
+    distinto uma vez), então o pico de memória fica perto do tamanho final
+    dos dados.
+
+    Args:
+        caminho: Caminho do arquivo CSV
+        tamanho_lote: Linhas por lote (padrão: TAMANHO_LOTE_CSV)
+
+    Returns:
+        DataFrame com os dados das operadoras
+    """
+    encoding = detectar_encoding(caminho)
+    logger.info(f"CSV com encoding {encoding}")
+
+    # Lido como texto: o tipo de cada coluna é decidido com o arquivo todo
+    # (em _juntar_lotes), não por lote
+    leitor = pd.read_csv(
+        caminho,
+        encoding=encoding,
+        encoding_errors=ERROS_ENCODING,
+        delimiter=';',
+        quotechar='"',
+        dtype=str,
+        chunksize=tamanho_lote or TAMANHO_LOTE_CSV
+    )
+
+    partes = {}
+    total = 0
+    with leitor:
+        for lote in leitor:
+            for col in lote.columns:
+                partes.setdefault(col, []).append(lote[col].fillna('').astype('category'))
+            total += len(lote)
+
+    df = pd.DataFrame({col: _juntar_lotes(lotes, total) for col, lotes in partes.items()})
+
+    logger.info(f"Colunas: {df.columns.tolist()}")
+    logger.info(f"Total de linhas: {len(df)}")
+    return df
+
+
+def listas_em_memoria():
+    """O índice em memória só guarda as listas de n-gramas quando é o backend de busca"""
+    return BACKEND_BUSCA == 'memoria'
+
+
+def aplicar_backend(dados, caminho=None):
+    """
+    Troca o backend de busca do snapshot conforme BACKEND_BUSCA.
+
+    Args:
+        dados: ConjuntoDados recém-construído
+        caminho: CSV de origem (o banco SQLite fica ao lado dele); sem ele o
+            banco SQLite é criado em memória
+
+    Returns:
+        O mesmo ConjuntoDados
+    """
+    if BACKEND_BUSCA == 'sqlite':
+        dados.busca = BuscaSqlite.abrir(dados.df, versao=dados.versao, caminho_csv=caminho)
+    return dados
+
+
+def construir_dados(caminho, versao=None, usar_snapshot=None):
+    """
+    Constrói um snapshot com os índices derivados do CSV.
+
+    Usa o snapshot binário gravado ao lado do CSV quando ele corresponde ao
+    conteúdo atual do arquivo; caso contrário lê o CSV e grava um novo.
+
+    Args:
+        caminho: Caminho do arquivo CSV
+        versao: Hash do arquivo, se já calculado
+        usar_snapshot: Lê/grava o snapshot binário (padrão: USAR_SNAPSHOT)
+
+    Returns:
+        ConjuntoDados pronto para ser publicado
+    """
+    usar_snapshot = USAR_SNAPSHOT if usar_snapshot is None else usar_snapshot
+
+    if usar_snapshot:
+        try:
+            dados = carregar_snapshot(caminho, versao=versao, mmap=SNAPSHOT_MMAP,
+                                      listas=listas_em_memoria())
+        except Exception as e:
+            logger.warning(f"Snapshot inválido, usando o CSV: {str(e)}")
+            dados = None
+        if dados is not None:
+            logger.info(f"Snapshot {dados.versao} carregado em {dados.duracao_carga * 1000:.1f}ms")
+            return aplicar_backend(dados, caminho)
+
+    inicio = time.perf_counter()
+    assinatura = assinatura_arquivo(caminho)
+    versao = versao or hash_arquivo(caminho)
+    df = ler_csv(caminho)
+    dados = ConjuntoDados(df, versao, assinatura=assinatura, inicio=inicio,
+                          listas=listas_em_memoria())
+
+    if usar_snapshot:
+        try:
+            salvar_snapshot(dados, caminho)
+            if SNAPSHOT_MMAP:
+                # Troca os arrays privados pelos mapeados do arquivo recém-gravado
+                dados = carregar_snapshot(caminho, versao=versao, mmap=True,
+                                          listas=listas_em_memoria()) or dados
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o snapshot: {str(e)}")
+    return aplicar_backend(dados, caminho)
+
+
+def _publicar(dados):
+    """Troca o snapshot atual pelo novo (atribuição atômica) e limpa o cache"""
+    global _dados, _dados_anterior
+
+    _dados_anterior = _dados
+    _dados = dados
+    _cache_consultas.limpar()
+    metricas.registrar_carga(dados)
+
+
+def _iniciar_monitor():
+    """Inicia a thread que recarrega o CSV quando o arquivo muda"""
+    global _monitor
+
+    if _monitor is None and RECARGA_INTERVALO > 0:
+        _monitor = MonitorArquivo(
+            ARQUIVO_CSV,
+            obter_assinatura_atual=lambda: _dados.assinatura if _dados else None,
+            ao_mudar=recarregar_dados,
+            intervalo=RECARGA_INTERVALO
+        )
+        _monitor.start()
+
+
 def carregar_csv():
     """
     Carrega o arquivo CSV com tratamento de encoding.
@@ -62,60 +470,495 @@ def carregar_csv():
     Returns:
         DataFrame com os dados das operadoras
     """
-    global _df_cache
+    with metricas.fase('carga'):
+        # Retorna cache se já carregado
+        dados = _dados
+        if dados is not None:
+            logger.debug("Usando DataFrame do cache")
+            return dados.df
+
+        with _lock_carga:
+            if _dados is None:
+                try:
+                    logger.info("Carregando arquivo CSV (primeira vez)...")
+                    _publicar(construir_dados(ARQUIVO_CSV))
+                    logger.info(f"Dados carregados: versão {_dados.versao} "
+                                f"em {_dados.duracao_carga:.2f}s")
+                except Exception as e:
+                    logger.error(f"Erro ao carregar CSV: {str(e)}")
+                    raise
+                _iniciar_monitor()
+
+        return _dados.df
+
+
+def preparar_compartilhamento():
+    """
+    Carrega os dados no processo master do gunicorn (preload_app) antes do fork.
 
-    # Retorna cache se já carregado
-    if _df_cache is not None:
-        logger.debug("Usando DataFrame do cache")
-        return _df_cache
+    Os workers herdam o snapshot por copy-on-write. A thread do monitor não
+    sobrevive ao fork, então é parada aqui e reiniciada em apos_fork(), e
+    gc.freeze() evita que o coletor de lixo dos workers toque (e copie) as
+    páginas dos objetos herdados.
+    """
+    global _monitor
 
-    try:
-        logger.info("Carregando arquivo CSV (primeira vez)...")
-
-        # Tenta diferentes encodings
-        encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-        df = None
-
-        for encoding in encodings:
-            try:
-                logger.debug(f"Tentando encoding {encoding}...")
-                df = pd.read_csv(
-                    'dados_cadastrais_op.csv',
-                    encoding=encoding,
-                    delimiter=';',
-                    quotechar='"'
-                )
-                logger.info(f"CSV carregado com encoding {encoding}")
-                break
-            except UnicodeDecodeError:
-                logger.debug(f"Falha com encoding {encoding}")
-                continue
-
-        if df is None:
-            raise Exception("Não foi possível carregar o CSV com nenhum encoding")
-
-        # Limpa valores numéricos (remove .0 de inteiros)
-        for col in df.columns:
-            df[col] = df[col].apply(limpar_valor)
-
-        logger.info(f"Colunas: {df.columns.tolist()}")
-        logger.info(f"Total de linhas: {len(df)}")
-
-        # Armazena no cache
-        _df_cache = df
-        return df
+    carregar_csv()
+    if _monitor is not None:
+        _monitor.parar()
+        _monitor = None
+    gc.freeze()
 
-    except Exception as e:
-        logger.error(f"Erro ao carregar CSV: {str(e)}")
-        raise
+
+def apos_fork():
+    """
+    Prepara um worker recém-criado pelo gunicorn.
+
+    Carrega os dados se o master não os pré-carregou (assim a primeira
+    requisição não paga a carga) e inicia o monitor de recarga do worker.
+    """
+    global _monitor
+
+    logs.apos_fork()
+    _monitor = None
+    carregar_csv()
+    _iniciar_monitor()
+
+
+def recarregar_dados(forcar=False):
+    """
+    Reconstrói o snapshot em segundo plano e o troca atomicamente.
+
+    Requisições em andamento continuam com o snapshot antigo. Arquivos só
+    "tocados" (mesmo hash) não são reprocessados.
+
+    Args:
+        forcar: Recarrega mesmo que a assinatura (mtime, tamanho) não tenha mudado
+
+    Returns:
+        True se um novo snapshot foi publicado
+    """
+    global _recargas
+
+    with _lock_carga:
+        atual = _dados
+        assinatura = assinatura_arquivo(ARQUIVO_CSV)
+        if atual is not None and not forcar and assinatura == atual.assinatura:
+            return False
+
+        versao = hash_arquivo(ARQUIVO_CSV)
+        if atual is not None and versao == atual.versao:
+            # Conteúdo igual: só atualiza a assinatura para parar de reverificar
+            atual.assinatura = assinatura
+            return False
+
+        novo = construir_dados(ARQUIVO_CSV, versao=versao)
+        _publicar(novo)
+        _recargas += 1
+        logger.info(f"Dados recarregados: versão {novo.versao} em {novo.duracao_carga:.2f}s")
+        return True
+
+
+def obter_dados(df):
+    """
+    Retorna o snapshot (DataFrame + índices) correspondente ao DataFrame.
+
+    O snapshot do CSV é construído em carregar_csv(); qualquer outro DataFrame
+    (ex: dados de teste) tem o snapshot construído aqui e guardado até a troca.
+    Dentro de uma requisição, a versão do snapshot fica em g.versao_dados
+    para o ETag da resposta.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+
+    Returns:
+        ConjuntoDados do DataFrame
+    """
+    global _dados_avulsos
+
+    for dados in (_dados, _dados_anterior, _dados_avulsos):
+        if dados is not None and dados.df is df:
+            break
+    else:
+        dados = _dados_avulsos = aplicar_backend(
+            ConjuntoDados(df, versao=f'mem-{next(_contador_avulsos)}', listas=listas_em_memoria())
+        )
+
+    if has_request_context():
+        g.versao_dados = dados.versao
+    return dados
+
+
+def buscar_linhas(df, consulta, campo=None):
+    """
+    Busca as posições das linhas que contêm a consulta, usando o cache LRU.
+
+    A chave é normalizada (sem acentos, em minúsculas), igual à comparação
+    do índice, então "unimed" e "UNIMED" compartilham a mesma entrada. Requisições
+    simultâneas da mesma chave esperam uma única busca.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        consulta: Termo de busca
+        campo: Coluna para restringir a busca (opcional)
+
+    Returns:
+        Array ordenado (somente leitura) com as posições das linhas
+    """
+    dados = obter_dados(df)
+    chave = (dados.versao, 'busca', campo, normalizar(consulta))
+
+    with metricas.fase('busca'):
+        return _cache_consultas.obter_ou_calcular(
+            chave, lambda: dados.busca.buscar(consulta, coluna=campo)
+        )
+
+
+def buscar_linhas_filtros(df, filtros):
+    """
+    Busca as linhas que satisfazem todos os filtros, usando o cache LRU.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        filtros: Lista de Filtro
+
+    Returns:
+        Array ordenado (somente leitura) com as posições das linhas
+    """
+    dados = obter_dados(df)
+    chave = (dados.versao, 'filtros', identificar_filtros(filtros))
+
+    with metricas.fase('busca'):
+        return _cache_consultas.obter_ou_calcular(
+            chave, lambda: buscar_filtros(dados.indice, filtros, dados.busca)
+        )
+
+
+def ordenar_relevancia(df, linhas, consulta, campo=None, filtros=None):
+    """
+    Chaves de relevância das linhas encontradas, usando o cache LRU.
+
+    Guarda só as chaves (uma por linha, sem ordenar); cada página é
+    selecionada delas por IndiceRelevancia.pagina(). Os filtros entram na
+    chave: as chaves ficam alinhadas com as linhas que eles encontraram.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        linhas: Posições das linhas encontradas para a consulta
+        consulta: Termo de busca
+        campo: Coluna da busca (None para todas)
+        filtros: Lista de Filtro que também restringiu as linhas (opcional)
+
+    Returns:
+        Array int64 de chaves, na ordem de linhas (somente leitura)
+    """
+    dados = obter_dados(df)
+    chave = (dados.versao, 'relevancia', campo, normalizar(consulta),
+             identificar_filtros(filtros) if filtros else None)
+
+    with metricas.fase('busca'):
+        return _cache_consultas.obter_ou_calcular(
+            chave, lambda: dados.relevancia.chaves(linhas, consulta, coluna=campo)
+        )
+
+
+def buscar_fuzzy(df, consulta):
+    """
+    Busca aproximada (acentos e erros de digitação), usando o cache LRU.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        consulta: Termo de busca
+
+    Returns:
+        Array (linha, pontuação) em ordem de relevância (somente leitura)
+    """
+    dados = obter_dados(df)
+    chave = (dados.versao, 'fuzzy', normalizar(consulta))
+
+    with metricas.fase('busca'):
+        return _cache_consultas.obter_ou_calcular(chave, lambda: dados.fuzzy.buscar(consulta))
+
+
+def validar_ordenacao(ordenar, cursor):
+    """
+    Valida o parâmetro ordenar de uma busca.
+
+    Args:
+        ordenar: Valor do parâmetro
+        cursor: Cursor recebido (ou None)
+
+    Returns:
+        Mensagem de erro ou None se a combinação é válida
+    """
+    if ordenar not in ORDENACOES:
+        return f'Ordenação inválida: {ordenar}'
+    if ordenar == 'relevancia' and cursor is not None:
+        # O cursor retoma pela posição da linha, que não é a ordem de relevância
+        return 'Paginação por cursor não é suportada na ordenação por relevância'
+    return None
+
+
+def ler_facetas(valor, dados, padrao=None):
+    """
+    Interpreta o parâmetro facetas (colunas separadas por vírgula).
+
+    Args:
+        valor: Valor do parâmetro (pode ser vazio)
+        dados: ConjuntoDados da requisição
+        padrao: Colunas usadas quando o parâmetro está vazio
+
+    Returns:
+        Tupla (lista de colunas, mensagem de erro ou None)
+    """
+    nomes = [nome.strip() for nome in valor.split(',') if nome.strip()]
+    if not nomes:
+        return [col for col in (padrao or []) if col in dados.facetas.colunas], None
+
+    invalidas = [nome for nome in nomes if nome not in dados.facetas.colunas]
+    if invalidas:
+        return [], f'Facetas indisponíveis: {", ".join(invalidas)}'
+    return nomes, None
+
+
+def calcular_facetas(dados, nomes, linhas=None, limite=None):
+    """
+    Conta as linhas encontradas por valor de cada coluna pedida.
+
+    Args:
+        dados: ConjuntoDados da requisição
+        nomes: Colunas facetáveis
+        linhas: Posições das linhas encontradas (None = todas)
+        limite: Quantidade máxima de valores por coluna
+
+    Returns:
+        Dict coluna -> lista de {'valor', 'contagem'}
+    """
+    return {nome: dados.facetas.contar(nome, linhas, limite) for nome in nomes}
+
+
+def gerar_exportacao(df, linhas, formato):
+    """
+    Gera o conteúdo da exportação bloco a bloco.
+
+    Só um bloco de TAMANHO_BLOCO_EXPORTACAO linhas é convertido por vez,
+    então a memória não cresce com a quantidade de resultados.
+
+    Args:
+        df: DataFrame do snapshot da requisição
+        linhas: Posições das linhas encontradas
+        formato: 'ndjson' ou 'csv'
+
+    Yields:
+        Trechos de texto (um bloco de linhas por vez)
+    """
+    if formato == 'csv':
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, delimiter=';', lineterminator='\n')
+        escritor.writerow(df.columns)
+        yield buffer.getvalue()
+
+    for inicio in range(0, len(linhas), TAMANHO_BLOCO_EXPORTACAO):
+        bloco = materializar(df, linhas[inicio:inicio + TAMANHO_BLOCO_EXPORTACAO])
+        if formato == 'csv':
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows(registro.values() for registro in bloco)
+            yield buffer.getvalue()
+        else:
+            yield ''.join(json.dumps(registro, ensure_ascii=False) + '\n' for registro in bloco)
+
+
+def comprimir_gzip(trechos):
+    """
+    Comprime um gerador de texto em gzip sem acumular o conteúdo.
+
+    Cada trecho é liberado com Z_SYNC_FLUSH, para o cliente receber os
+    primeiros bytes sem esperar o fim da exportação.
+
+    Args:
+        trechos: Iterável de strings
+
+    Yields:
+        Bytes comprimidos
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for trecho in trechos:
+        dados = compressor.compress(trecho.encode('utf-8'))
+        dados += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def materializar(df, posicoes):
+    """
+    Converte apenas as linhas informadas em dicionários.
+
+    Args:
+        df: DataFrame com os dados das operadoras
+        posicoes: Posições (iloc) das linhas a converter
+
+    Returns:
+        Lista de dicionários, um por linha
+    """
+    with metricas.fase('materializacao'):
+        return df.iloc[posicoes].to_dict(orient='records')
+
+
+def serializar_linhas(df, posicoes):
+    """
+    Retorna o JSON pronto (Fragmento) de cada linha, para as respostas da API.
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        posicoes: Posições (iloc) das linhas
+
+    Returns:
+        Lista de Fragmentos, um por linha
+    """
+    with metricas.fase('materializacao'):
+        return obter_dados(df).json_linhas.fragmentos(posicoes)
+
+
+def responder_json(conteudo, status=200):
+    """
+    Resposta JSON montada por concatenação dos fragmentos das linhas.
+
+    Args:
+        conteudo: Dict ou lista, possivelmente com Fragmentos
+        status: Status HTTP
+
+    Returns:
+        Response com Content-Type application/json
+    """
+    with metricas.fase('serializacao'):
+        corpo = codificar(conteudo)
+    return Response(corpo, status=status, mimetype='application/json')
+
+
+def pesquisar_lote(df, itens, por_pagina):
+    """
+    Avalia vários pares (campo, consulta) contra o mesmo snapshot.
+
+    Itens repetidos (mesmo campo e consulta normalizada) são buscados uma
+    vez, e as primeiras páginas de todos os itens são convertidas em dict
+    numa única chamada a serializar_linhas().
+
+    Args:
+        df: DataFrame retornado por carregar_csv()
+        itens: Lista de dicts com consulta (obrigatória) e campo (opcional)
+        por_pagina: Resultados por item
+
+    Returns:
+        Lista de dicts (campo, consulta, contagem, resultados) na ordem dos
+        itens; itens inválidos trazem 'erro' no lugar da contagem
+    """
+    respostas = []
+    buscas = {}
+    for item in itens:
+        campo = item.get('campo') if isinstance(item, dict) else None
+        consulta = item.get('consulta') if isinstance(item, dict) else None
+        resposta = {'campo': campo, 'consulta': consulta}
+        respostas.append(resposta)
+
+        if not normalizar(consulta):
+            # Ausente, não-str ou só espaços
+            resposta['erro'] = 'O campo consulta é obrigatório'
+        elif campo is not None and not isinstance(campo, str):
+            # Lista ou dict não podem nem ser procurados nas colunas (unhashable)
+            resposta['erro'] = 'O campo deve ser o nome de uma coluna'
+        elif campo is not None and campo not in df.columns:
+            resposta['erro'] = f'Campo {campo} não encontrado'
+        else:
+            chave = (campo, normalizar(consulta))
+            if chave not in buscas:
+                buscas[chave] = buscar_linhas(df, consulta, campo=campo)
+            resposta['linhas'] = buscas[chave]
+
+    # Primeiras páginas de todos os itens num único df.iloc
+    paginas = [r['linhas'][:por_pagina] for r in respostas if 'linhas' in r]
+    registros = iter(serializar_linhas(df, np.concatenate(paginas)) if paginas else [])
+
+    for resposta in respostas:
+        linhas = resposta.pop('linhas', None)
+        if linhas is not None:
+            resposta['contagem'] = len(linhas)
+            resposta['resultados'] = list(itertools.islice(registros, min(len(linhas), por_pagina)))
+    return respostas
+
+
+def montar_resposta(df, dados, linhas, campo, consulta, facetas, pagina, por_pagina,
+                    cursor=None, relevancia=None, filtros=None):
+    """
+    Monta o JSON de uma busca: página pedida, paginação e facetas.
+
+    Com cursor (mesmo vazio) usa paginação por cursor; sem ele, pagina e
+    por_pagina como sempre. Com as chaves de relevância, a página vem em
+    ordem de relevância (seleção parcial, sem ordenar todas as linhas) e a
+    resposta traz a pontuação de cada resultado.
+
+    Args:
+        df: DataFrame do snapshot da requisição
+        dados: ConjuntoDados da requisição
+        linhas: Posições ordenadas das linhas encontradas
+        campo: Coluna da busca (None para todas)
+        consulta: Termo de busca
+        facetas: Colunas para contagem por valor
+        pagina: Número da página (1-indexed)
+        por_pagina: Quantidade por página
+        cursor: Cursor recebido, '' para a primeira página ou None
+        relevancia: Chaves de ordenar_relevancia() (None = ordem do arquivo)
+        filtros: Lista de Filtro da busca avançada (entra na identificação do cursor)
+
+    Returns:
+        Dict com contagem, paginação, resultados (e facetas, se pedidas)
+
+    Raises:
+        CursorInvalido: Se o cursor recebido não puder ser retomado
+    """
+    metricas.RESULTADOS.labels(request.endpoint).observe(len(linhas))
+
+    pontuacoes = None
+    if relevancia is not None:
+        # Mesma paginação, mas as posições saem das menores chaves de relevância
+        paginacao = paginar(linhas, pagina, por_pagina)['paginacao']
+        inicio = (paginacao['pagina'] - 1) * por_pagina
+        posicoes, pontuacoes = dados.relevancia.pagina(relevancia, inicio, por_pagina)
+    elif cursor is None:
+        # Pagina as posições e converte para dict só a página pedida
+        dados_paginados = paginar(linhas, pagina, por_pagina)
+        posicoes = dados_paginados['resultados']
+        paginacao = dados_paginados['paginacao']
+    else:
+        id_consulta = identificar_consulta(
+            campo, consulta, identificar_filtros(filtros) if filtros else ''
+        )
+        posicoes, proximo = paginar_por_cursor(dados, linhas, cursor, por_pagina, id_consulta)
+        paginacao = {
+            'por_pagina': por_pagina,
+            'total': len(linhas),
+            'proximo_cursor': proximo
+        }
+
+    resposta = {
+        'contagem': len(linhas),
+        'paginacao': paginacao,
+        'resultados': serializar_linhas(df, posicoes)
+    }
+    if pontuacoes is not None:
+        resposta['pontuacoes'] = pontuacoes.tolist()
+    if facetas:
+        resposta['facetas'] = calcular_facetas(dados, facetas, linhas)
+    return resposta
 
 
 def paginar(resultados, pagina, por_pagina):
     """
-    Aplica paginação a uma lista de resultados.
+    Aplica paginação a uma sequência de resultados.
 
     Args:
-        resultados: Lista de dicionários
+        resultados: Lista ou array (ex: posições das linhas encontradas)
         pagina: Número da página (1-indexed)
         por_pagina: Quantidade por página
 
@@ -142,6 +985,141 @@ def paginar(resultados, pagina, por_pagina):
     }
 
 
+# =============================================================================
+# Métricas
+# =============================================================================
+# Registrados antes dos hooks de cache HTTP: o before_request roda mesmo
+# quando o 304 encerra a requisição, e o after_request roda por último,
+# medindo também a compressão.
+
+@app.before_request
+def iniciar_medicao():
+    """Guarda o início da requisição para a latência por rota"""
+    g.inicio_requisicao = time.perf_counter()
+
+
+@app.after_request
+def registrar_latencia(resposta):
+    """Registra a latência da requisição no histograma da rota"""
+    inicio = g.get('inicio_requisicao')
+    if inicio is not None:
+        metricas.REQUISICOES.labels(
+            request.endpoint or 'desconhecida', request.method, resposta.status_code
+        ).observe(time.perf_counter() - inicio)
+    return resposta
+
+
+# =============================================================================
+# Cache HTTP e compressão
+# =============================================================================
+
+def etag_da_requisicao(versao=None):
+    """
+    Retorna o ETag da requisição atual (versão dos dados + URL).
+
+    Args:
+        versao: Versão dos dados usada pela resposta (default: snapshot atual)
+
+    Returns:
+        Valor do ETag, ou None se os dados não puderem ser carregados
+    """
+    if versao is None:
+        try:
+            versao = obter_dados(carregar_csv()).versao
+        except Exception as e:
+            logger.error(f"Erro ao calcular ETag: {str(e)}")
+            return None
+    return gerar_etag(versao, request.path, request.args)
+
+
+@app.before_request
+def responder_nao_modificado():
+    """Responde 304 sem refazer a busca quando o If-None-Match ainda vale"""
+    if request.method != 'GET' or request.endpoint not in ROTAS_COM_ETAG:
+        return None
+    if not request.if_none_match:
+        return None
+
+    etag = etag_da_requisicao()
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        resposta = Response(status=304)
+        resposta.set_etag(etag, weak=True)
+        resposta.headers['Cache-Control'] = CACHE_CONTROL_API
+        resposta.vary.add('Accept-Encoding')
+        return resposta
+    return None
+
+
+@app.after_request
+def aplicar_cache_http(resposta):
+    """Adiciona ETag e Cache-Control às respostas da API e comprime o JSON"""
+    # Versão do snapshot que o handler usou (ver obter_dados), não a atual:
+    # uma recarga no meio da requisição não pode dar o ETag novo ao corpo antigo
+    versao = g.get('versao_dados')
+    if (request.method == 'GET' and request.endpoint in ROTAS_COM_ETAG
+            and resposta.status_code == 200 and versao is not None):
+        etag = etag_da_requisicao(versao)
+        if etag is not None:
+            resposta.set_etag(etag, weak=True)
+            resposta.headers['Cache-Control'] = CACHE_CONTROL_API
+
+    return comprimir_resposta(resposta, request.accept_encodings, COMPRESSAO_MINIMA)
+
+
+def localizar_estatico(subpasta, path, aceitas):
+    """
+    Escolhe o arquivo do build a servir: o original ou a versão .br/.gz
+    gravada por estaticos.py, se existir e o navegador aceitar.
+
+    Args:
+        subpasta: Pasta dentro do build (js, css)
+        path: Caminho do arquivo dentro da subpasta
+        aceitas: Accept-Encoding da requisição (werkzeug Accept)
+
+    Returns:
+        Tupla (pasta, nome do arquivo a enviar, codificação ou None)
+    """
+    pasta = os.path.join(app.static_folder, subpasta)
+
+    disponiveis = []
+    for codificacao, extensao in EXTENSOES_COMPRIMIDAS.items():
+        caminho = safe_join(pasta, path + extensao)
+        if caminho is not None and os.path.isfile(caminho):
+            disponiveis.append(codificacao)
+    codificacao = escolher_codificacao(aceitas, disponiveis)
+
+    if codificacao is None:
+        return pasta, path, None
+    return pasta, path + EXTENSOES_COMPRIMIDAS[codificacao], codificacao
+
+
+def enviar_estatico(subpasta, path):
+    """
+    Serve um arquivo do build do frontend, pré-comprimido se possível.
+
+    Usa o .br ou .gz gravado por estaticos.py quando existe e o navegador
+    aceita, com cache imutável (os nomes dos arquivos têm hash).
+
+    Args:
+        subpasta: Pasta dentro do build (js, css)
+        path: Caminho do arquivo dentro da subpasta
+
+    Returns:
+        Response com o arquivo
+    """
+    pasta, nome, codificacao = localizar_estatico(subpasta, path, request.accept_encodings)
+
+    if codificacao is None:
+        resposta = send_from_directory(pasta, nome)
+    else:
+        resposta = send_from_directory(pasta, nome, mimetype=mimetypes.guess_type(path)[0])
+        resposta.headers['Content-Encoding'] = codificacao
+
+    resposta.vary.add('Accept-Encoding')
+    resposta.headers['Cache-Control'] = CACHE_CONTROL_ESTATICOS
+    return resposta
+
+
 # =============================================================================
 # Rotas da API
 # =============================================================================
@@ -156,7 +1134,11 @@ def index():
         "endpoints": {
             "/api/pesquisa": "Busca simples",
             "/api/pesquisa/avancada": "Busca por campo específico",
+            "/api/pesquisa/exportar": "Exporta todos os resultados (NDJSON/CSV)",
+            "/api/facetas": "Contagem por UF/Modalidade de uma busca",
             "/api/campos": "Lista campos disponíveis",
+            "/api/estatisticas": "Versão dos dados e contadores do cache",
+            "/metrics": "Métricas Prometheus",
             "/teste": "Health check"
         }
     })
@@ -165,13 +1147,13 @@ def index():
 @app.route('/js/<path:path>')
 def serve_js(path):
     """Serve arquivos JavaScript"""
-    return send_from_directory(os.path.join(app.static_folder, 'js'), path)
+    return enviar_estatico('js', path)
 
 
 @app.route('/css/<path:path>')
 def serve_css(path):
     """Serve arquivos CSS"""
-    return send_from_directory(os.path.join(app.static_folder, 'css'), path)
+    return enviar_estatico('css', path)
 
 
 @app.route('/api/pesquisa', methods=['GET'])
@@ -183,43 +1165,75 @@ def pesquisar():
         consulta: Termo de busca (obrigatório)
         pagina: Número da página (default: 1)
         por_pagina: Resultados por página (default: 20, max: 100)
+        facetas: Colunas para contagem por valor, separadas por vírgula (opcional)
+        cursor: Paginação por cursor ('' na primeira página, depois o
+            paginacao.proximo_cursor recebido); substitui pagina
+        modo: 'exato' (default, substring) ou 'fuzzy' (tolerante a acentos e
+            erros de digitação, ordenado por relevância)
+        ordenar: 'arquivo' (default) ou 'relevancia' (modo exato: valor igual >
+            prefixo > início de palavra > substring, pesado pela coluna)
 
     Returns:
-        JSON com contagem, paginação e resultados
+        JSON com contagem, paginação e resultados (e facetas, se pedidas);
+        no modo fuzzy ou ordenado por relevância, também a pontuação de cada
+        resultado
     """
     try:
         consulta = request.args.get('consulta', '')
         pagina = request.args.get('pagina', 1, type=int)
-        por_pagina = min(request.args.get('por_pagina', 20, type=int), 100)
+        por_pagina = max(1, min(request.args.get('por_pagina', 20, type=int), 100))
+        modo = request.args.get('modo', 'exato')
+        ordenar = request.args.get('ordenar', 'arquivo')
+        cursor = request.args.get('cursor')
 
-        logger.debug(f"Busca simples: {consulta} (página {pagina})")
+        logger.debug("Busca simples: %s (página %s)", consulta, pagina)
 
-        if not consulta:
+        # Só espaços normaliza para '': não é uma consulta
+        if not normalizar(consulta):
             return jsonify({'erro': 'O parâmetro de consulta é obrigatório'}), 400
 
+        if modo not in ('exato', 'fuzzy'):
+            return jsonify({'erro': f'Modo inválido: {modo}'}), 400
+
+        if modo == 'fuzzy' and cursor is not None:
+            return jsonify({'erro': 'Paginação por cursor não é suportada no modo fuzzy'}), 400
+
+        erro = validar_ordenacao(ordenar, cursor)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
         # Carrega dados do cache
         df = carregar_csv()
+        dados = obter_dados(df)
 
-        # Cria máscara de busca (case-insensitive)
-        mascara = pd.Series(False, index=df.index)
+        facetas, erro = ler_facetas(request.args.get('facetas', ''), dados)
+        if erro:
+            return jsonify({'erro': erro}), 400
 
-        for col in df.columns:
-            mascara = mascara | df[col].str.contains(
-                consulta, case=False, regex=False, na=False
-            )
+        if modo == 'fuzzy':
+            # Índice de trigramas normalizados, ordenado por pontuação
+            resultado = buscar_fuzzy(df, consulta)
+            logger.debug("Encontrados %d resultados (fuzzy)", len(resultado))
 
-        # Filtra e converte para dict
-        todos_resultados = df[mascara].to_dict(orient='records')
-        logger.debug(f"Encontrados {len(todos_resultados)} resultados")
+            resposta = montar_resposta(df, dados, resultado['linha'], None, consulta,
+                                       facetas, pagina, por_pagina)
+            pontuacoes = paginar(resultado['pontuacao'], pagina, por_pagina)['resultados']
+            resposta['pontuacoes'] = [round(p, 3) for p in pontuacoes.tolist()]
+            return responder_json(resposta)
 
-        # Aplica paginação
-        dados_paginados = paginar(todos_resultados, pagina, por_pagina)
+        # Busca no índice de n-gramas (case-insensitive), com cache
+        linhas = buscar_linhas(df, consulta)
+        logger.debug("Encontrados %d resultados", len(linhas))
 
-        return jsonify({
-            'contagem': dados_paginados['paginacao']['total'],
-            'paginacao': dados_paginados['paginacao'],
-            'resultados': dados_paginados['resultados']
-        })
+        relevancia = None
+        if ordenar == 'relevancia':
+            relevancia = ordenar_relevancia(df, linhas, consulta)
+
+        return responder_json(montar_resposta(df, dados, linhas, None, consulta, facetas,
+                                              pagina, por_pagina, cursor, relevancia))
+
+    except CursorInvalido as e:
+        return jsonify({'erro': str(e)}), e.status
 
     except Exception as e:
         logger.error(f"Erro na busca: {str(e)}")
@@ -229,54 +1243,307 @@ def pesquisar():
 @app.route('/api/pesquisa/avancada', methods=['GET'])
 def pesquisa_avancada():
     """
-    Busca em um campo específico com paginação.
+    Busca em um ou mais campos específicos com paginação.
 
     Query params:
-        campo: Nome da coluna (obrigatório)
-        consulta: Termo de busca (obrigatório)
+        campo: Nome da coluna (obrigatório sem filtro)
+        consulta: Termo de busca (obrigatório sem filtro)
+        filtro: Filtro campo:operador:valor, com operador igual, prefixo ou
+            contem; pode ser repetido e combina com campo/consulta (E lógico)
         pagina: Número da página (default: 1)
         por_pagina: Resultados por página (default: 20, max: 100)
+        facetas: Colunas para contagem por valor, separadas por vírgula (opcional)
+        cursor: Paginação por cursor ('' na primeira página, depois o
+            paginacao.proximo_cursor recebido); substitui pagina
+        ordenar: 'arquivo' (default) ou 'relevancia' (pela consulta no campo;
+            exige campo e consulta)
 
     Returns:
-        JSON com contagem, paginação e resultados
+        JSON com contagem, paginação e resultados (e facetas, se pedidas);
+        ordenado por relevância, também a pontuação de cada resultado
     """
     try:
         campo = request.args.get('campo', '')
         consulta = request.args.get('consulta', '')
+        textos_filtros = request.args.getlist('filtro')
         pagina = request.args.get('pagina', 1, type=int)
-        por_pagina = min(request.args.get('por_pagina', 20, type=int), 100)
+        por_pagina = max(1, min(request.args.get('por_pagina', 20, type=int), 100))
 
-        logger.debug(f"Busca avançada - Campo: {campo}, Consulta: {consulta} (página {pagina})")
+        logger.debug("Busca avançada - Campo: %s, Consulta: %s, Filtros: %s (página %s)",
+                     campo, consulta, textos_filtros, pagina)
 
-        if not consulta or not campo:
+        if bool(campo) != bool(consulta) or not (consulta or textos_filtros):
             return jsonify({'erro': 'Os parâmetros campo e consulta são obrigatórios'}), 400
+        if consulta and not normalizar(consulta):
+            return jsonify({'erro': 'O parâmetro de consulta é obrigatório'}), 400
+
+        ordenar = request.args.get('ordenar', 'arquivo')
+        cursor = request.args.get('cursor')
+        erro = validar_ordenacao(ordenar, cursor)
+        if erro:
+            return jsonify({'erro': erro}), 400
+        if ordenar == 'relevancia' and not consulta:
+            return jsonify({'erro': 'A ordenação por relevância exige campo e consulta'}), 400
 
         # Carrega dados do cache
         df = carregar_csv()
 
         # Verifica se o campo existe
-        if campo not in df.columns:
+        if campo and campo not in df.columns:
             logger.error(f"Campo não encontrado: {campo}")
             return jsonify({'erro': f'Campo {campo} não encontrado'}), 400
 
-        # Filtra pelo campo específico
-        mascara = df[campo].str.contains(
-            consulta, case=False, regex=False, na=False
-        )
-        todos_resultados = df[mascara].to_dict(orient='records')
-        logger.debug(f"Encontrados {len(todos_resultados)} resultados")
+        dados = obter_dados(df)
+        facetas, erro = ler_facetas(request.args.get('facetas', ''), dados)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        if textos_filtros:
+            # Vários filtros: plano pelo mais seletivo, intersectando as linhas
+            filtros = [ler_filtro(texto, df.columns) for texto in textos_filtros]
+            if campo:
+                filtros.append(Filtro(campo, 'contem', consulta))
+            linhas = buscar_linhas_filtros(df, filtros)
+        else:
+            # Filtra pelo campo específico
+            linhas = buscar_linhas(df, consulta, campo=campo)
+        logger.debug("Encontrados %d resultados", len(linhas))
+
+        relevancia = None
+        if ordenar == 'relevancia':
+            # Pela consulta no campo, mesmo quando combinada com filtros
+            relevancia = ordenar_relevancia(df, linhas, consulta, campo=campo,
+                                            filtros=filtros if textos_filtros else None)
+        return responder_json(montar_resposta(df, dados, linhas, campo, consulta, facetas,
+                                              pagina, por_pagina, cursor, relevancia,
+                                              filtros=filtros if textos_filtros else None))
+
+    except (CursorInvalido, FiltroInvalido) as e:
+        return jsonify({'erro': str(e)}), getattr(e, 'status', 400)
+
+    except Exception as e:
+        logger.error(f"Erro na busca avançada: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/pesquisa/lote', methods=['POST'])
+def pesquisa_lote():
+    """
+    Várias buscas numa requisição (ex: conciliação de CNPJs).
+
+    Body JSON:
+        itens: Lista de {"campo": coluna (opcional), "consulta": termo}
+            (máximo MAX_ITENS_LOTE)
+        por_pagina: Resultados por item (default: 5, max: 20)
+
+    Returns:
+        JSON com um resultado por item, na mesma ordem: contagem e primeira
+        página, ou erro do item
+    """
+    try:
+        corpo = request.get_json(silent=True)
+        itens = corpo.get('itens') if isinstance(corpo, dict) else None
+        if not isinstance(itens, list):
+            return jsonify({'erro': 'O corpo deve ser um JSON com a lista itens'}), 400
+
+        if len(itens) > MAX_ITENS_LOTE:
+            return jsonify({'erro': f'No máximo {MAX_ITENS_LOTE} itens por lote'}), 413
+
+        por_pagina = corpo.get('por_pagina', 5)
+        if not isinstance(por_pagina, int) or isinstance(por_pagina, bool):
+            return jsonify({'erro': 'por_pagina deve ser um inteiro'}), 400
+        por_pagina = max(0, min(por_pagina, MAX_POR_PAGINA_LOTE))
+
+        logger.debug("Busca em lote: %d itens", len(itens))
+
+        df = carregar_csv()
+        return responder_json({'itens': pesquisar_lote(df, itens, por_pagina)})
+
+    except Exception as e:
+        logger.error(f"Erro na busca em lote: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
 
-        # Aplica paginação
-        dados_paginados = paginar(todos_resultados, pagina, por_pagina)
+
+@app.route('/api/pesquisa/exportar', methods=['GET'])
+def exportar_pesquisa():
+    """
+    Exporta todos os resultados de uma busca em streaming (sem paginação).
+
+    Query params:
+        consulta: Termo de busca (obrigatório)
+        campo: Coluna para restringir a busca (opcional; sem ele busca em todas)
+        formato: ndjson ou csv (default: ndjson)
+
+    Headers:
+        Accept-Encoding: com gzip, a resposta é comprimida em streaming
+
+    Returns:
+        Resposta em streaming com uma operadora por linha
+    """
+    try:
+        consulta = request.args.get('consulta', '')
+        campo = request.args.get('campo', '')
+        formato = request.args.get('formato', 'ndjson').lower()
+
+        logger.debug("Exportação - Campo: %s, Consulta: %s, Formato: %s",
+                     campo, consulta, formato)
+
+        # Só espaços normaliza para '': não é uma consulta
+        if not normalizar(consulta):
+            return jsonify({'erro': 'O parâmetro de consulta é obrigatório'}), 400
+        if formato not in ('ndjson', 'csv'):
+            return jsonify({'erro': 'Formato deve ser ndjson ou csv'}), 400
+
+        df = carregar_csv()
+        if campo and campo not in df.columns:
+            return jsonify({'erro': f'Campo {campo} não encontrado'}), 400
+
+        linhas = buscar_linhas(df, consulta, campo=campo or None)
+        logger.debug("Exportando %d resultados", len(linhas))
+        metricas.RESULTADOS.labels(request.endpoint).observe(len(linhas))
+
+        conteudo = gerar_exportacao(df, linhas, formato)
+        headers = {
+            'Content-Disposition': f'attachment; filename=operadoras.{formato}',
+            'X-Total-Count': str(len(linhas)),
+            'Vary': 'Accept-Encoding'
+        }
+        # Só gzip em streaming; respeita q=0 como o resto das respostas
+        if escolher_codificacao(request.accept_encodings, ('gzip',)) == 'gzip':
+            conteudo = comprimir_gzip(conteudo)
+            headers['Content-Encoding'] = 'gzip'
+
+        mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+        return Response(conteudo, mimetype=mimetype, headers=headers)
+
+    except Exception as e:
+        logger.error(f"Erro na exportação: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/facetas', methods=['GET'])
+def obter_facetas():
+    """
+    Contagem por valor das colunas de baixa cardinalidade para uma busca.
+
+    Query params:
+        consulta: Termo de busca (opcional; sem ele conta todas as operadoras)
+        campo: Coluna para restringir a busca (opcional)
+        facetas: Colunas separadas por vírgula (default: UF, Modalidade,
+            Regiao_de_Comercializacao)
+        limite: Quantidade máxima de valores por coluna (default: 50)
+
+    Returns:
+        JSON com contagem total e facetas
+    """
+    try:
+        consulta = request.args.get('consulta', '')
+        campo = request.args.get('campo', '')
+        limite = request.args.get('limite', 50, type=int)
+
+        df = carregar_csv()
+        dados = obter_dados(df)
+
+        if campo and campo not in df.columns:
+            return jsonify({'erro': f'Campo {campo} não encontrado'}), 400
+
+        facetas, erro = ler_facetas(request.args.get('facetas', ''), dados, FACETAS_PADRAO)
+        if erro:
+            return jsonify({'erro': erro}), 400
+
+        linhas = buscar_linhas(df, consulta, campo=campo or None) if consulta else None
 
         return jsonify({
-            'contagem': dados_paginados['paginacao']['total'],
-            'paginacao': dados_paginados['paginacao'],
-            'resultados': dados_paginados['resultados']
+            'contagem': len(df) if linhas is None else len(linhas),
+            'facetas': calcular_facetas(dados, facetas, linhas, limite)
         })
 
     except Exception as e:
-        logger.error(f"Erro na busca avançada: {str(e)}")
+        logger.error(f"Erro ao calcular facetas: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/autocompletar', methods=['GET'])
+def autocompletar():
+    """
+    Sugestões de Razao_Social e Nome_Fantasia para busca enquanto se digita.
+
+    Query params:
+        prefixo: Texto digitado (obrigatório; acentos e caixa são ignorados)
+        limite: Quantidade de sugestões (default: 10, max: 50)
+
+    Returns:
+        JSON com o prefixo e a lista de sugestões
+    """
+    try:
+        prefixo = request.args.get('prefixo', '')
+        limite = min(request.args.get('limite', 10, type=int), MAX_SUGESTOES)
+
+        if not prefixo.strip():
+            return jsonify({'erro': 'O parâmetro prefixo é obrigatório'}), 400
+
+        dados = obter_dados(carregar_csv())
+
+        return jsonify({
+            'prefixo': prefixo,
+            'sugestoes': dados.autocompletar.sugerir(prefixo, limite)
+        })
+
+    except Exception as e:
+        logger.error(f"Erro no autocompletar: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/operadoras/<registro_ans>', methods=['GET'])
+def obter_operadora(registro_ans):
+    """
+    Retorna a operadora pelo registro ANS (REGISTRO_OPERADORA), sem busca.
+
+    Args:
+        registro_ans: Registro da operadora na ANS
+
+    Returns:
+        JSON com os dados da operadora, ou 404
+    """
+    try:
+        df = carregar_csv()
+        posicao = obter_dados(df).posicao_da_chave(registro_ans.strip())
+        if posicao is None:
+            return jsonify({'erro': f'Operadora {registro_ans} não encontrada'}), 404
+
+        return responder_json(serializar_linhas(df, [posicao])[0])
+
+    except Exception as e:
+        logger.error(f"Erro ao obter operadora: {str(e)}")
+        return jsonify({'erro': str(e)}), 500
+
+
+@app.route('/api/operadoras/cnpj/<path:cnpj>', methods=['GET'])
+def obter_operadora_por_cnpj(cnpj):
+    """
+    Retorna a operadora pelo CNPJ, sem busca.
+
+    Aceita o CNPJ formatado (12.345.678/0001-99) ou só com dígitos.
+
+    Args:
+        cnpj: CNPJ da operadora
+
+    Returns:
+        JSON com os dados da operadora, 400 se o CNPJ for inválido ou 404
+    """
+    try:
+        if not normalizar_cnpj(cnpj):
+            return jsonify({'erro': f'CNPJ inválido: {cnpj}'}), 400
+
+        df = carregar_csv()
+        posicao = obter_dados(df).posicao_do_cnpj(cnpj)
+        if posicao is None:
+            return jsonify({'erro': f'Operadora com CNPJ {cnpj} não encontrada'}), 404
+
+        return responder_json(serializar_linhas(df, [posicao])[0])
+
+    except Exception as e:
+        logger.error(f"Erro ao obter operadora por CNPJ: {str(e)}")
         return jsonify({'erro': str(e)}), 500
 
 
@@ -289,9 +1556,10 @@ def obter_campos():
         JSON com lista de campos
     """
     try:
-        df = carregar_csv()
+        # Via snapshot: registra a versão dos dados para o ETag
+        df = obter_dados(carregar_csv()).df
         campos = list(df.columns)
-        logger.debug(f"Campos disponíveis: {campos}")
+        logger.debug("Campos disponíveis: %s", campos)
 
         return jsonify({
             'campos': campos
@@ -302,6 +1570,75 @@ def obter_campos():
         return jsonify({'erro': str(e)}), 500
 
 
+@app.route('/api/estatisticas', methods=['GET'])
+def estatisticas():
+    """
+    Retorna a versão dos dados carregados e os contadores do cache.
+
+    Returns:
+        JSON com o snapshot atual, recargas e estatísticas do cache
+    """
+    dados = _dados
+    return jsonify({
+        'dados': dados.resumo() if dados else None,
+        'recarga': {
+            'recargas': _recargas,
+            'em_andamento': _lock_carga.locked(),
+            'intervalo_s': RECARGA_INTERVALO
+        },
+        'cache': _cache_consultas.estatisticas()
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    """
+    Métricas no formato do Prometheus (latência por rota e por fase,
+    tamanho dos resultados, cache de consultas e carga dos dados).
+
+    Returns:
+        Texto no formato de exposição do Prometheus
+    """
+    conteudo, tipo = metricas.exportar()
+    return Response(conteudo, content_type=tipo)
+
+
+@app.route('/api/admin/recarregar', methods=['POST'])
+def admin_recarregar():
+    """
+    Dispara a recarga do CSV em segundo plano.
+
+    Headers:
+        X-Admin-Token: Deve ser igual à variável de ambiente ADMIN_TOKEN
+
+    Returns:
+        JSON 202 com a versão atual (a nova aparece em /api/estatisticas)
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'erro': 'Recarga administrativa desabilitada'}), 403
+
+    token = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({'erro': 'Token inválido'}), 401
+
+    if _lock_carga.locked():
+        return jsonify({'erro': 'Recarga já em andamento'}), 409
+
+    def recarregar_em_segundo_plano():
+        try:
+            recarregar_dados(forcar=True)
+        except Exception as e:
+            logger.error(f"Erro na recarga administrativa: {str(e)}")
+
+    threading.Thread(target=recarregar_em_segundo_plano, daemon=True).start()
+
+    dados = _dados
+    return jsonify({
+        'mensagem': 'Recarga iniciada',
+        'versao_atual': dados.versao if dados else None
+    }), 202
+
+
 @app.route('/teste', methods=['GET'])
 def teste():
     """Health check endpoint"""
@@ -323,8 +1660,17 @@ if __name__ == '__main__':
     print("Acesse: http://localhost:8000")
     print("\nEndpoints disponíveis:")
     print("  GET /api/pesquisa?consulta={termo}&pagina=1&por_pagina=20")
+    print("  GET /api/pesquisa?consulta={termo}&modo=fuzzy")
     print("  GET /api/pesquisa/avancada?campo={coluna}&consulta={termo}")
+    print("  GET /api/pesquisa/exportar?consulta={termo}&formato=ndjson|csv")
+    print("  POST /api/pesquisa/lote")
+    print("  GET /api/facetas?consulta={termo}&facetas=UF,Modalidade")
+    print("  GET /api/autocompletar?prefixo={texto}")
+    print("  GET /api/operadoras/{registro_ans}")
+    print("  GET /api/operadoras/cnpj/{cnpj}")
     print("  GET /api/campos")
+    print("  GET /api/estatisticas")
+    print("  GET /metrics")
     print("  GET /teste")
     print("=" * 50)
 
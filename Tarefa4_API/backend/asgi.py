@@ -0,0 +1,147 @@
+"""
+Modo assíncrono (ASGI) da API, servido pelo uvicorn.
+
+As rotas e os contratos JSON são os mesmos do app Flask:
+
+- as rotas da API (busca, facetas, lote...) continuam sendo as funções do
+  app.py, chamadas num pool de threads limitado (ASGI_THREADS). A busca
+  ocupa CPU; o laço de eventos só recebe as requisições e envia as
+  respostas, então um cliente lento não prende uma thread;
+- os estáticos do build (js, css) são enviados pelo próprio laço de eventos;
+- a exportação é transmitida pelo laço de eventos, e só a geração de cada
+  bloco de linhas vai para o pool.
+
+Uso:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+    python asgi.py
+
+Variáveis de ambiente:
+    ASGI_THREADS: Threads do pool das rotas da API (default: 4)
+    UVICORN_WORKERS: Processos ao rodar com python asgi.py (default: 2)
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import asyncio
+import contextlib
+import mimetypes
+import os
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header
+from werkzeug.security import safe_join
+
+import app as aplicacao
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 4))
+
+# App Flask como ASGI; o executor dele é o pool limitado de todas as rotas
+wsgi = WSGIMiddleware(aplicacao.app, workers=ASGI_THREADS)
+executor = wsgi.executor
+
+
+async def no_pool(funcao, *args):
+    """Executa uma função bloqueante no pool limitado"""
+    return await asyncio.get_running_loop().run_in_executor(executor, funcao, *args)
+
+
+def preparar_exportacao(query_string, headers):
+    """
+    Chama a rota de exportação do Flask para validar e buscar as linhas.
+
+    Args:
+        query_string: Query string da requisição
+        headers: Headers da requisição
+
+    Returns:
+        Response do Flask (em streaming, ou o JSON de erro)
+    """
+    with aplicacao.app.test_request_context('/api/pesquisa/exportar', query_string=query_string,
+                                            headers=headers):
+        return aplicacao.app.make_response(aplicacao.exportar_pesquisa())
+
+
+async def transmitir(resposta):
+    """
+    Gera o corpo de uma Response do Flask em streaming, um trecho por vez.
+
+    Cada trecho é produzido no pool; o envio ao cliente fica no laço de eventos.
+
+    Args:
+        resposta: Response do Flask em streaming
+
+    Yields:
+        Bytes de cada trecho
+    """
+    trechos = resposta.iter_encoded()
+    fim = object()
+    try:
+        while True:
+            trecho = await no_pool(next, trechos, fim)
+            if trecho is fim:
+                break
+            yield trecho
+    finally:
+        resposta.close()
+
+
+async def exportar(requisicao):
+    """GET /api/pesquisa/exportar (mesmo contrato da rota Flask)"""
+    resposta = await no_pool(preparar_exportacao, requisicao.url.query,
+                             list(requisicao.headers.items()))
+    headers = dict(resposta.headers)
+
+    if not resposta.is_streamed:
+        return Response(resposta.get_data(), status_code=resposta.status_code, headers=headers)
+    headers.pop('Content-Length', None)
+    return StreamingResponse(transmitir(resposta), status_code=resposta.status_code,
+                             headers=headers)
+
+
+async def estatico(requisicao):
+    """GET /js/... e /css/...: arquivo do build, pré-comprimido se possível"""
+    subpasta = requisicao.url.path.split('/')[1]
+    path = requisicao.path_params['path']
+    aceitas = parse_accept_header(requisicao.headers.get('Accept-Encoding'))
+
+    pasta, nome, codificacao = aplicacao.localizar_estatico(subpasta, path, aceitas)
+    caminho = safe_join(pasta, nome)
+    if caminho is None or not os.path.isfile(caminho):
+        return PlainTextResponse('Not Found', status_code=404)
+
+    headers = {
+        'Cache-Control': aplicacao.CACHE_CONTROL_ESTATICOS,
+        'Vary': 'Accept-Encoding'
+    }
+    if codificacao is not None:
+        headers['Content-Encoding'] = codificacao
+    return FileResponse(caminho, media_type=mimetypes.guess_type(path)[0], headers=headers)
+
+
+@contextlib.asynccontextmanager
+async def ciclo_de_vida(_):
+    """Carrega os dados antes de aceitar requisições (como apos_fork no gunicorn)"""
+    await no_pool(lambda: aplicacao.carregar_csv())
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/api/pesquisa/exportar', exportar, methods=['GET']),
+        Route('/js/{path:path}', estatico, methods=['GET', 'HEAD']),
+        Route('/css/{path:path}', estatico, methods=['GET', 'HEAD']),
+        Mount('', app=wsgi)
+    ],
+    lifespan=ciclo_de_vida
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run('asgi:app', host='0.0.0.0', port=int(os.environ.get('PORT', 8000)),
+                workers=int(os.environ.get('UVICORN_WORKERS', 2)), log_level='warning')
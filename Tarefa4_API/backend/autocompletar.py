@@ -0,0 +1,159 @@
+"""
+Sugestões de nomes de operadoras enquanto o usuário digita.
+
+Na carga, os nomes distintos de Razao_Social e Nome_Fantasia são
+normalizados (sem acentos, minúsculos) e guardados em duas listas
+ordenadas: uma pelo nome inteiro e outra a partir do início de cada
+palavra. Um prefixo corresponde a um intervalo contíguo de cada lista,
+localizado por busca binária; as sugestões são os primeiros nomes do
+intervalo, então o custo não depende de quantos nomes existem.
+"""
+
+import bisect
+import re
+
+import numpy as np
+
+from indice import codificar_coluna
+from normalizacao import normalizar
+
+
+# Colunas cujos valores são sugeridos
+COLUNAS_AUTOCOMPLETAR = ['Razao_Social', 'Nome_Fantasia']
+
+# Quantidade padrão de sugestões
+LIMITE_PADRAO = 10
+
+# Maior caractere possível: prefixo + FIM limita o intervalo do prefixo
+_FIM = '\U0010ffff'
+
+_ESPACO = re.compile(' ')
+
+
+class IndiceAutocompletar:
+    """
+    Listas ordenadas (nome normalizado -> nome original) para sugestões por prefixo.
+    """
+
+    def __init__(self, df, colunas=None):
+        """
+        Args:
+            df: DataFrame já limpo
+            colunas: Colunas sugeridas (default: as de COLUNAS_AUTOCOMPLETAR presentes)
+        """
+        colunas = COLUNAS_AUTOCOMPLETAR if colunas is None else colunas
+        self.colunas = [col for col in colunas if col in df.columns]
+
+        nomes = {}
+        for coluna in self.colunas:
+            _, valores = codificar_coluna(df[coluna])
+            for valor in valores:
+                if isinstance(valor, str) and valor.strip():
+                    nomes.setdefault(normalizar(valor), valor.strip())
+
+        # Nome inteiro, em ordem, e o valor original de cada um
+        self._chaves_nomes = sorted(nomes)
+        self._valores = [nomes[chave] for chave in self._chaves_nomes]
+
+        # Cada sufixo que começa numa palavra seguinte, apontando para o nome
+        sufixos = []
+        donos = []
+        for i, chave in enumerate(self._chaves_nomes):
+            for espaco in _ESPACO.finditer(chave):
+                sufixos.append(chave[espaco.end():])
+                donos.append(i)
+        ordem = sorted(range(len(sufixos)), key=sufixos.__getitem__)
+        self._chaves_palavras = [sufixos[k] for k in ordem]
+        self._donos_palavras = [donos[k] for k in ordem]
+
+    @classmethod
+    def restaurar(cls, colunas, chaves_nomes, valores, donos, deslocamentos):
+        """
+        Reconstrói o índice a partir do que foi gravado por exportar().
+
+        Os sufixos já vêm na ordem das chaves: são recortados dos nomes,
+        sem ordenar de novo.
+
+        Args:
+            colunas: Colunas sugeridas
+            chaves_nomes: Nomes normalizados, em ordem
+            valores: Nome original de cada chave
+            donos: Nome de cada sufixo, na ordem dos sufixos
+            deslocamentos: Início de cada sufixo no nome
+
+        Returns:
+            IndiceAutocompletar pronto para sugestões
+        """
+        indice = cls.__new__(cls)
+        indice.colunas = list(colunas)
+        indice._chaves_nomes = list(chaves_nomes)
+        indice._valores = list(valores)
+        indice._donos_palavras = np.asarray(donos).tolist()
+        indice._chaves_palavras = [
+            indice._chaves_nomes[dono][inicio:]
+            for dono, inicio in zip(indice._donos_palavras, np.asarray(deslocamentos).tolist())
+        ]
+        return indice
+
+    def exportar(self):
+        """
+        Retorna as listas ordenadas para gravação em disco.
+
+        Returns:
+            Dict com colunas, chaves_nomes, valores e os arrays donos e
+            deslocamentos dos sufixos
+        """
+        # O sufixo é o fim do nome: começa em len(nome) - len(sufixo)
+        deslocamentos = [len(self._chaves_nomes[dono]) - len(sufixo)
+                         for dono, sufixo in zip(self._donos_palavras, self._chaves_palavras)]
+        return {
+            'colunas': self.colunas,
+            'chaves_nomes': self._chaves_nomes,
+            'valores': self._valores,
+            'donos': np.array(self._donos_palavras, dtype=np.int64),
+            'deslocamentos': np.array(deslocamentos, dtype=np.int64)
+        }
+
+    def __len__(self):
+        return len(self._chaves_nomes)
+
+    @staticmethod
+    def _intervalo(chaves, prefixo):
+        """Retorna (início, fim) das chaves que começam com o prefixo"""
+        return (bisect.bisect_left(chaves, prefixo),
+                bisect.bisect_left(chaves, prefixo + _FIM))
+
+    def sugerir(self, prefixo, limite=LIMITE_PADRAO):
+        """
+        Sugere nomes que começam com o prefixo (ou com uma palavra que começa com ele).
+
+        Nomes que começam com o prefixo vêm primeiro; depois, os que têm uma
+        palavra começando com ele. Em cada grupo, ordem alfabética.
+
+        Args:
+            prefixo: Texto digitado (acentos e caixa são ignorados)
+            limite: Quantidade máxima de sugestões
+
+        Returns:
+            Lista com os nomes originais sugeridos
+        """
+        chave = normalizar(prefixo)
+        if not chave or limite <= 0:
+            return []
+
+        inicio, fim = self._intervalo(self._chaves_nomes, chave)
+        escolhidos = list(range(inicio, min(fim, inicio + limite)))
+
+        if len(escolhidos) < limite:
+            # Um mesmo nome pode aparecer por mais de uma palavra
+            vistos = set(escolhidos)
+            inicio, fim = self._intervalo(self._chaves_palavras, chave)
+            for k in range(inicio, fim):
+                dono = self._donos_palavras[k]
+                if dono not in vistos:
+                    vistos.add(dono)
+                    escolhidos.append(dono)
+                    if len(escolhidos) == limite:
+                        break
+
+        return [self._valores[i] for i in escolhidos]
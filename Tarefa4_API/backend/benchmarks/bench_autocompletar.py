@@ -0,0 +1,61 @@
+"""
+Benchmark - Autocompletar por prefixo
+
+Mede a construção e a latência p50/p99 das sugestões de /api/autocompletar
+com os nomes do CSV replicados e numerados (todos distintos).
+
+Uso:
+    python benchmarks/bench_autocompletar.py [--nomes 10000 300000] [--repeticoes 500]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autocompletar import IndiceAutocompletar
+from bench_indice import carregar_base, medir
+
+PREFIXOS = ['u', 'unimed', 'unimed belo', 'sao', 'SÃO', 'odonto', 'belo h', 'xyz']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--nomes', type=int, nargs='+', default=[10000, 300000],
+                        help='Quantidade de nomes distintos')
+    parser.add_argument('--repeticoes', type=int, default=500)
+    args = parser.parse_args()
+
+    base = carregar_base()
+
+    for quantidade in args.nomes:
+        razoes = np.resize(base['Razao_Social'].to_numpy(), quantidade)
+        fantasias = np.resize(base['Nome_Fantasia'].to_numpy(), quantidade)
+        df = pd.DataFrame({
+            'Razao_Social': [f'{nome} {i}' for i, nome in enumerate(razoes)],
+            'Nome_Fantasia': [f'{nome} {i}' if nome else None for i, nome in enumerate(fantasias)]
+        })
+
+        inicio = time.perf_counter()
+        indice = IndiceAutocompletar(df)
+        construcao = time.perf_counter() - inicio
+
+        print(f"\n{len(indice)} nomes distintos (construído em {construcao:.2f}s)")
+        print(f"{'prefixo':<16}{'sugestões':>10}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+
+        for prefixo in PREFIXOS:
+            sugestoes = len(indice.sugerir(prefixo))
+            p50, p99 = medir(lambda: indice.sugerir(prefixo), args.repeticoes)
+            print(f"{prefixo:<16}{sugestoes:>10}{p50 * 1000:>12.1f}{p99 * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
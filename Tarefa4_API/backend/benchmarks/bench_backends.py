@@ -0,0 +1,169 @@
+"""
+Benchmark - Backends de busca: índice em memória x SQLite FTS5
+
+Para o CSV replicado em vários tamanhos, compara o IndiceNgramas
+(BACKEND_BUSCA=memoria) com o BuscaSqlite (BACKEND_BUSCA=sqlite):
+construção, memória privada do processo depois de construir/abrir e
+buscar, tamanho do arquivo e latência (p50/p99) de cada consulta.
+
+Mede também o caminho real da API: app.construir_dados() num processo
+novo para cada backend (sem snapshot), com o tempo, o RSS e a memória
+privada depois da carga e o pico de RSS. No modo sqlite o ConjuntoDados
+não monta as listas de n-gramas do índice em memória; facetas, filtros e
+relevância continuam usando os códigos e valores normalizados dele.
+
+Uso:
+    python benchmarks/bench_backends.py [--fatores 1 10 50] [--repeticoes 20]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indice import CONSULTAS, carregar_base, medir
+from busca_sqlite import BuscaSqlite, pasta_bancos
+from indice import IndiceNgramas
+
+
+def memoria_privada_mb():
+    """Memória privada (não compartilhada) do processo, de /proc/self/smaps_rollup"""
+    total = 0
+    with open('/proc/self/smaps_rollup') as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if partes[0] in ('Private_Clean:', 'Private_Dirty:'):
+                total += int(partes[1])
+    return total / 1024
+
+
+def rss_mb():
+    """RSS atual do processo, de /proc/self/statm"""
+    with open('/proc/self/statm') as arquivo:
+        return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def medir_construir(caminho):
+    """
+    Mede app.construir_dados() do CSV (roda no processo filho).
+
+    O backend vem de BACKEND_BUSCA, definido pelo processo pai.
+
+    Returns:
+        Dict com segundos, rss_mb, privada_mb e pico_mb (acréscimos à base)
+    """
+    os.environ.update({'USAR_SNAPSHOT': '0', 'RECARGA_INTERVALO': '0', 'LOG_NIVEL': 'WARNING'})
+    import app
+
+    gc.collect()
+    base_rss = rss_mb()
+    base_privada = memoria_privada_mb()
+    inicio = time.perf_counter()
+    dados = app.construir_dados(caminho, usar_snapshot=False)
+    segundos = time.perf_counter() - inicio
+    for consulta in CONSULTAS:
+        dados.busca.buscar(consulta)
+    gc.collect()
+    return {
+        'segundos': segundos,
+        'rss_mb': rss_mb() - base_rss,
+        'privada_mb': memoria_privada_mb() - base_privada,
+        'pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - base_rss,
+        'listas': dados.indice.com_listas,
+    }
+
+
+def construir_em_processo(caminho, backend):
+    """Roda medir_construir() num processo novo com BACKEND_BUSCA=backend"""
+    processo = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--construir', caminho],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'BACKEND_BUSCA': backend}
+    )
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fatores', type=int, nargs='+', default=[1, 10, 50],
+                        help='Quantas vezes replicar o CSV')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--construir', metavar='CSV', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.construir:
+        print(json.dumps(medir_construir(args.construir)))
+        return
+
+    base = carregar_base()
+
+    for fator in args.fatores:
+        df = pd.concat([base] * fator, ignore_index=True)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_csv = os.path.join(pasta, 'operadoras.csv')
+
+            # Grava o banco antes de medir: em produção ele é construído uma vez
+            inicio = time.perf_counter()
+            BuscaSqlite.abrir(df, versao='bench', caminho_csv=caminho_csv)
+            construcao_sqlite = time.perf_counter() - inicio
+            tamanho = os.path.getsize(os.path.join(pasta_bancos(caminho_csv), 'bench.db')) / 2 ** 20
+
+            gc.collect()
+            antes = memoria_privada_mb()
+            sqlite = BuscaSqlite.abrir(df, versao='bench', caminho_csv=caminho_csv)
+            for consulta in CONSULTAS:
+                sqlite.buscar(consulta)
+            memoria_sqlite = memoria_privada_mb() - antes
+
+            gc.collect()
+            antes = memoria_privada_mb()
+            inicio = time.perf_counter()
+            indice = IndiceNgramas(df)
+            construcao_memoria = time.perf_counter() - inicio
+            for consulta in CONSULTAS:
+                indice.buscar(consulta)
+            memoria_indice = memoria_privada_mb() - antes
+
+            print(f"\n{len(df)} linhas")
+            print(f"{'backend':<10}{'construção (s)':>16}{'memória privada (MB)':>22}{'arquivo (MB)':>14}")
+            print(f"{'memoria':<10}{construcao_memoria:>16.2f}{memoria_indice:>22.1f}{'-':>14}")
+            print(f"{'sqlite':<10}{construcao_sqlite:>16.2f}{memoria_sqlite:>22.1f}{tamanho:>14.1f}")
+
+            print(f"{'consulta':<20}{'resultados':>11}{'memoria p50/p99 (ms)':>24}{'sqlite p50/p99 (ms)':>24}")
+            for consulta in CONSULTAS:
+                linhas = indice.buscar(consulta)
+                assert np.array_equal(linhas, sqlite.buscar(consulta)), consulta
+                p50_m, p99_m = medir(lambda c=consulta: indice.buscar(c), args.repeticoes)
+                p50_s, p99_s = medir(lambda c=consulta: sqlite.buscar(c), args.repeticoes)
+                print(f"{consulta:<20}{len(linhas):>11}{p50_m:>12.2f}{p99_m:>12.2f}"
+                      f"{p50_s:>12.2f}{p99_s:>12.2f}")
+
+            del sqlite, indice
+
+            # Caminho real da API, do CSV ao ConjuntoDados com o backend aplicado
+            df.to_csv(caminho_csv, sep=';', index=False)
+            print(f"{'construir_dados':<16}{'tempo (s)':>11}{'RSS (MB)':>10}{'privada (MB)':>14}"
+                  f"{'pico RSS (MB)':>15}{'listas':>8}")
+            for backend in ('memoria', 'sqlite'):
+                carga = construir_em_processo(caminho_csv, backend)
+                print(f"{backend:<16}{carga['segundos']:>11.2f}{carga['rss_mb']:>10.0f}"
+                      f"{carga['privada_mb']:>14.0f}{carga['pico_mb']:>15.0f}"
+                      f"{'sim' if carga['listas'] else 'não':>8}")
+
+
+if __name__ == '__main__':
+    main()
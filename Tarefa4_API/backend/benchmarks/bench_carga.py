@@ -0,0 +1,160 @@
+"""
+Benchmark - Carga: gunicorn (WSGI síncrono) x uvicorn (ASGI)
+
+Sobe o servidor em cada modo com a mesma quantidade de processos e abre
+50, 200 e 1000 conexões simultâneas, cada uma repetindo requisições da API
+(busca, fuzzy, facetas, autocompletar) durante alguns segundos. Mede
+requisições por segundo, latência (p50/p99) e erros.
+
+Uso:
+    python benchmarks/bench_carga.py [--fator 10] [--workers 2] [--conexoes 50 200 1000]
+                                     [--duracao 10]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from bench_workers import CAMINHO_CSV, PASTA_BACKEND, porta_livre
+
+MODOS = {
+    'gunicorn': lambda porta, workers: [
+        sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app',
+        '--workers', str(workers), '--bind', f'127.0.0.1:{porta}', '--backlog', '2048',
+        '--log-level', 'warning'
+    ],
+    'uvicorn': lambda porta, workers: [
+        sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(workers),
+        '--host', '127.0.0.1', '--port', str(porta), '--backlog', '2048',
+        '--log-level', 'warning', '--no-access-log'
+    ],
+}
+
+URLS = [
+    '/api/pesquisa?consulta=unimed',
+    '/api/pesquisa?consulta=odontologia&pagina=2',
+    '/api/pesquisa?consulta=saude&facetas=UF',
+    '/api/pesquisa?consulta=bradesco%20saude&modo=fuzzy',
+    '/api/pesquisa/avancada?campo=UF&consulta=SP',
+    '/api/facetas?consulta=unimed',
+    '/api/autocompletar?prefixo=uni',
+    '/api/campos',
+]
+
+# Tempo máximo de uma requisição antes de contar como erro
+TIMEOUT = 30
+
+
+async def requisitar(porta, url):
+    """Faz um GET com Connection: close e retorna o status HTTP"""
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+    try:
+        escritor.write(f'GET {url} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'
+                       .encode('ascii'))
+        await escritor.drain()
+        resposta = await leitor.read()
+        return int(resposta[9:12])
+    finally:
+        escritor.close()
+
+
+async def cliente(porta, deslocamento, fim, latencias, erros):
+    """Repete requisições numa conexão de cada vez até o fim da medição"""
+    i = deslocamento
+    while time.perf_counter() < fim:
+        url = URLS[i % len(URLS)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(requisitar(porta, url), TIMEOUT)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            status = None
+        if status == 200:
+            latencias.append(time.perf_counter() - inicio)
+        else:
+            erros.append(status)
+
+
+async def carga(porta, conexoes, duracao):
+    """Abre as conexões simultâneas e retorna (req/s, p50 ms, p99 ms, erros)"""
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(porta, i, inicio + duracao, latencias, erros) for i in range(conexoes)
+    ))
+    total = time.perf_counter() - inicio
+    if not latencias:
+        return 0.0, float('nan'), float('nan'), len(erros)
+    tempos = np.array(latencias) * 1000
+    return (len(latencias) / total, float(np.percentile(tempos, 50)),
+            float(np.percentile(tempos, 99)), len(erros))
+
+
+def subir(modo, workers, caminho_csv):
+    """Sobe o servidor e espera todas as URLs responderem (dados carregados)"""
+    porta = porta_livre()
+    ambiente = dict(os.environ, ARQUIVO_CSV=caminho_csv, RECARGA_INTERVALO='0')
+    processo = subprocess.Popen(
+        MODOS[modo](porta, workers), cwd=PASTA_BACKEND, env=ambiente,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(600):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{porta}/teste', timeout=1)
+            break
+        except OSError:
+            time.sleep(0.1)
+    # Aquece os workers e o cache de consultas
+    for _ in range(workers * 2):
+        for url in URLS:
+            urllib.request.urlopen(f'http://127.0.0.1:{porta}{url}', timeout=TIMEOUT).read()
+    return processo, porta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fator', type=int, default=10, help='Quantas vezes replicar o CSV')
+    parser.add_argument('--workers', type=int, default=2, help='Processos em cada modo')
+    parser.add_argument('--conexoes', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--duracao', type=float, default=10, help='Segundos por medição')
+    args = parser.parse_args()
+
+    # 1000 conexões simultâneas precisam de mais descritores que o padrão
+    _, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (maximo, maximo))
+
+    base = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"', dtype=str)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'operadoras.csv')
+        pd.concat([base] * args.fator, ignore_index=True).to_csv(caminho, sep=';', index=False)
+        subprocess.run([sys.executable, 'snapshot.py', caminho], cwd=PASTA_BACKEND,
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        print(f"{len(base) * args.fator} linhas, {args.workers} processos")
+        print(f"{'modo':<10}{'conexões':>9}{'req/s':>10}{'p50 (ms)':>11}{'p99 (ms)':>11}{'erros':>8}")
+        for modo in MODOS:
+            processo, porta = subir(modo, args.workers, caminho)
+            try:
+                for conexoes in args.conexoes:
+                    rps, p50, p99, erros = asyncio.run(carga(porta, conexoes, args.duracao))
+                    print(f"{modo:<10}{conexoes:>9}{rps:>10.1f}{p50:>11.1f}{p99:>11.1f}{erros:>8}")
+            finally:
+                processo.terminate()
+                processo.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark - Busca aproximada (modo=fuzzy)
+
+Mede a latência p50/p99 do índice de trigramas normalizados sobre o CSV
+replicado, com consultas sem acentos e com erros de digitação.
+
+Uso:
+    python benchmarks/bench_fuzzy.py [--fatores 10 100] [--repeticoes 50]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy import IndiceFuzzy
+from bench_indice import carregar_base, medir
+
+CONSULTAS = ['unimed belo orizonte', 'ODONTOPREV', 'amil asistencia medica',
+             'sao paulo saude', 'bradesco seguros', 'hapvida', 'cooperativa de trabalho medico',
+             'xyzwq']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fatores', type=int, nargs='+', default=[10, 100],
+                        help='Quantas vezes replicar o CSV')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    base = carregar_base()
+
+    for fator in args.fatores:
+        df = pd.concat([base] * fator, ignore_index=True)
+
+        inicio = time.perf_counter()
+        indice = IndiceFuzzy(df)
+        construcao = time.perf_counter() - inicio
+
+        print(f"\n{len(df)} linhas (índice fuzzy construído em {construcao:.2f}s)")
+        print(f"{'consulta':<32}{'linhas':>8}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+
+        for consulta in CONSULTAS:
+            encontradas = len(indice.buscar(consulta))
+            p50, p99 = medir(lambda c=consulta: indice.buscar(c), args.repeticoes)
+            print(f"{consulta:<32}{encontradas:>8}{p50:>12.2f}{p99:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
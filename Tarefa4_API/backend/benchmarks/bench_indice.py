@@ -0,0 +1,110 @@
+"""
+Benchmark - Índice de n-gramas x máscara str.contains
+
+Compara a busca simples via índice invertido de n-gramas com o caminho
+anterior (OR de str.contains em todas as colunas) e com a busca sem acentos
+por máscara (normalizar cada célula a cada consulta) sobre o CSV replicado.
+O índice, que já ignora acentos, deve encontrar ao menos as linhas da
+máscara.
+
+Uso:
+    python benchmarks/bench_indice.py [--fatores 1 10 50] [--repeticoes 20]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import limpar_valor
+from indice import IndiceNgramas
+from normalizacao import normalizar
+
+CAMINHO_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'dados_cadastrais_op.csv'
+)
+
+CONSULTAS = ['unimed', 'odontologia', 'São Paulo', 'bradesco saude', '@gmail.com',
+             'xyzabc', 'SP']
+
+
+def carregar_base():
+    """Carrega o CSV e aplica a mesma limpeza de carregar_csv()"""
+    df = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"')
+    for col in df.columns:
+        df[col] = df[col].apply(limpar_valor)
+    return df
+
+
+def busca_mascara(df, consulta):
+    """Caminho anterior: OR de str.contains em todas as colunas"""
+    mascara = pd.Series(False, index=df.index)
+    for col in df.columns:
+        mascara = mascara | df[col].str.contains(
+            consulta, case=False, regex=False, na=False
+        )
+    return mascara.to_numpy().nonzero()[0]
+
+
+def busca_mascara_sem_acentos(df, consulta):
+    """Busca sem acentos sem índice: normaliza cada célula a cada consulta"""
+    alvo = normalizar(consulta)
+    mascara = pd.Series(False, index=df.index)
+    for col in df.columns:
+        mascara = mascara | df[col].map(normalizar).str.contains(alvo, regex=False)
+    return mascara.to_numpy().nonzero()[0]
+
+
+def medir(funcao, repeticoes):
+    """Executa a função e retorna (p50, p99) em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return np.percentile(tempos, 50), np.percentile(tempos, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fatores', type=int, nargs='+', default=[1, 10, 50],
+                        help='Quantas vezes replicar o CSV')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    base = carregar_base()
+
+    for fator in args.fatores:
+        df = pd.concat([base] * fator, ignore_index=True)
+
+        inicio = time.perf_counter()
+        indice = IndiceNgramas(df)
+        construcao = time.perf_counter() - inicio
+
+        print(f"\n{len(df)} linhas (índice construído em {construcao:.2f}s)")
+        print(f"{'consulta':<18}{'linhas':>8}{'máscara p50/p99 (ms)':>26}"
+              f"{'sem acentos p50/p99 (ms)':>28}{'índice p50/p99 (ms)':>26}")
+
+        for consulta in CONSULTAS:
+            linhas = indice.buscar(consulta)
+            assert np.isin(busca_mascara(df, consulta), linhas).all(), consulta
+            assert np.array_equal(busca_mascara_sem_acentos(df, consulta), linhas), consulta
+
+            m50, m99 = medir(lambda c=consulta: busca_mascara(df, c), args.repeticoes)
+            s50, s99 = medir(lambda c=consulta: busca_mascara_sem_acentos(df, c), args.repeticoes)
+            i50, i99 = medir(lambda c=consulta: indice.buscar(c), args.repeticoes)
+            print(f"{consulta:<18}{len(linhas):>8}{m50:>16.2f} / {m99:<8.2f}"
+                  f"{s50:>18.2f} / {s99:<8.2f}{i50:>16.3f} / {i99:<8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark - Leitura do CSV: arquivo inteiro x lotes
+
+Compara a leitura anterior (read_csv do arquivo inteiro, tentando cada
+encoding, e apply(limpar_valor) célula a célula) com a atual (encoding
+detectado por amostra, leitura em lotes limpos e compactados). Cada leitura
+roda num processo novo para medir o pico de memória (ru_maxrss) sem
+interferência das anteriores.
+
+Uso:
+    python benchmarks/bench_leitura_csv.py [--fatores 1 10 100] [--latin1]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+CAMINHO_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'dados_cadastrais_op.csv'
+)
+
+
+def ler_csv_anterior(caminho):
+    """Leitura antes dos lotes: um read_csv inteiro por encoding tentado"""
+    df = None
+    for encoding in ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']:
+        try:
+            df = pd.read_csv(caminho, encoding=encoding, delimiter=';', quotechar='"')
+            break
+        except UnicodeDecodeError:
+            continue
+
+    for col in df.columns:
+        df[col] = df[col].apply(app.limpar_valor)
+    return app.compactar_colunas(df)
+
+
+def rss_mb():
+    """RSS atual do processo, de /proc/self/statm"""
+    with open('/proc/self/statm') as arquivo:
+        return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def medir(modo, caminho):
+    """Lê o CSV no modo pedido e imprime tempo e memória em JSON (processo filho)"""
+    leitura = ler_csv_anterior if modo == 'anterior' else app.ler_csv
+    gc.collect()
+    base = rss_mb()
+
+    inicio = time.perf_counter()
+    df = leitura(caminho)
+    duracao = time.perf_counter() - inicio
+
+    print(json.dumps({
+        'segundos': duracao,
+        'pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - base,
+        'df_mb': df.memory_usage(deep=True).sum() / 2 ** 20,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fatores', type=int, nargs='+', default=[1, 10, 100],
+                        help='Quantas vezes replicar o CSV')
+    parser.add_argument('--latin1', action='store_true',
+                        help='Grava o CSV em latin1 (a leitura anterior lê o arquivo duas vezes)')
+    parser.add_argument('--medir', nargs=2, metavar=('MODO', 'CSV'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir(*args.medir)
+        return
+
+    base = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"', dtype=str)
+    encoding = 'latin1' if args.latin1 else 'utf-8'
+
+    print(f"{'linhas':>9}{'MB':>7}{'modo':>10}{'tempo (s)':>11}{'pico (MB)':>11}{'DataFrame (MB)':>16}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for fator in args.fatores:
+            caminho = os.path.join(pasta, f'operadoras_{fator}.csv')
+            pd.concat([base] * fator, ignore_index=True).to_csv(
+                caminho, sep=';', index=False, encoding=encoding)
+            tamanho = os.path.getsize(caminho) / 2 ** 20
+
+            for modo in ('anterior', 'lotes'):
+                saida = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--medir', modo, caminho],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                r = json.loads(saida.strip().splitlines()[-1])
+                print(f"{len(base) * fator:>9}{tamanho:>7.0f}{modo:>10}{r['segundos']:>11.2f}"
+                      f"{r['pico_mb']:>11.0f}{r['df_mb']:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark - Memória do snapshot (DataFrame + índice)
+
+Mede a memória alocada pelo carregamento do CSV replicado com as colunas
+todas em object, lidas como antes (read_csv do arquivo inteiro e
+apply(limpar_valor) célula a célula, um objeto str por célula), e com a
+leitura atual (app.ler_csv: lotes com as colunas de baixa cardinalidade
+compactadas em category), incluindo o índice de n-gramas.
+
+Uso:
+    python benchmarks/bench_memoria.py [--fatores 1 10 50]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from dados import ConjuntoDados
+
+CAMINHO_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'dados_cadastrais_op.csv'
+)
+
+
+def ler_csv_object(caminho):
+    """Layout anterior: read_csv inteiro e limpar_valor por célula, tudo object"""
+    df = pd.read_csv(caminho, encoding='utf-8', delimiter=';', quotechar='"')
+    for col in df.columns:
+        df[col] = df[col].apply(app.limpar_valor)
+    return df
+
+
+def medir_carga(caminho, leitura):
+    """
+    Carrega o CSV e constrói o snapshot medindo a memória que permanece alocada.
+
+    Args:
+        caminho: CSV a carregar
+        leitura: Função que lê o CSV num DataFrame (ler_csv_object ou app.ler_csv)
+
+    Returns:
+        Tupla (MB do DataFrame, MB do snapshot completo)
+    """
+    gc.collect()
+    tracemalloc.start()
+    df = leitura(caminho)
+    mb_df = tracemalloc.get_traced_memory()[0] / 1e6
+    dados = ConjuntoDados(df, 'bench')
+    gc.collect()
+    mb_total = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del dados
+    return mb_df, mb_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fatores', type=int, nargs='+', default=[1, 10, 50],
+                        help='Quantas vezes replicar o CSV')
+    args = parser.parse_args()
+
+    base = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"', dtype=str)
+
+    print(f"{'linhas':>8}{'object df/total (MB)':>26}{'compacto df/total (MB)':>28}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for fator in args.fatores:
+            caminho = os.path.join(pasta, f'operadoras_{fator}.csv')
+            pd.concat([base] * fator, ignore_index=True).to_csv(caminho, sep=';', index=False)
+
+            obj_df, obj_total = medir_carga(caminho, ler_csv_object)
+            cmp_df, cmp_total = medir_carga(caminho, app.ler_csv)
+            print(f"{len(base) * fator:>8}{obj_df:>16.1f} / {obj_total:<8.1f}{cmp_df:>18.1f} / {cmp_total:<8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark - Ordenação por relevância: seleção parcial x ordenação completa
+
+Sobre o cadastro sintético de gerar_operadoras.py mede o custo na carga
+(montar o IndiceRelevancia) e, para cada consulta, o tempo de pontuar as
+linhas encontradas (chaves, feito uma vez e guardado no cache) e o de
+montar a primeira página e uma página profunda por seleção parcial
+(np.partition) comparado com ordenar todas as chaves. As páginas das duas
+formas devem ser iguais.
+
+Uso:
+    python benchmarks/bench_relevancia.py [--linhas 10000 100000] [--repeticoes 20]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import ler_csv
+from bench_suite import CONSULTAS, caminho_csv
+from indice import IndiceNgramas
+from relevancia import IndiceRelevancia
+
+POR_PAGINA = 20
+
+# Página "profunda" medida além da primeira
+PAGINA_PROFUNDA = 50
+
+
+def mediana_ms(funcao, repeticoes):
+    """Mediana, em ms, de repeticoes chamadas de funcao"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos) * 1000)
+
+
+def ordenacao_completa(chaves, inicio, quantidade):
+    """Página pela ordenação de todas as chaves (sem seleção parcial)"""
+    selecionadas = np.sort(chaves)[inicio:inicio + quantidade]
+    return selecionadas & 0xFFFFFFFF
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    for linhas in args.linhas:
+        indice = IndiceNgramas(ler_csv(caminho_csv(linhas, args.semente)))
+
+        inicio = time.perf_counter()
+        relevancia = IndiceRelevancia(indice)
+        carga = time.perf_counter() - inicio
+        print(f"\n{linhas} linhas: IndiceRelevancia em {carga:.2f}s")
+        print(f"{'consulta':<15}{'resultados':>11}{'chaves (ms)':>13}{'pág. 1 (ms)':>13}"
+              f"{'completa (ms)':>15}{f'pág. {PAGINA_PROFUNDA} (ms)':>15}{'completa (ms)':>15}")
+
+        for tipo, consulta in CONSULTAS.items():
+            encontradas = indice.buscar(consulta)
+            tempo_chaves = mediana_ms(
+                lambda e=encontradas, c=consulta: relevancia.chaves(e, c), args.repeticoes)
+            chaves = relevancia.chaves(encontradas, consulta)
+
+            medidas = []
+            for pagina in (1, PAGINA_PROFUNDA):
+                deslocamento = (pagina - 1) * POR_PAGINA
+                parcial = relevancia.pagina(chaves, deslocamento, POR_PAGINA)[0]
+                completa = ordenacao_completa(chaves, deslocamento, POR_PAGINA)
+                assert parcial.tolist() == completa.tolist(), (consulta, pagina)
+                medidas.append(mediana_ms(
+                    lambda k=chaves, d=deslocamento: relevancia.pagina(k, d, POR_PAGINA),
+                    args.repeticoes))
+                medidas.append(mediana_ms(
+                    lambda k=chaves, d=deslocamento: ordenacao_completa(k, d, POR_PAGINA),
+                    args.repeticoes))
+
+            print(f"{tipo:<15}{len(encontradas):>11}{tempo_chaves:>13.2f}{medidas[0]:>13.3f}"
+                  f"{medidas[1]:>15.3f}{medidas[2]:>15.3f}{medidas[3]:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
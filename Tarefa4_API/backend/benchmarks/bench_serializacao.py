@@ -0,0 +1,87 @@
+"""
+Benchmark - Serialização de uma página de resultados
+
+Compara o caminho anterior (to_dict + jsonify) com a montagem por
+fragmentos JSON pré-serializados, com o json da biblioteca padrão e com
+orjson (se instalado), para páginas de 100 linhas do CSV replicado.
+
+Uso:
+    python benchmarks/bench_serializacao.py [--fator 10] [--por-pagina 100] [--repeticoes 200]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serializacao
+from app import app, jsonify, paginar
+from bench_indice import carregar_base, medir
+from serializacao import LinhasJson, codificar
+
+
+def envelope(resultados, total, por_pagina):
+    """Mesmo formato de resposta de /api/pesquisa"""
+    return {
+        'contagem': total,
+        'paginacao': paginar(range(total), 1, por_pagina)['paginacao'],
+        'resultados': resultados
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fator', type=int, default=10, help='Quantas vezes replicar o CSV')
+    parser.add_argument('--por-pagina', type=int, default=100)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+
+    df = pd.concat([carregar_base()] * args.fator, ignore_index=True)
+    rng = np.random.default_rng(0)
+    paginas = [np.sort(rng.choice(len(df), args.por_pagina, replace=False)) for _ in range(args.repeticoes)]
+
+    def antes():
+        posicoes = paginas[antes.i % len(paginas)]
+        antes.i += 1
+        registros = df.iloc[posicoes].to_dict(orient='records')
+        return jsonify(envelope(registros, len(df), args.por_pagina)).get_data()
+    antes.i = 0
+
+    print(f"{len(df)} linhas, páginas de {args.por_pagina} linhas")
+    print(f"{'caminho':<36}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+
+    with app.app_context():
+        p50, p99 = medir(antes, args.repeticoes)
+    print(f"{'to_dict + jsonify':<36}{p50:>10.3f}{p99:>10.3f}")
+
+    codificadores = [('json', None)]
+    if serializacao.orjson is not None:
+        codificadores.append(('orjson', serializacao.orjson))
+
+    for nome, modulo in codificadores:
+        serializacao.orjson = modulo
+        linhas = LinhasJson(df)
+
+        def depois():
+            posicoes = paginas[depois.i % len(paginas)]
+            depois.i += 1
+            return codificar(envelope(linhas.fragmentos(posicoes), len(df), args.por_pagina))
+
+        # 1ª passada gera os fragmentos (frio); a 2ª só concatena (quente)
+        depois.i = 0
+        p50, p99 = medir(depois, args.repeticoes)
+        print(f"{'fragmentos (' + nome + ', frio)':<36}{p50:>10.3f}{p99:>10.3f}")
+        depois.i = 0
+        p50, p99 = medir(depois, args.repeticoes)
+        print(f"{'fragmentos (' + nome + ', quente)':<36}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Benchmark - Suíte de carga e busca sobre cadastros sintéticos
+
+Para cada tamanho (padrão 10 mil, 100 mil e 1 milhão de linhas) gera o
+cadastro com gerar_operadoras.py e, num processo novo, mede:
+
+- carga: tempo de carregar_csv() (leitura + índices, sem snapshot),
+  memória residente acrescentada e pico;
+- endpoints: p50/p99 e requisições por segundo de cada endpoint de busca
+  com uma consulta comum, uma rara, uma de um caractere e uma sem
+  resultado. Cada requisição medida começa com o cache de consultas vazio;
+  "cache_p50_ms" é a mesma requisição com o resultado já em cache.
+
+Os resultados vão para um JSON (--saida) com o commit e o ambiente; um
+tamanho cujo processo falha (ex: sem memória) fica registrado com "erro" e
+os demais continuam. Com --comparar, cada p50 e a carga são comparados com
+um JSON anterior e o script termina com código 1 se algum ficou mais de
+LIMIAR_REGRESSAO vezes mais lento.
+
+Os CSVs gerados ficam em <tmp>/intuitivex_bench e são reaproveitados.
+
+Uso:
+    python benchmarks/bench_suite.py [--linhas 10000 100000 1000000] [--repeticoes 20]
+                                     [--saida resultados.json] [--comparar anterior.json]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerar_operadoras import SOBRENOME_RARO, gerar, gravar
+
+PASTA_DADOS = os.path.join(tempfile.gettempdir(), 'intuitivex_bench')
+
+# Rotas medidas; {consulta} é substituído (já codificado para URL)
+ENDPOINTS = {
+    'pesquisa': '/api/pesquisa?consulta={consulta}',
+    'avancada': '/api/pesquisa/avancada?campo=Razao_Social&consulta={consulta}',
+    'fuzzy': '/api/pesquisa?consulta={consulta}&modo=fuzzy',
+    'facetas': '/api/facetas?consulta={consulta}',
+    'autocompletar': '/api/autocompletar?prefixo={consulta}',
+}
+
+# Tipos de consulta (ver gerar_operadoras.py)
+CONSULTAS = {
+    'comum': 'unimed',
+    'rara': SOBRENOME_RARO.lower(),
+    'um_caractere': 'a',
+    'sem_resultado': 'xyzqwk',
+}
+
+# p50 (ou tempo de carga) acima disso vezes o anterior conta como regressão
+LIMIAR_REGRESSAO = 1.25
+
+
+def rss_mb():
+    """RSS atual do processo, de /proc/self/statm"""
+    with open('/proc/self/statm') as arquivo:
+        return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def caminho_csv(linhas, semente):
+    """Gera (se ainda não existir) e devolve o CSV sintético do tamanho pedido"""
+    os.makedirs(PASTA_DADOS, exist_ok=True)
+    caminho = os.path.join(PASTA_DADOS, f'operadoras_{linhas}_{semente}.csv')
+    if not os.path.exists(caminho):
+        temporario = caminho + '.tmp'
+        gravar(gerar(linhas, semente), temporario)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def contar(corpo):
+    """Quantidade de resultados de uma resposta JSON de busca"""
+    if 'contagem' in corpo:
+        return corpo['contagem']
+    return len(corpo.get('sugestoes', []))
+
+
+def medir(caminho, repeticoes):
+    """
+    Carrega o CSV e mede os endpoints (roda no processo filho).
+
+    Returns:
+        Dict com 'carga' e 'endpoints'
+    """
+    os.environ.update({'ARQUIVO_CSV': caminho, 'USAR_SNAPSHOT': '0',
+                       'RECARGA_INTERVALO': '0', 'LOG_NIVEL': 'WARNING'})
+    from urllib.parse import quote
+
+    import app
+
+    base = rss_mb()
+    inicio = time.perf_counter()
+    app.carregar_csv()
+    carga = {
+        'segundos': time.perf_counter() - inicio,
+        'rss_mb': rss_mb() - base,
+        'pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - base,
+    }
+
+    cliente = app.app.test_client()
+    endpoints = []
+    for endpoint, rota in ENDPOINTS.items():
+        for tipo, consulta in CONSULTAS.items():
+            url = rota.format(consulta=quote(consulta))
+            resposta = cliente.get(url)
+            assert resposta.status_code == 200, (url, resposta.status_code)
+
+            tempos = []
+            for _ in range(repeticoes):
+                app._cache_consultas.limpar()
+                inicio = time.perf_counter()
+                cliente.get(url)
+                tempos.append(time.perf_counter() - inicio)
+
+            em_cache = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                cliente.get(url)
+                em_cache.append(time.perf_counter() - inicio)
+
+            endpoints.append({
+                'endpoint': endpoint,
+                'consulta': tipo,
+                'termo': consulta,
+                'resultados': contar(resposta.get_json()),
+                'p50_ms': float(np.percentile(tempos, 50) * 1000),
+                'p99_ms': float(np.percentile(tempos, 99) * 1000),
+                'req_s': len(tempos) / sum(tempos),
+                'cache_p50_ms': float(np.percentile(em_cache, 50) * 1000),
+            })
+    return {'carga': carga, 'endpoints': endpoints}
+
+
+def commit_atual():
+    """Hash curto do commit atual (None fora de um repositório git)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultado):
+    """Mostra o resultado de um tamanho em tabela"""
+    carga = resultado['carga']
+    print(f"\n{resultado['linhas']} linhas: carga {carga['segundos']:.2f}s, "
+          f"+{carga['rss_mb']:.0f} MB RSS (pico +{carga['pico_mb']:.0f} MB)")
+    print(f"{'endpoint':<15}{'consulta':<15}{'resultados':>11}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+          f"{'req/s':>9}{'cache p50':>11}")
+    for e in resultado['endpoints']:
+        print(f"{e['endpoint']:<15}{e['consulta']:<15}{e['resultados']:>11}{e['p50_ms']:>10.2f}"
+              f"{e['p99_ms']:>10.2f}{e['req_s']:>9.0f}{e['cache_p50_ms']:>11.2f}")
+
+
+def comparar(atual, anterior):
+    """
+    Compara dois resultados da suíte.
+
+    Args:
+        atual: Resultado desta execução
+        anterior: Resultado lido do JSON anterior
+
+    Returns:
+        Lista de textos, um por medida que regrediu
+    """
+    por_linhas = {r['linhas']: r for r in anterior['resultados']}
+    regressoes = []
+
+    print(f"\nComparação com {anterior['meta'].get('commit')} (atual / anterior)")
+    for resultado in atual['resultados']:
+        antes = por_linhas.get(resultado['linhas'])
+        if antes is None or 'erro' in antes or 'erro' in resultado:
+            continue
+
+        pares = [(f"{resultado['linhas']} carga", resultado['carga']['segundos'],
+                  antes['carga']['segundos'])]
+        medidas = {(e['endpoint'], e['consulta']): e['p50_ms'] for e in antes['endpoints']}
+        for e in resultado['endpoints']:
+            chave = (e['endpoint'], e['consulta'])
+            if chave in medidas:
+                pares.append((f"{resultado['linhas']} {e['endpoint']} {e['consulta']}",
+                               e['p50_ms'], medidas[chave]))
+
+        for nome, valor, valor_antes in pares:
+            razao = valor / valor_antes if valor_antes else float('inf')
+            marca = ''
+            if razao > LIMIAR_REGRESSAO:
+                marca = '  REGRESSÃO'
+                regressoes.append(nome)
+            print(f"{nome:<45}{razao:>7.2f}x{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', default='resultados_bench.json',
+                        help='JSON com os resultados desta execução')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior')
+    parser.add_argument('--medir', nargs=2, metavar=('CSV', 'REPETICOES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.medir[0], int(args.medir[1]))))
+        return
+
+    atual = {
+        'meta': {
+            'commit': commit_atual(),
+            'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'backend_busca': os.environ.get('BACKEND_BUSCA', 'memoria'),
+            'repeticoes': args.repeticoes,
+            'semente': args.semente,
+        },
+        'resultados': [],
+    }
+
+    for linhas in args.linhas:
+        caminho = caminho_csv(linhas, args.semente)
+        processo = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--medir', caminho, str(args.repeticoes)],
+            capture_output=True, text=True
+        )
+        if processo.returncode != 0:
+            # Ex: morto por falta de memória (SIGKILL = -9); os demais tamanhos seguem
+            erro = (processo.stderr.strip().splitlines() or [''])[-1]
+            atual['resultados'].append({'linhas': linhas, 'erro': f'código {processo.returncode} {erro}'.strip()})
+            print(f"\n{linhas} linhas: falhou (código {processo.returncode}) {erro}")
+            continue
+
+        resultado = {'linhas': linhas, **json.loads(processo.stdout.strip().splitlines()[-1])}
+        atual['resultados'].append(resultado)
+        imprimir(resultado)
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(atual, json.load(arquivo))
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark - Memória por worker do gunicorn
+
+Sobe o gunicorn com 1, 4 e 8 workers em três modos e mede RSS e PSS
+(proporcional: páginas compartilhadas divididas entre os processos) de cada
+worker depois que os dados foram carregados:
+
+    privado  cada worker lê o snapshot para a própria memória
+    preload  o master carrega os dados e os workers herdam por copy-on-write
+    mmap     cada worker mapeia o snapshot em memória (páginas compartilhadas)
+
+Uso:
+    python benchmarks/bench_workers.py [--fator 50] [--workers 1 4 8]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import pandas as pd
+
+PASTA_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_CSV = os.path.join(PASTA_BACKEND, 'dados_cadastrais_op.csv')
+
+MODOS = {
+    'privado': {'GUNICORN_PRELOAD': '0', 'SNAPSHOT_MMAP': '0'},
+    'preload': {'GUNICORN_PRELOAD': '1', 'SNAPSHOT_MMAP': '0'},
+    'mmap': {'GUNICORN_PRELOAD': '0', 'SNAPSHOT_MMAP': '1'},
+}
+
+
+def porta_livre():
+    """Retorna uma porta TCP livre"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memoria_kb(pid):
+    """Retorna (RSS, PSS) em kB a partir de /proc/<pid>/smaps_rollup"""
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if partes[0] in ('Rss:', 'Pss:'):
+                valores[partes[0][:-1]] = int(partes[1])
+    return valores['Rss'], valores['Pss']
+
+
+def filhos(pid):
+    """Retorna os pids dos processos filhos (workers)"""
+    with open(f'/proc/{pid}/task/{pid}/children') as arquivo:
+        return [int(p) for p in arquivo.read().split()]
+
+
+def medir(modo, workers, caminho_csv):
+    """Sobe o gunicorn, espera os workers carregarem e mede a memória"""
+    porta = porta_livre()
+    ambiente = dict(os.environ, ARQUIVO_CSV=caminho_csv, GUNICORN_WORKERS=str(workers),
+                    PORT=str(porta), RECARGA_INTERVALO='0', **MODOS[modo])
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app',
+         '--log-level', 'warning'],
+        cwd=PASTA_BACKEND, env=ambiente,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # Espera responder e dá tempo para todos os workers carregarem (post_fork)
+        for _ in range(600):
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{porta}/teste', timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        while len(filhos(processo.pid)) < workers:
+            time.sleep(0.1)
+        time.sleep(3)
+        for _ in range(workers * 4):
+            urllib.request.urlopen(f'http://127.0.0.1:{porta}/api/pesquisa?consulta=unimed')
+
+        medidas = [memoria_kb(pid) for pid in filhos(processo.pid)]
+        return medidas
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fator', type=int, default=50, help='Quantas vezes replicar o CSV')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    base = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"', dtype=str)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'operadoras.csv')
+        pd.concat([base] * args.fator, ignore_index=True).to_csv(caminho, sep=';', index=False)
+        subprocess.run([sys.executable, 'snapshot.py', caminho], cwd=PASTA_BACKEND,
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        print(f"{len(base) * args.fator} linhas")
+        print(f"{'modo':<10}{'workers':>8}{'RSS/worker (MB)':>18}{'PSS/worker (MB)':>18}{'PSS total (MB)':>17}")
+        for modo in MODOS:
+            for workers in args.workers:
+                medidas = medir(modo, workers, caminho)
+                rss = sum(m[0] for m in medidas) / len(medidas) / 1024
+                pss = sum(m[1] for m in medidas) / len(medidas) / 1024
+                total = sum(m[1] for m in medidas) / 1024
+                print(f"{modo:<10}{workers:>8}{rss:>18.1f}{pss:>18.1f}{total:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
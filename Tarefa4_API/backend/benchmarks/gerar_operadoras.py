@@ -0,0 +1,263 @@
+"""
+Gerador de cadastros sintéticos de operadoras
+
+Gera um CSV com as mesmas 20 colunas e o mesmo formato do
+dados_cadastrais_op.csv (separador ;, textos entre aspas), com nomes
+brasileiros acentuados e distribuições de UF, Modalidade e Região de
+Comercialização proporcionais às do arquivo real (SP e Cooperativa Médica
+muito mais frequentes que AP e Seguradora). A semente fixa gera sempre o
+mesmo arquivo para o mesmo número de linhas.
+
+Termos de busca previsíveis (usados por bench_suite.py):
+    "UNIMED"  prefixo de ~20% das razões sociais (consulta comum)
+    "ZÓZIMO"  sobrenome raro, em ~5 de cada 10 mil linhas (consulta rara)
+
+Uso:
+    python benchmarks/gerar_operadoras.py 100000 operadoras_100k.csv [--semente 42]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import argparse
+import csv
+
+import numpy as np
+import pandas as pd
+
+COLUNAS = [
+    'REGISTRO_OPERADORA', 'CNPJ', 'Razao_Social', 'Nome_Fantasia', 'Modalidade',
+    'Logradouro', 'Numero', 'Complemento', 'Bairro', 'Cidade', 'UF', 'CEP', 'DDD',
+    'Telefone', 'Fax', 'Endereco_eletronico', 'Representante', 'Cargo_Representante',
+    'Regiao_de_Comercializacao', 'Data_Registro_ANS'
+]
+
+# Peso de cada UF (linhas por UF no CSV real, +1 para as que não aparecem)
+PESOS_UF = {
+    'SP': 381, 'RJ': 134, 'MG': 130, 'PR': 66, 'RS': 60, 'BA': 40, 'SC': 35,
+    'ES': 35, 'DF': 33, 'GO': 26, 'PE': 22, 'CE': 18, 'MT': 14, 'PB': 12,
+    'MS': 11, 'RN': 10, 'PA': 10, 'AL': 8, 'MA': 8, 'PI': 7, 'SE': 6, 'AM': 6,
+    'TO': 4, 'RO': 4, 'AC': 2, 'AP': 1, 'RR': 1
+}
+
+# Cidades por UF: a primeira é a capital e recebe metade das linhas da UF
+CIDADES = {
+    'SP': ['São Paulo', 'Campinas', 'Ribeirão Preto', 'Santos', 'São José dos Campos',
+           'Sorocaba', 'São Bernardo do Campo', 'Jundiaí', 'Bauru', 'Piracicaba'],
+    'RJ': ['Rio de Janeiro', 'Niterói', 'Petrópolis', 'Nova Iguaçu', 'Campos dos Goytacazes'],
+    'MG': ['Belo Horizonte', 'Uberlândia', 'Juiz de Fora', 'Contagem', 'Além Paraíba',
+           'Montes Claros', 'Governador Valadares'],
+    'PR': ['Curitiba', 'Londrina', 'Maringá', 'Cascavel', 'Foz do Iguaçu'],
+    'RS': ['Porto Alegre', 'Caxias do Sul', 'Pelotas', 'Santa Maria', 'Passo Fundo'],
+    'BA': ['Salvador', 'Feira de Santana', 'Vitória da Conquista', 'Ilhéus'],
+    'SC': ['Florianópolis', 'Joinville', 'Blumenau', 'Chapecó', 'Criciúma'],
+    'ES': ['Vitória', 'Vila Velha', 'Serra', 'Cachoeiro de Itapemirim'],
+    'DF': ['Brasília'],
+    'GO': ['Goiânia', 'Anápolis', 'Rio Verde'],
+    'PE': ['Recife', 'Jaboatão dos Guararapes', 'Caruaru', 'Petrolina'],
+    'CE': ['Fortaleza', 'Juazeiro do Norte', 'Sobral'],
+    'MT': ['Cuiabá', 'Várzea Grande', 'Rondonópolis'],
+    'PB': ['João Pessoa', 'Campina Grande'],
+    'MS': ['Campo Grande', 'Dourados'],
+    'RN': ['Natal', 'Mossoró'],
+    'PA': ['Belém', 'Ananindeua', 'Santarém'],
+    'AL': ['Maceió', 'Arapiraca'],
+    'MA': ['São Luís', 'Imperatriz'],
+    'PI': ['Teresina', 'Parnaíba'],
+    'SE': ['Aracaju'],
+    'AM': ['Manaus'],
+    'TO': ['Palmas', 'Araguaína'],
+    'RO': ['Porto Velho', 'Ji-Paraná'],
+    'AC': ['Rio Branco'],
+    'AP': ['Macapá'],
+    'RR': ['Boa Vista'],
+}
+
+# Peso de cada modalidade (linhas por modalidade no CSV real)
+PESOS_MODALIDADE = {
+    'Cooperativa Médica': 262, 'Medicina de Grupo': 249, 'Administradora de Benefícios': 178,
+    'Odontologia de Grupo': 149, 'Autogestão': 144, 'Cooperativa odontológica': 89,
+    'Filantropia': 33, 'Seguradora Especializada em Saúde': 7
+}
+
+# Região de comercialização ('' = não informada)
+PESOS_REGIAO = {'5': 471, '6': 172, '4': 172, '': 156, '3': 71, '1': 51, '2': 18}
+
+# Sobrenomes e nomes: os primeiros são os mais frequentes (distribuição de Zipf)
+SOBRENOMES = [
+    'SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'RODRIGUES', 'FERREIRA', 'ALVES', 'PEREIRA',
+    'LIMA', 'GOMES', 'GONÇALVES', 'RIBEIRO', 'CARVALHO', 'ARAÚJO', 'MARTINS', 'ROCHA',
+    'BARBOSA', 'CONCEIÇÃO', 'MENDONÇA', 'CAVALCANTI', 'BRAGANÇA', 'ASSUNÇÃO', 'FALCÃO',
+    'MAGALHÃES', 'GUIMARÃES', 'LEÃO', 'ROMÃO', 'SIMÕES', 'DAMIÃO', 'NEGRÃO', 'BRANDÃO',
+    'PIMENTA', 'QUEIRÓS', 'AZEVÊDO', 'FONSÊCA', 'MOREIRA', 'TEIXEIRA', 'CORRÊA', 'NÓBREGA',
+    'BITTENCOURT', 'VASCONCELOS', 'ASSIS', 'CÂMARA', 'SÁ', 'TAVARES', 'PRADO', 'AMARAL'
+]
+NOMES = [
+    'JOÃO', 'MARIA', 'JOSÉ', 'ANTÔNIO', 'FRANCISCO', 'ANA', 'LUIZ', 'PAULO', 'CARLOS',
+    'MÁRCIA', 'LÚCIA', 'SÉRGIO', 'FÁBIO', 'MÔNICA', 'CÉLIA', 'ROGÉRIO', 'PATRÍCIA',
+    'VINÍCIUS', 'ANDRÉ', 'JÚLIA', 'CAMILA', 'RENATA', 'INÊS', 'TÂNIA', 'MÁRIO', 'HÉLIO',
+    'CONCEIÇÃO', 'APARECIDA', 'RAIMUNDO', 'SEBASTIÃO', 'JOAQUIM', 'GABRIEL', 'LETÍCIA'
+]
+SANTOS = ['SÃO JOSÉ', 'SANTA CASA', 'SÃO LUCAS', 'SANTA LÚCIA', 'NOSSA SENHORA DA CONCEIÇÃO',
+          'SÃO FRANCISCO', 'SANTA MÔNICA', 'SÃO CAMILO', 'SANTO ANTÔNIO', 'SÃO VICENTE DE PAULO']
+
+# Sobrenome raro: 1 em 10 mil sobrenomes sorteados (consulta rara de bench_suite.py)
+SOBRENOME_RARO = 'ZÓZIMO'
+TAXA_RARO = 1e-4
+
+PREFIXOS = ['UNIMED', 'SAÚDE', 'ODONTO', 'CLÍNICA', 'HOSPITAL', 'ASSOCIAÇÃO', 'CAIXA DE ASSISTÊNCIA',
+            'FUNDAÇÃO', 'INSTITUTO', 'PLANO DE SAÚDE', 'ASSISTÊNCIA MÉDICA', 'GRUPO']
+PESOS_PREFIXOS = [20, 12, 10, 8, 8, 8, 6, 6, 6, 6, 5, 5]
+SUFIXOS = ['LTDA', 'LTDA.', 'S.A.', 'S/A', 'COOPERATIVA DE TRABALHO MÉDICO', 'ADMINISTRADORA DE BENEFÍCIOS LTDA',
+           'OPERADORA DE PLANOS DE SAÚDE LTDA', 'EIRELI', 'ME']
+
+LOGRADOUROS = ['RUA', 'AVENIDA', 'AV.', 'TRAVESSA', 'PRAÇA', 'ALAMEDA', 'RODOVIA', 'ESTRADA']
+BAIRROS = ['CENTRO', 'JARDIM AMÉRICA', 'VILA MARIANA', 'BELA VISTA', 'PRAÇA DA BANDEIRA', 'BOA VIAGEM',
+           'SAVASSI', 'BOTAFOGO', 'MOINHOS DE VENTO', 'ÁGUA VERDE', 'JARDIM PAULISTA', 'VILA ROMANA',
+           'CAMPO BELO', 'FUNCIONÁRIOS', 'ALDEOTA', 'PITUBA', 'MEIRELES', 'COPACABANA', 'TIJUCA']
+COMPLEMENTOS = ['SALA', 'ANDAR', 'CONJUNTO', 'LOJA', 'BLOCO']
+CARGOS = ['DIRETOR PRESIDENTE', 'SÓCIO ADMINISTRADOR', 'REPRESENTANTE', 'DIRETOR EXECUTIVO',
+          'PRESIDENTE', 'DIRETORA ADMINISTRATIVA', 'SÓCIO ADMINISTRADORA', 'PROCURADOR']
+DOMINIOS = ['gmail.com', 'hotmail.com', 'com.br', 'org.br', 'uol.com.br', 'yahoo.com.br']
+PESOS_DOMINIOS = [30, 10, 35, 15, 5, 5]
+
+# Fração de valores vazios nas colunas opcionais (como no CSV real)
+VAZIOS = {'Nome_Fantasia': 0.14, 'Complemento': 0.5, 'DDD': 0.11, 'Telefone': 0.11, 'Fax': 0.57}
+
+
+def _escolher(rng, opcoes, n, pesos=None):
+    """Sorteia n valores (array object) com os pesos dados ou com Zipf pela ordem"""
+    opcoes = np.asarray(opcoes, dtype=object)
+    if pesos is None:
+        pesos = 1 / np.arange(1, len(opcoes) + 1)
+    pesos = np.asarray(pesos, dtype=float)
+    return opcoes[rng.choice(len(opcoes), size=n, p=pesos / pesos.sum())]
+
+
+def _digitos(rng, n, quantidade):
+    """n textos com `quantidade` dígitos aleatórios"""
+    return pd.Series(rng.integers(0, 10 ** quantidade, size=n)).astype(str).str.zfill(quantidade).to_numpy(object)
+
+
+def _sobrenomes(rng, n):
+    """Sobrenomes sorteados, com o sobrenome raro em ~TAXA_RARO das linhas"""
+    sobrenomes = _escolher(rng, SOBRENOMES, n)
+    sobrenomes[rng.random(n) < TAXA_RARO] = SOBRENOME_RARO
+    return sobrenomes
+
+
+def _vazio(rng, valores, taxa):
+    """Troca ~taxa dos valores por ''"""
+    valores = valores.copy()
+    valores[rng.random(len(valores)) < taxa] = ''
+    return valores
+
+
+def _sem_acentos_minusculas(valores):
+    """Texto para e-mails: minúsculas, sem acentos e sem espaços"""
+    distintos = pd.Series(pd.unique(valores))
+    convertidos = (distintos.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+                   .str.lower().str.replace(r'[^a-z0-9]', '', regex=True))
+    return pd.Series(valores).map(dict(zip(distintos, convertidos))).to_numpy(object)
+
+
+def gerar(linhas, semente=42):
+    """
+    Gera o cadastro sintético.
+
+    Args:
+        linhas: Quantidade de operadoras
+        semente: Semente do gerador aleatório
+
+    Returns:
+        DataFrame de str com as colunas de COLUNAS
+    """
+    rng = np.random.default_rng(semente)
+    n = linhas
+
+    uf = _escolher(rng, list(PESOS_UF), n, list(PESOS_UF.values()))
+    cidade = np.empty(n, dtype=object)
+    for sigla, cidades in CIDADES.items():
+        posicoes = np.flatnonzero(uf == sigla)
+        pesos = [len(cidades)] + [1] * (len(cidades) - 1)
+        cidade[posicoes] = _escolher(rng, cidades, len(posicoes), pesos)
+
+    # Razão social: prefixo + santo, nome ou sobrenomes + sufixo
+    meio = np.where(rng.random(n) < 0.3,
+                    _escolher(rng, SANTOS, n),
+                    _escolher(rng, NOMES, n) + ' ' + _sobrenomes(rng, n) + ' ' + _sobrenomes(rng, n))
+    razao = (_escolher(rng, PREFIXOS, n, PESOS_PREFIXOS) + ' ' + meio + ' '
+             + _escolher(rng, SUFIXOS, n))
+    fantasia = _escolher(rng, PREFIXOS, n, PESOS_PREFIXOS) + ' ' + _sobrenomes(rng, n)
+
+    representante = (_escolher(rng, NOMES, n) + ' ' + _sobrenomes(rng, n) + ' '
+                     + _sobrenomes(rng, n))
+    email = (_sem_acentos_minusculas(_escolher(rng, NOMES, n)) + '.'
+             + _sem_acentos_minusculas(_sobrenomes(rng, n)) + '@'
+             + _escolher(rng, DOMINIOS, n, PESOS_DOMINIOS))
+
+    numero = pd.Series(rng.integers(1, 5000, size=n)).astype(str).to_numpy(object)
+    numero[rng.random(n) < 0.02] = 'S/N'
+    complemento = (_escolher(rng, COMPLEMENTOS, n) + ' '
+                   + pd.Series(rng.integers(1, 2000, size=n)).astype(str).to_numpy(object))
+
+    # Registros e CNPJs únicos (7919 é primo com 10^8: a sequência não se repete)
+    registro = (300000 + np.arange(n)).astype(str).astype(object)
+    base_cnpj = pd.Series((np.arange(n, dtype=np.int64) * 7919 + 1234567) % 10 ** 8)
+    cnpj = (base_cnpj.astype(str).str.zfill(8) + '0001' + pd.Series(_digitos(rng, n, 2))).to_numpy(object)
+
+    inicio = np.datetime64('1999-01-01')
+    datas = (inicio + rng.integers(0, 27 * 365, size=n).astype('timedelta64[D]')).astype(str).astype(object)
+
+    df = pd.DataFrame({
+        'REGISTRO_OPERADORA': registro,
+        'CNPJ': cnpj,
+        'Razao_Social': razao,
+        'Nome_Fantasia': fantasia,
+        'Modalidade': _escolher(rng, list(PESOS_MODALIDADE), n, list(PESOS_MODALIDADE.values())),
+        'Logradouro': _escolher(rng, LOGRADOUROS, n) + ' ' + _escolher(rng, NOMES, n) + ' ' + _sobrenomes(rng, n),
+        'Numero': numero,
+        'Complemento': complemento,
+        'Bairro': _escolher(rng, BAIRROS, n),
+        'Cidade': cidade,
+        'UF': uf,
+        'CEP': _digitos(rng, n, 8),
+        'DDD': pd.Series(rng.integers(11, 100, size=n)).astype(str).to_numpy(object),
+        'Telefone': _digitos(rng, n, 8),
+        'Fax': _digitos(rng, n, 8),
+        'Endereco_eletronico': email,
+        'Representante': representante,
+        'Cargo_Representante': _escolher(rng, CARGOS, n),
+        'Regiao_de_Comercializacao': _escolher(rng, list(PESOS_REGIAO), n, list(PESOS_REGIAO.values())),
+        'Data_Registro_ANS': datas,
+    }, columns=COLUNAS)
+
+    for coluna, taxa in VAZIOS.items():
+        df[coluna] = _vazio(rng, df[coluna].to_numpy(object), taxa)
+    return df
+
+
+def gravar(df, caminho):
+    """
+    Grava o cadastro no formato do CSV real.
+
+    Args:
+        df: DataFrame gerado por gerar()
+        caminho: Arquivo de destino
+    """
+    # Vazios saem como "": o read_csv lê "" e ;; da mesma forma (NaN)
+    df.to_csv(caminho, sep=';', index=False, quoting=csv.QUOTE_ALL, encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('linhas', type=int, help='Quantidade de operadoras')
+    parser.add_argument('destino', help='CSV de saída')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    gravar(gerar(args.linhas, args.semente), args.destino)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Interface dos backends de busca textual.
+
+O backend responde à busca por substring, sem diferenciar maiúsculas nem
+acentos (textos e consulta passam por normalizacao.normalizar), usada
+por /api/pesquisa, /api/pesquisa/avancada (campo + consulta), exportação,
+facetas, lote e filtros contem. Paginação, cursor, cache de consultas e facetas trabalham
+sobre o array de posições devolvido: backends que devolvem as mesmas
+posições produzem as mesmas respostas.
+
+Backends (variável de ambiente BACKEND_BUSCA):
+    memoria  IndiceNgramas (indice.py): listas de trigramas em arrays numpy
+    sqlite   BuscaSqlite (busca_sqlite.py): tabela FTS5 com tokenizer
+             trigram num arquivo SQLite compartilhado pelos workers
+"""
+
+
+BACKENDS = ('memoria', 'sqlite')
+
+
+class BackendBusca:
+    """
+    Busca por substring nas colunas de um snapshot.
+    """
+
+    # Valor de BACKEND_BUSCA que seleciona o backend
+    nome = None
+
+    def buscar(self, consulta, coluna=None):
+        """
+        Busca as linhas que contêm a consulta (sem diferenciar maiúsculas nem acentos).
+
+        Args:
+            consulta: Termo de busca ('' devolve todas as linhas)
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Array ordenado com as posições das linhas encontradas
+        """
+        raise NotImplementedError
+
+    def contar(self, consulta, coluna=None):
+        """
+        Conta as linhas que contêm a consulta.
+
+        Args:
+            consulta: Termo de busca
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Quantidade de linhas
+        """
+        return len(self.buscar(consulta, coluna=coluna))
+
+    def estimar(self, consulta, coluna=None):
+        """
+        Limite superior de quantas linhas contêm a consulta (plano dos filtros).
+
+        Sem um limite mais barato, é a contagem exata.
+
+        Args:
+            consulta: Termo de busca
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Quantidade de linhas (ou um limite superior)
+        """
+        return self.contar(consulta, coluna=coluna)
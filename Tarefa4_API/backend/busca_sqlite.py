@@ -0,0 +1,224 @@
+"""
+Backend de busca em SQLite com FTS5 (tokenizer trigram).
+
+O banco guarda o texto de cada célula normalizado (sem acentos, casefold,
+a mesma forma do IndiceNgramas) numa tabela comum e indexa essa tabela com uma tabela
+virtual FTS5 de tokenizer trigram. Consultas de 3 ou mais caracteres são
+uma frase FTS5, que com trigramas equivale a "contém a substring";
+consultas de 1 ou 2 caracteres conferem a tabela com instr(). O rowid é a
+posição da linha no DataFrame.
+
+O arquivo fica ao lado do CSV (<csv>.sqlite/<versão>.db) e é aberto
+somente leitura e mapeado em memória: o índice não ocupa memória privada
+dos processos e os workers compartilham as páginas pelo sistema operacional.
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+import numpy as np
+
+from busca import BackendBusca
+from indice import N, codificar_coluna, texto_de_busca
+from normalizacao import normalizar
+
+# Bytes do arquivo mapeados em memória por conexão
+MMAP_BYTES = 1024 * 1024 * 1024
+
+# Linhas inseridas por transação na construção
+TAMANHO_LOTE = 10000
+
+# Incrementar quando o conteúdo das tabelas mudar (bancos antigos são refeitos)
+VERSAO_FORMATO = 2
+
+_contador_memoria = itertools.count(1)
+
+
+def pasta_bancos(caminho_csv):
+    """Pasta dos bancos SQLite de um CSV"""
+    return caminho_csv + '.sqlite'
+
+
+def _frase(texto):
+    """Consulta FTS5 que casa o texto exato (aspas escapadas)"""
+    return '"' + texto.replace('"', '""') + '"'
+
+
+def _construir(conexao, df):
+    """Cria e preenche as tabelas a partir do DataFrame"""
+    nomes = [f'c{j}' for j in range(len(df.columns))]
+    lista = ', '.join(nomes)
+
+    conexao.execute('PRAGMA journal_mode = OFF')
+    conexao.execute('PRAGMA synchronous = OFF')
+    conexao.execute(f'CREATE TABLE linhas (id INTEGER PRIMARY KEY, {lista})')
+    conexao.execute(
+        f"CREATE VIRTUAL TABLE busca USING fts5({lista}, content='linhas', content_rowid='id', "
+        f"tokenize='trigram case_sensitive 1')"
+    )
+    conexao.execute('CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT)')
+
+    # Cada valor distinto é convertido uma vez, como no IndiceNgramas
+    colunas = []
+    for col in df.columns:
+        codigos, valores = codificar_coluna(df[col])
+        colunas.append(np.array([texto_de_busca(valor) for valor in valores], dtype=object)[codigos])
+
+    insercao = f'INSERT INTO linhas VALUES (?, {", ".join("?" * len(nomes))})'
+    for inicio in range(0, len(df), TAMANHO_LOTE):
+        fim = min(inicio + TAMANHO_LOTE, len(df))
+        conexao.executemany(insercao, zip(range(inicio, fim),
+                                          *(valores[inicio:fim].tolist() for valores in colunas)))
+    conexao.execute("INSERT INTO busca(busca) VALUES ('rebuild')")
+    conexao.execute("INSERT INTO busca(busca) VALUES ('optimize')")
+    conexao.execute('INSERT INTO meta VALUES (?, ?)',
+                    ('colunas', json.dumps(list(df.columns), ensure_ascii=False)))
+    conexao.execute('INSERT INTO meta VALUES (?, ?)', ('linhas', str(len(df))))
+    conexao.execute('INSERT INTO meta VALUES (?, ?)', ('formato', str(VERSAO_FORMATO)))
+    conexao.commit()
+
+
+def _corresponde(caminho, df):
+    """Confere se o banco existente foi gerado, neste formato, para as colunas e linhas do DataFrame"""
+    try:
+        conexao = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True)
+        try:
+            meta = dict(conexao.execute('SELECT chave, valor FROM meta'))
+        finally:
+            conexao.close()
+    except sqlite3.Error:
+        return False
+    return (meta.get('colunas') == json.dumps(list(df.columns), ensure_ascii=False)
+            and meta.get('linhas') == str(len(df))
+            and meta.get('formato') == str(VERSAO_FORMATO))
+
+
+class BuscaSqlite(BackendBusca):
+    """
+    Busca por substring numa tabela FTS5 (tokenizer trigram).
+    """
+
+    nome = 'sqlite'
+
+    def __init__(self, uri, colunas, n_linhas, guardia=None):
+        """
+        Args:
+            uri: URI SQLite do banco (arquivo ou memória compartilhada)
+            colunas: Colunas do DataFrame, na ordem das colunas c0, c1...
+            n_linhas: Quantidade de linhas
+            guardia: Conexão que mantém vivo um banco em memória
+        """
+        self.uri = uri
+        self.colunas = list(colunas)
+        self.n_linhas = n_linhas
+        self._nomes = [f'c{j}' for j in range(len(self.colunas))]
+        self._guardia = guardia
+        self._local = threading.local()
+
+    @classmethod
+    def abrir(cls, df, versao=None, caminho_csv=None):
+        """
+        Abre o banco da versão ao lado do CSV, construindo-o se necessário.
+
+        O banco é gravado num arquivo temporário e renomeado no final, então
+        outro processo nunca abre um banco pela metade. Bancos de outras
+        versões são removidos.
+
+        Args:
+            df: DataFrame do snapshot
+            versao: Versão do snapshot (nome do arquivo)
+            caminho_csv: CSV de origem; sem ele o banco fica em memória
+
+        Returns:
+            BuscaSqlite
+        """
+        if caminho_csv is None:
+            uri = f'file:busca-{next(_contador_memoria)}?mode=memory&cache=shared'
+            guardia = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            _construir(guardia, df)
+            return cls(uri, df.columns, len(df), guardia=guardia)
+
+        pasta = pasta_bancos(caminho_csv)
+        destino = os.path.join(pasta, f'{versao}.db')
+        os.makedirs(pasta, exist_ok=True)
+
+        if not _corresponde(destino, df):
+            descritor, temporario = tempfile.mkstemp(prefix='.tmp-', suffix='.db', dir=pasta)
+            os.close(descritor)
+            try:
+                conexao = sqlite3.connect(temporario)
+                try:
+                    _construir(conexao, df)
+                finally:
+                    conexao.close()
+                os.replace(temporario, destino)
+            except Exception:
+                os.remove(temporario)
+                raise
+
+            for nome in os.listdir(pasta):
+                if nome != f'{versao}.db' and not nome.startswith('.tmp-'):
+                    os.remove(os.path.join(pasta, nome))
+
+        return cls(f'file:{destino}?mode=ro', df.columns, len(df))
+
+    def _conexao(self):
+        """Conexão somente leitura da thread atual"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            conexao.execute(f'PRAGMA mmap_size = {MMAP_BYTES}')
+            conexao.execute('PRAGMA query_only = 1')
+            self._local.conexao = conexao
+        return conexao
+
+    def _consulta(self, selecao, alvo, coluna):
+        """Monta o SQL e os parâmetros da busca de um alvo já normalizado"""
+        if len(alvo) >= N:
+            tabela = 'busca' if coluna is None else self._nomes[self.colunas.index(coluna)]
+            return f'SELECT {selecao} FROM busca WHERE {tabela} MATCH ?', (_frase(alvo),)
+
+        nomes = self._nomes if coluna is None else [self._nomes[self.colunas.index(coluna)]]
+        condicao = ' OR '.join(f'instr({nome}, ?) > 0' for nome in nomes)
+        return f'SELECT {selecao} FROM linhas WHERE {condicao}', (alvo,) * len(nomes)
+
+    def buscar(self, consulta, coluna=None):
+        """
+        Busca as linhas que contêm a consulta (sem diferenciar maiúsculas nem acentos).
+
+        Args:
+            consulta: Termo de busca
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Array ordenado com as posições das linhas encontradas
+        """
+        alvo = normalizar(consulta)
+        if not alvo:
+            return np.arange(self.n_linhas)
+
+        sql, parametros = self._consulta('rowid', alvo, coluna)
+        cursor = self._conexao().execute(sql + ' ORDER BY rowid', parametros)
+        return np.fromiter((linha[0] for linha in cursor), dtype=np.int64)
+
+    def contar(self, consulta, coluna=None):
+        """
+        Conta as linhas que contêm a consulta, sem trazer as posições.
+
+        Args:
+            consulta: Termo de busca
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Quantidade de linhas
+        """
+        alvo = normalizar(consulta)
+        if not alvo:
+            return self.n_linhas
+
+        sql, parametros = self._consulta('count(*)', alvo, coluna)
+        return self._conexao().execute(sql, parametros).fetchone()[0]
@@ -0,0 +1,185 @@
+"""
+Cache de resultados de busca com despejo LRU.
+
+Guarda o array de posições das linhas encontradas para cada consulta
+normalizada, limitado por quantidade de entradas e por bytes. Todas as
+páginas de uma mesma consulta são servidas a partir de uma única busca.
+
+Requisições simultâneas da mesma consulta ainda não guardada também são
+agrupadas (single-flight): a primeira calcula, as demais esperam por ela e
+recebem o mesmo array.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class _Calculo:
+    """Busca em andamento: as requisições que chegam depois esperam o evento"""
+
+    def __init__(self):
+        self.pronto = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class CacheConsultas:
+    """
+    Cache LRU de arrays de posições limitado por entradas e por bytes.
+    """
+
+    def __init__(self, max_entradas=1024, max_bytes=64 * 1024 * 1024, observador=None):
+        """
+        Args:
+            max_entradas: Quantidade máxima de consultas guardadas
+            max_bytes: Soma máxima do tamanho (nbytes) dos arrays guardados
+            observador: Função chamada com 'acerto', 'falha' ou 'coalescida'
+                a cada consulta (ex: métricas), fora do lock
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.observador = observador
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.coalescidas = 0
+
+    def obter(self, chave):
+        """
+        Retorna o array guardado para a chave, ou None.
+
+        Args:
+            chave: Tupla normalizada (campo, consulta)
+
+        Returns:
+            Array de posições ou None se ausente
+        """
+        with self._lock:
+            linhas = self._entradas.get(chave)
+            if linhas is None:
+                self.falhas += 1
+            else:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+
+        self._observar('falha' if linhas is None else 'acerto')
+        return linhas
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Retorna o array da chave, calculando-o uma única vez se ausente.
+
+        Se outra thread já está calculando a mesma chave, espera por ela e
+        devolve o mesmo resultado (ou a mesma exceção) em vez de repetir a busca.
+
+        Args:
+            chave: Tupla normalizada (versão, campo, consulta)
+            calcular: Função sem argumentos que retorna o array
+
+        Returns:
+            Array de posições (somente leitura)
+        """
+        with self._lock:
+            linhas = self._entradas.get(chave)
+            if linhas is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+            else:
+                calculo = self._em_andamento.get(chave)
+                responsavel = calculo is None
+                if responsavel:
+                    calculo = self._em_andamento[chave] = _Calculo()
+                    self.falhas += 1
+                else:
+                    self.coalescidas += 1
+
+        if linhas is not None:
+            self._observar('acerto')
+            return linhas
+
+        self._observar('falha' if responsavel else 'coalescida')
+        if not responsavel:
+            calculo.pronto.wait()
+            if calculo.erro is not None:
+                raise calculo.erro
+            return calculo.resultado
+
+        try:
+            linhas = calcular()
+            linhas.setflags(write=False)
+            self.guardar(chave, linhas)
+            calculo.resultado = linhas
+            return linhas
+        except Exception as e:
+            calculo.erro = e
+            raise
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            calculo.pronto.set()
+
+    def _observar(self, resultado):
+        """Avisa o observador (se houver) do resultado de uma consulta"""
+        if self.observador is not None:
+            self.observador(resultado)
+
+    def guardar(self, chave, linhas):
+        """
+        Guarda o array para a chave, despejando as entradas menos usadas.
+
+        Arrays maiores que max_bytes não são guardados.
+
+        Args:
+            chave: Tupla normalizada (campo, consulta)
+            linhas: Array numpy de posições (fica somente leitura)
+        """
+        tamanho = linhas.nbytes
+        if tamanho > self.max_bytes:
+            return
+
+        linhas.setflags(write=False)
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior.nbytes
+
+            self._entradas[chave] = linhas
+            self._bytes += tamanho
+
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                _, removido = self._entradas.popitem(last=False)
+                self._bytes -= removido.nbytes
+                self.despejos += 1
+
+    def limpar(self):
+        """Remove todas as entradas (ex: quando os dados são recarregados)"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict com entradas, bytes, acertos, falhas, despejos, taxa de acerto,
+            requisições agrupadas a uma busca em andamento e buscas em andamento
+        """
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_entradas': self.max_entradas,
+                'max_bytes': self.max_bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'despejos': self.despejos,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'coalescidas': self.coalescidas,
+                'em_andamento': len(self._em_andamento)
+            }
@@ -0,0 +1,104 @@
+"""
+Cache HTTP (ETag, Cache-Control) e compressão das respostas da API.
+
+As respostas de busca só mudam quando o snapshot dos dados muda, então o
+ETag é a versão do snapshot mais a URL normalizada (caminho e parâmetros
+em ordem). Um cliente que reenvia o ETag em If-None-Match recebe 304 sem
+que a busca seja refeita.
+
+Corpos JSON acima de um tamanho mínimo são comprimidos com brotli (se o
+pacote brotli estiver instalado e o cliente aceitar) ou gzip.
+"""
+
+import gzip
+import hashlib
+from urllib.parse import urlencode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compressões que o servidor sabe gerar, da preferida para a menos preferida
+CODIFICACOES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def gerar_etag(versao, caminho, parametros):
+    """
+    Gera o ETag de uma resposta a partir da versão dos dados e da URL.
+
+    Args:
+        versao: Versão do snapshot
+        caminho: Caminho da requisição
+        parametros: MultiDict com a query string
+
+    Returns:
+        Valor do ETag (sem aspas)
+    """
+    consulta = urlencode(sorted(parametros.items(multi=True)))
+    resumo = hashlib.sha1(f'{caminho}?{consulta}'.encode('utf-8')).hexdigest()[:16]
+    return f'{versao}-{resumo}'
+
+
+def escolher_codificacao(aceitas, disponiveis=CODIFICACOES):
+    """
+    Escolhe a compressão aceita pelo cliente, na ordem de preferência.
+
+    Args:
+        aceitas: request.accept_encodings
+        disponiveis: Codificações candidatas, da preferida para a menos preferida
+
+    Returns:
+        'br', 'gzip' ou None
+    """
+    for codificacao in disponiveis:
+        if aceitas.quality(codificacao) > 0:
+            return codificacao
+    return None
+
+
+def comprimir(dados, codificacao):
+    """
+    Comprime bytes com a codificação escolhida.
+
+    Args:
+        dados: Conteúdo
+        codificacao: 'br' ou 'gzip'
+
+    Returns:
+        Conteúdo comprimido
+    """
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=5)
+    return gzip.compress(dados, compresslevel=6, mtime=0)
+
+
+def comprimir_resposta(resposta, aceitas, minimo):
+    """
+    Comprime o corpo de uma resposta JSON, se valer a pena.
+
+    Respostas em streaming, já comprimidas, sem sucesso ou menores que o
+    mínimo ficam como estão.
+
+    Args:
+        resposta: Response do Flask
+        aceitas: request.accept_encodings
+        minimo: Tamanho mínimo do corpo, em bytes
+
+    Returns:
+        A mesma resposta
+    """
+    if (resposta.status_code != 200 or resposta.direct_passthrough or resposta.is_streamed
+            or resposta.mimetype != 'application/json'
+            or 'Content-Encoding' in resposta.headers):
+        return resposta
+
+    resposta.vary.add('Accept-Encoding')
+    dados = resposta.get_data()
+    codificacao = escolher_codificacao(aceitas)
+    if len(dados) < minimo or codificacao is None:
+        return resposta
+
+    resposta.set_data(comprimir(dados, codificacao))
+    resposta.headers['Content-Encoding'] = codificacao
+    return resposta
@@ -0,0 +1,113 @@
+"""
+Paginação por cursor (keyset) sobre a lista ordenada de linhas encontradas.
+
+O cursor é opaco para o cliente: codifica a versão do snapshot, a consulta,
+a posição e a chave (REGISTRO_OPERADORA) da última linha entregue. A página
+seguinte começa por busca binária na lista de posições, então o custo não
+depende de quão longe o cliente já paginou. Se os dados forem recarregados
+no meio da navegação, a chave localiza a linha no snapshot novo.
+"""
+
+import base64
+import hashlib
+import json
+
+import numpy as np
+
+from normalizacao import normalizar
+
+
+class CursorInvalido(Exception):
+    """Cursor malformado, de outra consulta ou que não pode ser retomado"""
+
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def identificar_consulta(campo, consulta, filtros=''):
+    """
+    Retorna um identificador curto da consulta normalizada.
+
+    Args:
+        campo: Coluna da busca (None para todas)
+        consulta: Termo de busca
+        filtros: identificar_filtros() dos filtros da busca avançada, se houver
+
+    Returns:
+        Hash hexadecimal de 8 caracteres
+    """
+    chave = f'{campo or ""}\x00{normalizar(consulta)}'
+    if filtros:
+        chave += f'\x00{filtros}'
+    return hashlib.sha1(chave.encode('utf-8')).hexdigest()[:8]
+
+
+def codificar_cursor(conteudo):
+    """Codifica o dict do cursor em base64 url-safe"""
+    bruto = json.dumps(conteudo, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica um cursor gerado por codificar_cursor.
+
+    Raises:
+        CursorInvalido: Se o cursor não puder ser lido
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        conteudo = json.loads(bruto.decode('utf-8'))
+        int(conteudo['p'])
+        conteudo['v'], conteudo['q']
+    except (ValueError, KeyError, TypeError):
+        raise CursorInvalido('Cursor inválido')
+    return conteudo
+
+
+def paginar_por_cursor(dados, linhas, cursor, por_pagina, id_consulta):
+    """
+    Retorna a página seguinte ao cursor e o cursor da próxima página.
+
+    Args:
+        dados: ConjuntoDados da requisição
+        linhas: Array ordenado com as posições das linhas encontradas
+        cursor: Cursor recebido ('' para a primeira página)
+        por_pagina: Quantidade por página
+        id_consulta: identificar_consulta() da busca atual
+
+    Returns:
+        Tupla (posições da página, próximo cursor ou None no fim)
+
+    Raises:
+        CursorInvalido: Cursor malformado, de outra consulta, ou cuja linha
+            não existe mais após uma recarga dos dados (status 410)
+    """
+    inicio = 0
+    if cursor:
+        conteudo = decodificar_cursor(cursor)
+        if conteudo['q'] != id_consulta:
+            raise CursorInvalido('Cursor pertence a outra consulta')
+
+        if conteudo['v'] == dados.versao:
+            ultima = int(conteudo['p'])
+        else:
+            # Dados recarregados: localiza a última linha entregue pela chave
+            ultima = dados.posicao_da_chave(conteudo.get('k'))
+            if ultima is None:
+                raise CursorInvalido('Os dados foram atualizados; refaça a busca', status=410)
+        inicio = int(np.searchsorted(linhas, ultima, side='right'))
+
+    pagina = linhas[inicio:inicio + max(por_pagina, 0)]
+
+    proximo = None
+    if len(pagina) and inicio + len(pagina) < len(linhas):
+        ultima = int(pagina[-1])
+        proximo = codificar_cursor({
+            'v': dados.versao,
+            'q': id_consulta,
+            'p': ultima,
+            'k': dados.chave_da_posicao(ultima)
+        })
+    return pagina, proximo
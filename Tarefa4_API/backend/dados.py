@@ -0,0 +1,242 @@
+"""
+Snapshots imutáveis do cadastro de operadoras e monitor de recarga.
+
+Um ConjuntoDados reúne o DataFrame, os índices derivados dele e a versão
+(hash do arquivo de origem). A aplicação mantém uma referência ao snapshot
+atual e a troca inteira de uma vez quando o arquivo muda; requisições em
+andamento continuam usando o snapshot que já tinham, sem locks na leitura.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from autocompletar import IndiceAutocompletar
+from facetas import IndiceFacetas
+from fuzzy import IndiceFuzzy
+from indice import IndiceNgramas
+from normalizacao import normalizar_cnpj
+from relevancia import IndiceRelevancia
+from serializacao import LinhasJson
+
+logger = logging.getLogger(__name__)
+
+# Chave única de cada operadora (usada por cursores de paginação)
+COLUNA_CHAVE = 'REGISTRO_OPERADORA'
+
+# Coluna do CNPJ (busca direta por /api/operadoras/cnpj/<cnpj>)
+COLUNA_CNPJ = 'CNPJ'
+
+
+def assinatura_arquivo(caminho):
+    """
+    Retorna a assinatura barata (mtime, tamanho) de um arquivo.
+
+    Args:
+        caminho: Caminho do arquivo
+
+    Returns:
+        Tupla (mtime_ns, tamanho) ou None se o arquivo não existir
+    """
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo.
+
+    Args:
+        caminho: Caminho do arquivo
+        tamanho_bloco: Bytes lidos por vez
+
+    Returns:
+        Hash hexadecimal abreviado (16 caracteres)
+    """
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()[:16]
+
+
+def _indice_hash(df, coluna, normalizar=None):
+    """
+    Monta um pd.Index (tabela hash) valor -> posição de uma coluna.
+
+    Args:
+        df: DataFrame
+        coluna: Coluna indexada
+        normalizar: Função aplicada a cada valor antes de indexar (opcional)
+
+    Returns:
+        pd.Index ou None se a coluna não existir
+    """
+    if coluna not in df.columns:
+        return None
+    valores = df[coluna] if normalizar is None else df[coluna].map(normalizar)
+    indice = pd.Index(valores.astype(object))
+    # Monta a tabela hash agora, e não na primeira consulta
+    indice.is_unique
+    return indice
+
+
+def _localizar(indice, chave):
+    """
+    Retorna a posição da primeira linha com a chave no índice hash.
+
+    Args:
+        indice: pd.Index de _indice_hash (ou None)
+        chave: Valor procurado
+
+    Returns:
+        Posição da linha ou None se não existir
+    """
+    if indice is None or chave is None:
+        return None
+    try:
+        posicao = indice.get_loc(chave)
+    except KeyError:
+        return None
+    if isinstance(posicao, slice):
+        return posicao.start
+    if isinstance(posicao, np.ndarray):
+        return int(np.flatnonzero(posicao)[0])
+    return posicao
+
+
+class ConjuntoDados:
+    """
+    Snapshot imutável: DataFrame, índices derivados e metadados de versão.
+    """
+
+    def __init__(self, df, versao, assinatura=None, inicio=None, indice=None,
+                 origem='csv', fuzzy=None, autocompletar=None, relevancia=None,
+                 listas=True):
+        """
+        Constrói os índices derivados do DataFrame.
+
+        Args:
+            df: DataFrame já limpo
+            versao: Identificador da versão (hash do arquivo de origem)
+            assinatura: Assinatura (mtime, tamanho) do arquivo de origem
+            inicio: time.perf_counter() do início da carga, para medir a duração
+            indice: IndiceNgramas já construído (ex: lido de um snapshot)
+            origem: De onde os dados vieram ('csv', 'snapshot' ou 'memoria')
+            fuzzy: IndiceFuzzy já construído (ex: lido de um snapshot)
+            autocompletar: IndiceAutocompletar já construído (ex: lido de um snapshot)
+            relevancia: IndiceRelevancia já construído (ex: lido de um snapshot)
+            listas: Monta as listas de n-gramas do índice (False quando a
+                busca por substring fica com outro backend, ex: sqlite)
+        """
+        inicio = time.perf_counter() if inicio is None else inicio
+
+        self.df = df
+        self.versao = versao
+        self.assinatura = assinatura
+        self.origem = origem
+        self.indice = IndiceNgramas(df, listas=listas) if indice is None else indice
+        # Backend da busca por substring (ver busca.py); trocado por app.aplicar_backend()
+        self.busca = self.indice
+        self.facetas = IndiceFacetas(df, self.indice)
+        self.fuzzy = IndiceFuzzy(df) if fuzzy is None else fuzzy
+        self.relevancia = IndiceRelevancia(self.indice) if relevancia is None else relevancia
+        self.autocompletar = IndiceAutocompletar(df) if autocompletar is None else autocompletar
+        self.json_linhas = LinhasJson(df)
+        self._chaves = _indice_hash(df, COLUNA_CHAVE)
+        self._cnpjs = _indice_hash(df, COLUNA_CNPJ, normalizar_cnpj)
+
+        self.duracao_carga = time.perf_counter() - inicio
+        self.carregado_em = time.time()
+
+    def chave_da_posicao(self, posicao):
+        """Retorna o valor de COLUNA_CHAVE da linha, ou None sem essa coluna"""
+        if self._chaves is None:
+            return None
+        return self._chaves[posicao]
+
+    def posicao_da_chave(self, chave):
+        """
+        Localiza a linha pelo valor de COLUNA_CHAVE (tabela hash do pandas).
+
+        Args:
+            chave: Valor de COLUNA_CHAVE
+
+        Returns:
+            Posição da linha ou None se não existir
+        """
+        return _localizar(self._chaves, chave)
+
+    def posicao_do_cnpj(self, cnpj):
+        """
+        Localiza a linha pelo CNPJ, formatado ou não.
+
+        Args:
+            cnpj: CNPJ com ou sem pontuação
+
+        Returns:
+            Posição da linha ou None se não existir
+        """
+        return _localizar(self._cnpjs, normalizar_cnpj(cnpj) or None)
+
+    def resumo(self):
+        """
+        Retorna os metadados do snapshot.
+
+        Returns:
+            Dict com versão, origem, linhas, horário e duração da carga,
+            backend de busca e quantas linhas já têm o JSON pronto
+        """
+        return {
+            'versao': self.versao,
+            'origem': self.origem,
+            'linhas': len(self.df),
+            'carregado_em': time.strftime('%Y-%m-%dT%H:%M:%S',
+                                          time.localtime(self.carregado_em)),
+            'duracao_carga_s': round(self.duracao_carga, 3),
+            'backend_busca': self.busca.nome,
+            'linhas_serializadas': self.json_linhas.geradas()
+        }
+
+
+class MonitorArquivo(threading.Thread):
+    """
+    Thread que verifica periodicamente se o arquivo de origem mudou.
+    """
+
+    def __init__(self, caminho, obter_assinatura_atual, ao_mudar, intervalo):
+        """
+        Args:
+            caminho: Arquivo monitorado
+            obter_assinatura_atual: Função que retorna a assinatura do snapshot atual
+            ao_mudar: Função chamada (na thread do monitor) quando o arquivo muda
+            intervalo: Segundos entre verificações
+        """
+        super().__init__(name='monitor-csv', daemon=True)
+        self.caminho = caminho
+        self.obter_assinatura_atual = obter_assinatura_atual
+        self.ao_mudar = ao_mudar
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            assinatura = assinatura_arquivo(self.caminho)
+            if assinatura is None or assinatura == self.obter_assinatura_atual():
+                continue
+            try:
+                self.ao_mudar()
+            except Exception as e:
+                logger.error(f"Erro ao recarregar {self.caminho}: {str(e)}")
+
+    def parar(self):
+        """Interrompe o monitoramento"""
+        self._parar.set()
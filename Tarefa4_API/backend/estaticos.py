@@ -0,0 +1,75 @@
+"""
+Pré-compressão dos arquivos estáticos do frontend.
+
+Grava, ao lado de cada .js/.css/.html/.svg do build do Vue, as versões .gz
+(e .br, se o pacote brotli estiver instalado). serve_js() e serve_css()
+entregam a versão comprimida aceita pelo navegador sem comprimir nada a
+cada requisição.
+
+Uso (depois do npm run build):
+    python estaticos.py [pasta_do_build]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import gzip
+import os
+import sys
+
+from cache_http import brotli
+
+# Extensões comprimidas
+EXTENSOES = ('.js', '.css', '.html', '.svg')
+
+# Arquivos menores que isso não compensam a compressão
+TAMANHO_MINIMO = 1024
+
+PASTA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist')
+
+
+def comprimir_estaticos(pasta, minimo=TAMANHO_MINIMO):
+    """
+    Grava as versões comprimidas dos arquivos estáticos de uma pasta.
+
+    Args:
+        pasta: Pasta do build do frontend
+        minimo: Tamanho mínimo, em bytes, para comprimir
+
+    Returns:
+        Quantidade de arquivos comprimidos gravados
+    """
+    gravados = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            if not nome.endswith(EXTENSOES):
+                continue
+            caminho = os.path.join(raiz, nome)
+            with open(caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            if len(conteudo) < minimo:
+                continue
+
+            versoes = {'.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                versoes['.br'] = brotli.compress(conteudo, quality=11)
+
+            for extensao, comprimido in versoes.items():
+                if len(comprimido) < len(conteudo):
+                    with open(caminho + extensao, 'wb') as arquivo:
+                        arquivo.write(comprimido)
+                    gravados += 1
+    return gravados
+
+
+def main():
+    """Build: comprime os estáticos do frontend"""
+    pasta = sys.argv[1] if len(sys.argv) > 1 else PASTA_PADRAO
+    if not os.path.isdir(pasta):
+        print(f"Pasta {pasta} não encontrada; rode o build do frontend antes")
+        sys.exit(1)
+    print(f"{comprimir_estaticos(pasta)} arquivos comprimidos gravados em {pasta}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Contagens por valor (facetas) das colunas de baixa cardinalidade.
+
+Na carga, cada coluna com poucos valores distintos (UF, Modalidade,
+Regiao_de_Comercializacao...) reaproveita o array linha -> código do valor
+que o índice de n-gramas já guarda. A contagem de um conjunto de linhas
+encontradas é um bincount dos códigos dessas linhas: custo proporcional ao
+tamanho do resultado, sem groupby nem materializar as linhas.
+"""
+
+import numpy as np
+
+from indice import codificar_coluna
+
+
+# Colunas com mais valores distintos que isso não oferecem facetas
+MAX_VALORES_FACETA = 1000
+
+
+class IndiceFacetas:
+    """
+    Códigos por linha e valores distintos das colunas facetáveis.
+    """
+
+    def __init__(self, df, indice, max_valores=MAX_VALORES_FACETA):
+        """
+        Args:
+            df: DataFrame já limpo
+            indice: IndiceNgramas do DataFrame (fornece os códigos por linha)
+            max_valores: Quantidade máxima de valores distintos por coluna
+        """
+        self.n_linhas = len(df)
+        self._codigos = {}
+        self._valores = {}
+        self._totais = {}
+
+        for col in df.columns:
+            codigos, n_valores = indice.codigos(col)
+            if n_valores > max_valores:
+                continue
+            # Mesma codificação usada pelo índice: só os rótulos originais são novos
+            _, valores = codificar_coluna(df[col])
+            self._codigos[col] = codigos
+            self._valores[col] = valores
+            self._totais[col] = np.bincount(codigos, minlength=len(valores))
+
+        self.colunas = list(self._codigos)
+
+    def contar(self, coluna, linhas=None, limite=None):
+        """
+        Conta quantas linhas têm cada valor da coluna.
+
+        Args:
+            coluna: Coluna facetável
+            linhas: Posições das linhas encontradas (None = todas as linhas)
+            limite: Quantidade máxima de valores retornados (opcional)
+
+        Returns:
+            Lista de dicts {'valor', 'contagem'} em ordem decrescente de contagem,
+            sem os valores que não aparecem
+        """
+        valores = self._valores[coluna]
+        if linhas is None:
+            contagens = self._totais[coluna]
+        else:
+            contagens = np.bincount(self._codigos[coluna][linhas], minlength=len(valores))
+
+        presentes = np.flatnonzero(contagens)
+        ordem = presentes[np.argsort(-contagens[presentes], kind='stable')]
+        if limite is not None:
+            ordem = ordem[:limite]
+
+        return [
+            {'valor': valores[c], 'contagem': int(contagens[c])}
+            for c in ordem.tolist()
+        ]
@@ -0,0 +1,160 @@
+"""
+Busca avançada com vários filtros por coluna, combinados com E.
+
+Cada filtro é "campo:operador:valor", com operador igual, prefixo ou
+contem (sem diferenciar maiúsculas nem acentos). O plano estima quantas linhas cada
+filtro seleciona usando os índices por coluna (valores distintos e listas
+de trigramas), avalia primeiro o mais seletivo e segue pelos demais:
+
+- se a lista de linhas do próximo filtro é menor que as candidatas, as duas
+  listas ordenadas são intersectadas;
+- senão, só os códigos das candidatas naquela coluna são conferidos (cada
+  valor distinto uma vez).
+
+Nenhum filtro monta uma máscara booleana do tamanho do DataFrame.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from normalizacao import normalizar
+
+
+OPERADORES = ('igual', 'prefixo', 'contem')
+
+Filtro = namedtuple('Filtro', ['campo', 'operador', 'valor'])
+
+
+class FiltroInvalido(Exception):
+    """Filtro malformado, com campo inexistente ou operador desconhecido"""
+
+
+def ler_filtro(texto, colunas):
+    """
+    Interpreta um filtro no formato campo:operador:valor.
+
+    O valor pode conter ':'; só os dois primeiros separam as partes. Um
+    valor só de espaços é inválido (normalizado, seria vazio).
+
+    Args:
+        texto: Filtro recebido na query string
+        colunas: Colunas válidas
+
+    Returns:
+        Filtro
+
+    Raises:
+        FiltroInvalido: Se o formato, o campo ou o operador forem inválidos
+    """
+    partes = texto.split(':', 2)
+    if len(partes) != 3 or not normalizar(partes[2]):
+        raise FiltroInvalido(f'Filtro inválido: {texto} (use campo:operador:valor)')
+
+    campo, operador, valor = partes
+    if campo not in colunas:
+        raise FiltroInvalido(f'Campo {campo} não encontrado')
+    if operador not in OPERADORES:
+        raise FiltroInvalido(f'Operador inválido: {operador} (use {", ".join(OPERADORES)})')
+    return Filtro(campo, operador, valor)
+
+
+def identificar_filtros(filtros):
+    """
+    Retorna uma representação canônica dos filtros (ordem, caixa e acentos não importam).
+
+    Args:
+        filtros: Lista de Filtro
+
+    Returns:
+        String usada em chaves de cache e cursores
+    """
+    return '\x1f'.join(sorted(f'{f.campo}:{f.operador}:{normalizar(f.valor)}' for f in filtros))
+
+
+def _casa(operador, alvo, texto):
+    """Aplica o operador a um valor já normalizado"""
+    if operador == 'igual':
+        return texto == alvo
+    if operador == 'prefixo':
+        return texto.startswith(alvo)
+    return alvo in texto
+
+
+def _estimar(indice, busca, filtro):
+    """
+    Estima quantas linhas o filtro seleciona.
+
+    Para igual e prefixo a contagem é exata (soma das linhas dos valores
+    distintos que casam); para contem é o limite superior do backend de
+    busca (a menor lista de trigramas, no índice em memória).
+
+    Returns:
+        Tupla (estimativa, códigos que casam ou None para contem)
+    """
+    if filtro.operador == 'contem':
+        return busca.estimar(filtro.valor, coluna=filtro.campo), None
+
+    alvo = normalizar(filtro.valor)
+    _, textos = indice.valores_normalizados(filtro.campo)
+    codigos = np.array([c for c, texto in enumerate(textos) if _casa(filtro.operador, alvo, texto)],
+                       dtype=np.int64)
+    _, inicios = indice.linhas_por_valor(filtro.campo)
+    return int((inicios[codigos + 1] - inicios[codigos]).sum()), codigos
+
+
+def _linhas_do_filtro(indice, busca, filtro, codigos):
+    """Retorna o array ordenado de linhas que satisfazem o filtro"""
+    if filtro.operador == 'contem':
+        return busca.buscar(filtro.valor, coluna=filtro.campo)
+
+    linhas, inicios = indice.linhas_por_valor(filtro.campo)
+    if len(codigos) == 0:
+        return np.empty(0, dtype=np.int64)
+    if len(codigos) == 1:
+        return linhas[inicios[codigos[0]]:inicios[codigos[0] + 1]].astype(np.int64)
+    return np.sort(np.concatenate([linhas[inicios[c]:inicios[c + 1]] for c in codigos.tolist()])
+                   ).astype(np.int64)
+
+
+def _conferir(indice, filtro, candidatas):
+    """Mantém as candidatas cujo valor na coluna satisfaz o filtro"""
+    alvo = normalizar(filtro.valor)
+    codigos, textos = indice.valores_normalizados(filtro.campo)
+    distintos, inversos = np.unique(codigos[candidatas], return_inverse=True)
+    casa = np.array([_casa(filtro.operador, alvo, textos[c]) for c in distintos.tolist()], dtype=bool)
+    return candidatas[casa[inversos]]
+
+
+def buscar_filtros(indice, filtros, busca=None):
+    """
+    Retorna as linhas que satisfazem todos os filtros.
+
+    Args:
+        indice: IndiceNgramas do snapshot (códigos e valores normalizados)
+        filtros: Lista de Filtro (ao menos um)
+        busca: Backend de busca dos filtros contem (default: o próprio índice)
+
+    Returns:
+        Array ordenado com as posições das linhas
+    """
+    busca = indice if busca is None else busca
+    plano = sorted(
+        ((*_estimar(indice, busca, filtro), i, filtro) for i, filtro in enumerate(filtros)),
+        key=lambda passo: (passo[0], passo[2])
+    )
+
+    _, codigos, _, filtro = plano[0]
+    candidatas = _linhas_do_filtro(indice, busca, filtro, codigos)
+
+    for estimativa, codigos, _, filtro in plano[1:]:
+        if len(candidatas) == 0:
+            break
+        if estimativa < len(candidatas):
+            candidatas = np.intersect1d(candidatas,
+                                        _linhas_do_filtro(indice, busca, filtro, codigos),
+                                        assume_unique=True)
+        else:
+            candidatas = _conferir(indice, filtro, candidatas)
+
+    return candidatas
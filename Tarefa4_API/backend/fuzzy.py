@@ -0,0 +1,177 @@
+"""
+Busca aproximada (tolerante a erros de digitação e acentos) por trigramas.
+
+Os nomes das operadoras são normalizados (sem acentos, minúsculas) e cada
+palavra é quebrada em trigramas com espaços nas pontas, como no pg_trgm:
+"belo" -> "  b", " be", "bel", "elo", "lo ". Cada trigrama aponta para a
+lista ordenada das linhas que o contêm.
+
+A pontuação de uma linha é a fração dos trigramas da consulta que ela
+contém, obtida com um único bincount das listas desses trigramas. O custo
+é proporcional ao tamanho dessas listas (no máximo MAX_TRIGRAMAS_CONSULTA
+vezes o número de linhas), nunca a comparar a consulta com cada célula por
+distância de edição.
+"""
+
+import math
+import re
+
+import numpy as np
+
+from indice import agrupar_listas, codificar_coluna, valores_em_listas
+from normalizacao import normalizar
+
+
+# Colunas indexadas para a busca aproximada
+COLUNAS_FUZZY = ['Razao_Social', 'Nome_Fantasia', 'Cidade']
+
+# Fração mínima dos trigramas da consulta que uma linha precisa conter
+LIMIAR = 0.5
+
+# Consultas muito longas usam só os primeiros trigramas (limita o custo)
+MAX_TRIGRAMAS_CONSULTA = 48
+
+# Resultado da busca: linha e pontuação, já na ordem do ranking
+TIPO_RESULTADO = np.dtype([('linha', np.int64), ('pontuacao', np.float32)])
+
+_PALAVRAS = re.compile(r'\w+')
+
+
+def trigramas_palavras(texto):
+    """
+    Retorna os trigramas das palavras de um texto já normalizado.
+
+    Args:
+        texto: Texto normalizado
+
+    Returns:
+        Lista de trigramas distintos, na ordem em que aparecem
+    """
+    vistos = {}
+    for palavra in _PALAVRAS.findall(texto):
+        preenchida = f'  {palavra} '
+        for i in range(len(preenchida) - 2):
+            vistos.setdefault(preenchida[i:i + 3], None)
+    return list(vistos)
+
+
+class IndiceFuzzy:
+    """
+    Índice invertido de trigramas de palavras normalizadas, por linha.
+    """
+
+    def __init__(self, df, colunas=None):
+        """
+        Args:
+            df: DataFrame já limpo
+            colunas: Colunas indexadas (default: as de COLUNAS_FUZZY presentes)
+        """
+        colunas = COLUNAS_FUZZY if colunas is None else colunas
+        self.colunas = [col for col in colunas if col in df.columns]
+        self.n_linhas = len(df)
+        self._vazio = np.empty(0, dtype=np.int32)
+
+        ids_trigramas = {}
+        por_coluna = []
+
+        for coluna in self.colunas:
+            codigos, valores = codificar_coluna(df[coluna])
+
+            # Trigramas de cada valor distinto: cada valor é normalizado uma vez
+            inicios, trigramas = valores_em_listas(
+                valores, lambda valor: trigramas_palavras(normalizar(valor)), ids_trigramas
+            )
+            por_coluna.append((0, codigos, inicios, trigramas))
+
+        # Uma linha pode ter o mesmo trigrama em mais de uma coluna
+        self._ids_trigramas = ids_trigramas
+        self._linhas, self._inicios = agrupar_listas(
+            por_coluna, self.n_linhas, len(ids_trigramas), unicos=False
+        )
+        # Quantidade de trigramas distintos de cada linha (para desempate)
+        self._tamanhos = np.bincount(self._linhas, minlength=self.n_linhas)
+
+    @classmethod
+    def restaurar(cls, colunas, n_linhas, trigramas, linhas, inicios):
+        """
+        Reconstrói o índice a partir dos arrays gravados por exportar().
+
+        Os arrays podem ser mapeados em memória (np.load com mmap_mode).
+
+        Args:
+            colunas: Colunas indexadas
+            n_linhas: Quantidade de linhas do DataFrame
+            trigramas: Trigramas na ordem dos seus identificadores
+            linhas: Array contíguo com todas as listas
+            inicios: Início de cada lista em linhas (n_trigramas + 1)
+
+        Returns:
+            IndiceFuzzy pronto para busca
+        """
+        indice = cls.__new__(cls)
+        indice.colunas = list(colunas)
+        indice.n_linhas = n_linhas
+        indice._vazio = np.empty(0, dtype=np.int32)
+        indice._ids_trigramas = {trigrama: i for i, trigrama in enumerate(trigramas)}
+        indice._linhas = linhas
+        indice._inicios = inicios
+        indice._tamanhos = np.bincount(linhas, minlength=n_linhas)
+        return indice
+
+    def exportar(self):
+        """
+        Retorna os arrays das listas para gravação em disco.
+
+        Returns:
+            Dict com colunas, trigramas (em ordem de id), linhas e inicios
+        """
+        return {
+            'colunas': self.colunas,
+            'trigramas': sorted(self._ids_trigramas, key=self._ids_trigramas.get),
+            'linhas': self._linhas,
+            'inicios': self._inicios
+        }
+
+    def lista(self, trigrama):
+        """Retorna a lista ordenada de linhas que contêm o trigrama"""
+        id_trigrama = self._ids_trigramas.get(trigrama)
+        if id_trigrama is None:
+            return self._vazio
+        return self._linhas[self._inicios[id_trigrama]:self._inicios[id_trigrama + 1]]
+
+    def buscar(self, consulta, limiar=LIMIAR):
+        """
+        Busca as linhas parecidas com a consulta.
+
+        Ordena pela fração dos trigramas da consulta encontrados na linha;
+        empates favorecem as linhas com menos trigramas sobrando (similaridade
+        de Jaccard) e depois a ordem original.
+
+        Args:
+            consulta: Termo de busca
+            limiar: Fração mínima dos trigramas da consulta (0 a 1)
+
+        Returns:
+            Array TIPO_RESULTADO (linha, pontuação) em ordem de relevância
+        """
+        trigramas = trigramas_palavras(normalizar(consulta))[:MAX_TRIGRAMAS_CONSULTA]
+        if not trigramas:
+            return np.empty(0, dtype=TIPO_RESULTADO)
+
+        total = len(trigramas)
+        necessario = max(1, math.ceil(limiar * total))
+
+        listas = [self.lista(trigrama) for trigrama in trigramas]
+        acertos = np.bincount(np.concatenate(listas), minlength=self.n_linhas)
+
+        candidatas = np.flatnonzero(acertos >= necessario)
+        acertos = acertos[candidatas]
+
+        cobertura = acertos / total
+        jaccard = acertos / (total + self._tamanhos[candidatas] - acertos)
+        ordem = np.lexsort((candidatas, -jaccard, -cobertura))
+
+        resultado = np.empty(len(ordem), dtype=TIPO_RESULTADO)
+        resultado['linha'] = candidatas[ordem]
+        resultado['pontuacao'] = cobertura[ordem]
+        return resultado
@@ -0,0 +1,40 @@
+"""
+Configuração do gunicorn.
+
+Uso:
+    gunicorn -c gunicorn.conf.py app:app
+
+Variáveis de ambiente:
+    GUNICORN_WORKERS: Quantidade de workers (default: 2)
+    GUNICORN_PRELOAD: 1 carrega os dados uma vez no master e os workers os
+        herdam por copy-on-write (default: 0)
+    SNAPSHOT_MMAP: 1 mapeia o snapshot binário em memória, compartilhando
+        as páginas entre workers mesmo sem preload (default: 0)
+    PROMETHEUS_MULTIPROC_DIR: Pasta vazia onde os workers gravam as métricas,
+        para /metrics somar todos os workers (ver metricas.py)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0') == '1'
+
+
+def when_ready(server):
+    """Roda no master antes dos workers serem criados"""
+    if preload_app:
+        import app
+        app.preparar_compartilhamento()
+
+
+def post_fork(server, worker):
+    """Roda em cada worker logo após o fork"""
+    import app
+    app.apos_fork()
+
+
+def child_exit(server, worker):
+    """Roda no master quando um worker termina"""
+    import metricas
+    metricas.processo_encerrado(worker.pid)
@@ -0,0 +1,513 @@
+"""
+Índice invertido de n-gramas para busca por substring.
+
+Cada célula do DataFrame recebe um identificador (linha * n_colunas + coluna)
+e cada trigrama do seu valor normalizado (sem acentos, casefold e espaços
+colapsados, ver normalizacao.py) aponta para a lista ordenada das células
+que o contêm. A consulta passa pela mesma normalização: uma busca
+intersecta as listas dos trigramas da consulta e confere apenas as células
+candidatas, com a semântica de str.contains(regex=False) sobre os textos
+normalizados ("sao paulo" encontra "São Paulo").
+
+Os valores ficam codificados por coluna (códigos + valores distintos), como
+nas colunas categóricas, e todas as listas ficam num único array contíguo.
+Com outro backend de busca (BACKEND_BUSCA=sqlite) o índice é montado sem as
+listas: só códigos e valores normalizados, usados por facetas, filtros e
+relevância.
+"""
+
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from busca import BackendBusca
+from normalizacao import normalizar
+
+
+# Tamanho dos n-gramas indexados
+N = 3
+
+# Pares (n-grama, célula) gerados por vez na construção das listas
+PARES_POR_LOTE = 2 ** 20
+
+
+def codificar_coluna(serie):
+    """
+    Codifica uma coluna como (códigos por linha, valores distintos).
+
+    Colunas categóricas reaproveitam os códigos já existentes; as demais são
+    fatorizadas. Valores nulos recebem o código de um valor vazio.
+
+    Args:
+        serie: Coluna do DataFrame
+
+    Returns:
+        Tupla (array de códigos int32, lista de valores)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        valores = list(serie.cat.categories)
+    else:
+        codigos, valores = pd.factorize(serie)
+        valores = list(valores)
+
+    codigos = codigos.astype(np.int32)
+    if (codigos < 0).any():
+        codigos[codigos < 0] = len(valores)
+        valores.append('')
+    return codigos, valores
+
+
+def texto_de_busca(valor):
+    """
+    Retorna o valor normalizado para a busca (normalizar), reaproveitando o
+    próprio objeto quando ele já está normalizado para não duplicar memória.
+    """
+    texto = normalizar(valor)
+    return valor if texto == valor else texto
+
+
+def ngramas_de(texto):
+    """Retorna o conjunto de trigramas do texto"""
+    return {texto[i:i + N] for i in range(len(texto) - N + 1)}
+
+
+def valores_em_listas(textos, extrair, ids):
+    """
+    Monta, para cada valor distinto, a lista de identificadores dos seus itens.
+
+    Args:
+        textos: Valores distintos (já normalizados)
+        extrair: Função texto -> iterável de itens (ex: ngramas_de)
+        ids: Dict item -> identificador, ampliado com os itens novos
+
+    Returns:
+        Tupla (inicios, itens): os identificadores do valor v são
+        itens[inicios[v]:inicios[v + 1]] (arrays int64 e int32)
+    """
+    # array('i') em vez de listas de int: 4 bytes por par durante a montagem
+    itens = array('i')
+    tamanhos = array('q')
+    for texto in textos:
+        antes = len(itens)
+        itens.extend([ids.setdefault(item, len(ids)) for item in extrair(texto)])
+        tamanhos.append(len(itens) - antes)
+
+    inicios = np.zeros(len(textos) + 1, dtype=np.int64)
+    np.cumsum(np.frombuffer(tamanhos, dtype=np.int64), out=inicios[1:])
+    return inicios, np.frombuffer(itens, dtype=np.int32)
+
+
+def _expandir_lote(codigos, inicios_valores, itens_valores):
+    """
+    Itens de cada linha de um lote, a partir das listas por valor distinto.
+
+    Returns:
+        Tupla (itens de todas as linhas em sequência, quantidade por linha)
+    """
+    quantos = inicios_valores[codigos + 1] - inicios_valores[codigos]
+    inicio_linha = np.cumsum(quantos) - quantos
+    posicoes = np.repeat(inicios_valores[codigos] - inicio_linha, quantos)
+    posicoes += np.arange(len(posicoes))
+    return itens_valores[posicoes], quantos
+
+
+def agrupar_listas(colunas, n_linhas, n_chaves, multiplicador=1, dtype=np.int32,
+                   unicos=True, pares_por_lote=None):
+    """
+    Monta as listas invertidas chave -> itens ordenados num único array contíguo.
+
+    Cada coluna é dada por (j, codigos, inicios, chaves): a linha com o valor
+    v gera o item linha * multiplicador + j em cada chave de
+    chaves[inicios[v]:inicios[v + 1]]. O tamanho de cada lista é contado
+    antes e os arrays finais são alocados uma vez; os pares (chave, item) são
+    gerados e espalhados em lotes de linhas com cerca de pares_por_lote
+    pares, então o pico de memória fica perto do tamanho do índice final.
+
+    Args:
+        colunas: Lista de (j, codigos, inicios, chaves) por coluna
+        n_linhas: Quantidade de linhas
+        n_chaves: Quantidade de chaves
+        multiplicador: Itens por linha (ex: n_colunas para células)
+        dtype: Tipo do array de itens
+        unicos: Se os pares nunca se repetem (com False, repetidos
+            aparecem uma vez só)
+        pares_por_lote: Pares gerados por lote, aproximadamente (default: PARES_POR_LOTE)
+
+    Returns:
+        Tupla (itens, inicios): a lista da chave k é itens[inicios[k]:inicios[k + 1]]
+    """
+    pares_por_lote = PARES_POR_LOTE if pares_por_lote is None else pares_por_lote
+    base = max(n_linhas * multiplicador, 1)
+    ocorrencias = [np.bincount(codigos, minlength=len(inicios) - 1)
+                   for _, codigos, inicios, _ in colunas]
+    total_pares = sum(int(np.dot(o, np.diff(inicios)))
+                      for o, (_, _, inicios, _) in zip(ocorrencias, colunas))
+    linhas_por_lote = max(1, pares_por_lote * n_linhas // max(total_pares, 1))
+
+    def lotes():
+        """Pares (chave * base + item) de cada lote de linhas, ordenados"""
+        for inicio in range(0, n_linhas, linhas_por_lote):
+            fim = min(inicio + linhas_por_lote, n_linhas)
+            partes = []
+            for j, codigos, inicios, chaves in colunas:
+                chaves_lote, quantos = _expandir_lote(codigos[inicio:fim], inicios, chaves)
+                itens = np.arange(inicio, fim, dtype=np.int64) * multiplicador + j
+                combinadas = chaves_lote.astype(np.int64) * base
+                combinadas += np.repeat(itens, quantos)
+                partes.append(combinadas)
+            combinadas = np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+            yield np.sort(combinadas) if unicos else np.unique(combinadas)
+
+    # 1ª passada: tamanho de cada lista
+    if unicos:
+        # Sem repetidos: cada chave do valor v aparece uma vez por linha com v
+        contagem = np.zeros(n_chaves, dtype=np.int64)
+        for o, (_, _, inicios, chaves) in zip(ocorrencias, colunas):
+            por_par = np.repeat(o, np.diff(inicios))
+            contagem += np.bincount(chaves, weights=por_par, minlength=n_chaves).astype(np.int64)
+    else:
+        contagem = np.zeros(n_chaves, dtype=np.int64)
+        for combinadas in lotes():
+            contagem += np.bincount(combinadas // base, minlength=n_chaves)
+
+    inicios_listas = np.zeros(n_chaves + 1, dtype=np.int64)
+    np.cumsum(contagem, out=inicios_listas[1:])
+    saida = np.empty(inicios_listas[-1], dtype=dtype)
+
+    # 2ª passada: cada lote vai para o fim atual das suas listas; como os
+    # lotes seguem a ordem das linhas, cada lista sai ordenada
+    cursores = inicios_listas[:-1].copy()
+    for combinadas in lotes():
+        if not len(combinadas):
+            continue
+        chaves = combinadas // base
+        novas = np.empty(len(chaves), dtype=bool)
+        novas[0] = True
+        np.not_equal(chaves[1:], chaves[:-1], out=novas[1:])
+        primeiros = np.flatnonzero(novas)
+        grupos = chaves[primeiros]
+        tamanhos = np.diff(np.append(primeiros, len(chaves)))
+
+        posicoes = np.repeat(cursores[grupos] - primeiros, tamanhos)
+        posicoes += np.arange(len(chaves))
+        saida[posicoes] = combinadas - chaves * base
+        cursores[grupos] += tamanhos
+
+    return saida, inicios_listas
+
+
+class IndiceNgramas(BackendBusca):
+    """
+    Índice invertido de n-gramas sobre os valores de um DataFrame.
+
+    Consultas de 3 caracteres são respondidas diretamente pela lista do
+    próprio trigrama; consultas maiores intersectam as listas dos seus
+    trigramas e verificam só as células candidatas. Consultas de 1 ou 2
+    caracteres (que casam com boa parte das linhas) conferem os valores
+    distintos de cada coluna, sem guardar listas de unigramas e bigramas.
+    """
+
+    nome = 'memoria'
+
+    def __init__(self, df, listas=True):
+        """
+        Constrói o índice a partir de um DataFrame com valores texto.
+
+        Args:
+            df: DataFrame já limpo (valores str ou categóricos)
+            listas: Monta as listas de n-gramas (sem elas, buscar() só
+                aceita consultas curtas; a busca fica com outro backend)
+        """
+        self.colunas = list(df.columns)
+        self.n_colunas = len(self.colunas)
+        self.n_linhas = len(df)
+
+        total_celulas = self.n_linhas * self.n_colunas
+        self._dtype = np.int32 if total_celulas < 2 ** 31 else np.int64
+        self._vazio = np.empty(0, dtype=self._dtype)
+
+        # Por coluna: códigos por linha + valores distintos normalizados.
+        # Valores repetidos (UF, Modalidade, Cidade...) são indexados uma vez só.
+        self._codigos = []
+        self._textos = []
+        self._linhas_por_valor = {}
+        self.com_listas = listas
+
+        ids_ngramas = {}
+        por_coluna = []
+
+        for j, coluna in enumerate(self.colunas):
+            codigos, valores = codificar_coluna(df[coluna])
+            textos = [texto_de_busca(valor) for valor in valores]
+            self._codigos.append(codigos)
+            self._textos.append(textos)
+
+            if listas:
+                # N-gramas de cada valor distinto da coluna
+                inicios, ngramas = valores_em_listas(textos, ngramas_de, ids_ngramas)
+                por_coluna.append((j, codigos, inicios, ngramas))
+
+        # Todas as listas num array contíguo, ordenado por (n-grama, célula)
+        self._ids_ngramas = ids_ngramas
+        self._celulas, self._inicios = agrupar_listas(
+            por_coluna, self.n_linhas, len(ids_ngramas), self.n_colunas, self._dtype
+        )
+
+    @classmethod
+    def restaurar(cls, colunas, codigos, valores, ngramas=None, celulas=None, inicios=None):
+        """
+        Reconstrói o índice a partir dos arrays gravados por exportar().
+
+        Os arrays podem ser mapeados em memória (np.load com mmap_mode).
+
+        Args:
+            colunas: Nomes das colunas
+            codigos: Lista (por coluna) de arrays de códigos por linha
+            valores: Lista (por coluna) de listas de valores distintos
+            ngramas: Trigramas na ordem dos seus identificadores (None = sem listas)
+            celulas: Array contíguo com todas as listas
+            inicios: Início de cada lista em celulas (n_ngramas + 1)
+
+        Returns:
+            IndiceNgramas pronto para busca
+        """
+        indice = cls.__new__(cls)
+        indice.colunas = list(colunas)
+        indice.n_colunas = len(indice.colunas)
+        indice.n_linhas = len(codigos[0]) if codigos else 0
+        indice._codigos = list(codigos)
+        indice._textos = [[texto_de_busca(valor) for valor in vals] for vals in valores]
+        indice._linhas_por_valor = {}
+        indice.com_listas = ngramas is not None
+        if not indice.com_listas:
+            total_celulas = indice.n_linhas * indice.n_colunas
+            celulas = np.empty(0, dtype=np.int32 if total_celulas < 2 ** 31 else np.int64)
+            inicios = np.zeros(1, dtype=np.int64)
+        indice._dtype = celulas.dtype
+        indice._vazio = np.empty(0, dtype=celulas.dtype)
+        indice._ids_ngramas = {ngrama: i for i, ngrama in enumerate(ngramas or [])}
+        indice._celulas = celulas
+        indice._inicios = inicios
+        return indice
+
+    def exportar(self):
+        """
+        Retorna os arrays das listas para gravação em disco.
+
+        Returns:
+            Dict com ngramas (em ordem de id), celulas e inicios, ou None
+            se o índice foi montado sem listas
+        """
+        if not self.com_listas:
+            return None
+        ngramas = sorted(self._ids_ngramas, key=self._ids_ngramas.get)
+        return {
+            'ngramas': ngramas,
+            'celulas': self._celulas,
+            'inicios': self._inicios
+        }
+
+    def codigos(self, coluna):
+        """
+        Retorna os códigos por linha de uma coluna e a quantidade de valores distintos.
+
+        Args:
+            coluna: Nome da coluna
+
+        Returns:
+            Tupla (array de códigos, quantidade de valores distintos)
+        """
+        j = self.colunas.index(coluna)
+        return self._codigos[j], len(self._textos[j])
+
+    def valores_normalizados(self, coluna):
+        """
+        Retorna os códigos por linha e os valores distintos (normalizados) da coluna.
+
+        Args:
+            coluna: Nome da coluna
+
+        Returns:
+            Tupla (array de códigos, lista de valores normalizados)
+        """
+        j = self.colunas.index(coluna)
+        return self._codigos[j], self._textos[j]
+
+    def linhas_por_valor(self, coluna):
+        """
+        Retorna as linhas de cada valor distinto da coluna, agrupadas.
+
+        Montado na primeira chamada por coluna e guardado (os dados são imutáveis).
+
+        Args:
+            coluna: Nome da coluna
+
+        Returns:
+            Tupla (linhas, inicios): as linhas do valor c, em ordem, são
+            linhas[inicios[c]:inicios[c + 1]]
+        """
+        grupos = self._linhas_por_valor
+        if coluna not in grupos:
+            codigos, textos = self.valores_normalizados(coluna)
+            linhas = np.argsort(codigos, kind='stable').astype(self._dtype)
+            inicios = np.zeros(len(textos) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codigos, minlength=len(textos)), out=inicios[1:])
+            grupos[coluna] = (linhas, inicios)
+        return grupos[coluna]
+
+    def estimar(self, consulta, coluna=None):
+        """
+        Limite superior barato de quantas linhas contêm a consulta.
+
+        Args:
+            consulta: Termo de busca
+            coluna: Coluna da busca (não muda a estimativa, que vale para todas)
+
+        Returns:
+            Menor lista entre os trigramas da consulta (ou n_linhas se curta)
+        """
+        alvo = normalizar(consulta)
+        if len(alvo) < N:
+            return self.n_linhas
+        self._exigir_listas()
+        menor = self.n_linhas
+        for trigrama in ngramas_de(alvo):
+            lista = self.lista(trigrama)
+            menor = min(menor, 0 if lista is None else len(lista))
+        return menor
+
+    def _exigir_listas(self):
+        """Falha em vez de responder vazio quando o índice foi montado sem listas"""
+        if not self.com_listas:
+            raise RuntimeError('Índice montado sem as listas de n-gramas: use o backend de busca')
+
+    def lista(self, ngrama):
+        """
+        Retorna a lista ordenada de células que contêm o n-grama.
+
+        Args:
+            ngrama: Trigrama normalizado
+
+        Returns:
+            Array de células (visão do array contíguo) ou None se ausente
+        """
+        id_ngrama = self._ids_ngramas.get(ngrama)
+        if id_ngrama is None:
+            return None
+        return self._celulas[self._inicios[id_ngrama]:self._inicios[id_ngrama + 1]]
+
+    def _celulas_candidatas(self, alvo):
+        """
+        Retorna as células cujo texto pode conter o alvo.
+
+        Args:
+            alvo: Consulta já normalizada
+
+        Returns:
+            Tupla (células ordenadas, exato) onde exato indica que dispensam verificação
+        """
+        if len(alvo) == N:
+            lista = self.lista(alvo)
+            return (self._vazio if lista is None else lista), True
+
+        trigramas = ngramas_de(alvo)
+        listas = []
+        for trigrama in trigramas:
+            lista = self.lista(trigrama)
+            if lista is None:
+                return self._vazio, True
+            listas.append(lista)
+
+        # Intersecta da lista mais curta para a mais longa
+        listas.sort(key=len)
+        candidatas = listas[0]
+        for lista in listas[1:]:
+            candidatas = np.intersect1d(candidatas, lista, assume_unique=True)
+            if len(candidatas) == 0:
+                break
+        return candidatas, False
+
+    def _verificar(self, celulas, alvo):
+        """
+        Mantém só as células cujo texto contém o alvo.
+
+        Cada valor distinto é conferido uma vez por coluna.
+
+        Args:
+            celulas: Células candidatas (ordenadas)
+            alvo: Consulta já normalizada
+
+        Returns:
+            Array ordenado com as células confirmadas
+        """
+        linhas, colunas = np.divmod(celulas, self.n_colunas)
+        manter = np.zeros(len(celulas), dtype=bool)
+
+        for j in np.unique(colunas).tolist():
+            da_coluna = colunas == j
+            codigos = self._codigos[j][linhas[da_coluna]]
+            distintos, inversos = np.unique(codigos, return_inverse=True)
+            textos = self._textos[j]
+            contem = np.array([alvo in textos[c] for c in distintos.tolist()], dtype=bool)
+            manter[da_coluna] = contem[inversos]
+
+        return celulas[manter]
+
+    def _buscar_por_valores(self, alvo, coluna=None):
+        """
+        Busca consultas curtas conferindo cada valor distinto das colunas.
+
+        Args:
+            alvo: Consulta já normalizada (menos de N caracteres)
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Array ordenado com as posições das linhas encontradas
+        """
+        colunas = range(self.n_colunas) if coluna is None else [self.colunas.index(coluna)]
+        encontradas = np.zeros(self.n_linhas, dtype=bool)
+
+        for j in colunas:
+            textos = self._textos[j]
+            casam = [c for c, texto in enumerate(textos) if alvo in texto]
+            if len(casam) == len(textos):
+                encontradas[:] = True
+                break
+            if casam:
+                contem = np.zeros(len(textos), dtype=bool)
+                contem[casam] = True
+                encontradas |= contem[self._codigos[j]]
+
+        return np.flatnonzero(encontradas)
+
+    def buscar(self, consulta, coluna=None):
+        """
+        Busca as linhas que contêm a consulta (sem diferenciar maiúsculas nem acentos).
+
+        Args:
+            consulta: Termo de busca
+            coluna: Nome da coluna para restringir a busca (opcional)
+
+        Returns:
+            Array ordenado com as posições das linhas encontradas
+        """
+        alvo = normalizar(consulta)
+        if not alvo:
+            return np.arange(self.n_linhas)
+
+        if len(alvo) < N:
+            return self._buscar_por_valores(alvo, coluna)
+
+        self._exigir_listas()
+        celulas, exato = self._celulas_candidatas(alvo)
+
+        if coluna is not None:
+            celulas = celulas[celulas % self.n_colunas == self.colunas.index(coluna)]
+
+        if not exato and len(celulas):
+            celulas = self._verificar(celulas, alvo)
+
+        # Células ordenadas => linhas em ordem não decrescente
+        return np.unique(celulas // self.n_colunas)
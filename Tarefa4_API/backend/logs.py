@@ -0,0 +1,113 @@
+"""
+Configuração do logging da API.
+
+Em desenvolvimento os logs vão direto para o stdout, em DEBUG. Em produção:
+
+- LOG_NIVEL=INFO (ou WARNING) descarta os logger.debug() do caminho quente
+  antes de qualquer formatação (as chamadas passam os valores como
+  argumentos, sem f-string);
+- LOG_AMOSTRAGEM=0.01 mantém só essa fração dos registros DEBUG/INFO;
+  WARNING e acima são sempre mantidos;
+- LOG_ASSINCRONO=1 põe os registros numa fila limitada: a requisição não
+  formata nem escreve, uma thread faz isso. Com a fila cheia o registro é
+  descartado em vez de bloquear a requisição.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+FORMATO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Registros aguardando a thread de escrita
+TAMANHO_FILA = 10000
+
+_fila = None
+_ouvinte = None
+
+
+class FiltroAmostragem(logging.Filter):
+    """Mantém uma fração dos registros abaixo de WARNING"""
+
+    def __init__(self, taxa):
+        """
+        Args:
+            taxa: Fração (0 a 1) dos registros DEBUG/INFO mantidos
+        """
+        super().__init__()
+        self.taxa = taxa
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.taxa
+
+
+class _HandlerFila(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não bloqueia nem formata na thread da requisição.
+
+    A fila é do mesmo processo, então o registro é enfileirado como está e a
+    mensagem só é montada pela thread de escrita.
+    """
+
+    descartados = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _HandlerFila.descartados += 1
+
+
+def _iniciar_ouvinte(destino):
+    """Inicia a thread que escreve os registros da fila"""
+    global _ouvinte
+
+    _ouvinte = logging.handlers.QueueListener(_fila, destino, respect_handler_level=True)
+    _ouvinte.start()
+
+
+def configurar_logging(nivel='DEBUG', amostragem=1.0, assincrono=False):
+    """
+    Configura o logger raiz da aplicação.
+
+    Args:
+        nivel: Nível mínimo (nome, ex: 'INFO')
+        amostragem: Fração dos registros DEBUG/INFO mantidos
+        assincrono: Escreve os registros numa thread separada
+    """
+    global _fila
+
+    destino = logging.StreamHandler(sys.stdout)
+    destino.setFormatter(logging.Formatter(FORMATO))
+
+    handler = destino
+    if assincrono:
+        _fila = queue.Queue(TAMANHO_FILA)
+        handler = _HandlerFila(_fila)
+        _iniciar_ouvinte(destino)
+        atexit.register(parar)
+
+    if amostragem < 1:
+        handler.addFilter(FiltroAmostragem(amostragem))
+
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [handler]
+    raiz.setLevel(nivel.upper())
+
+
+def apos_fork():
+    """A thread de escrita não sobrevive ao fork: inicia outra no worker"""
+    if _ouvinte is not None:
+        _iniciar_ouvinte(*_ouvinte.handlers)
+
+
+def parar():
+    """Escreve os registros pendentes e para a thread (fim do processo)"""
+    if _ouvinte is not None:
+        _ouvinte.stop()
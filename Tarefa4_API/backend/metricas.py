@@ -0,0 +1,112 @@
+"""
+Métricas Prometheus da API (GET /metrics).
+
+- api_requisicao_segundos: latência por rota, método e status (até o início
+  da resposta, inclusive a compressão)
+- api_fase_segundos: tempo de cada fase do atendimento
+    carga          obter o snapshot (e carregar o CSV na primeira vez)
+    busca          encontrar as linhas (índice ou cache de consultas)
+    materializacao gerar os dados das linhas da página (fragmentos JSON)
+    serializacao   montar o corpo JSON da resposta
+- api_resultados: quantidade de linhas encontradas por busca
+- api_cache_consultas_total: consultas ao cache de resultados por resultado
+  (acerto, falha, coalescida); taxa de acerto = acerto / soma
+- api_dados_carga_segundos e api_dados_linhas: última carga dos dados
+
+Com vários workers (gunicorn, uvicorn --workers), defina
+PROMETHEUS_MULTIPROC_DIR com uma pasta vazia antes de subir o servidor: cada
+processo grava suas métricas lá e /metrics soma todas.
+"""
+
+import os
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest, multiprocess)
+
+MULTIPROCESSO = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+# Segundos: de 0,1ms (acerto no cache) a 10s (exportação, primeira carga)
+BUCKETS_LATENCIA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                    0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+BUCKETS_RESULTADOS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000,
+                      1000000)
+
+FASES = ('carga', 'busca', 'materializacao', 'serializacao')
+
+REQUISICOES = Histogram(
+    'api_requisicao_segundos', 'Latência das requisições por rota',
+    ['rota', 'metodo', 'status'], buckets=BUCKETS_LATENCIA
+)
+DURACAO_FASES = Histogram(
+    'api_fase_segundos', 'Tempo de cada fase do atendimento', ['fase'], buckets=BUCKETS_LATENCIA
+)
+RESULTADOS = Histogram(
+    'api_resultados', 'Linhas encontradas por busca', ['rota'], buckets=BUCKETS_RESULTADOS
+)
+CONSULTAS_CACHE = Counter(
+    'api_cache_consultas', 'Consultas ao cache de resultados', ['resultado']
+)
+DURACAO_CARGA = Gauge(
+    'api_dados_carga_segundos', 'Duração da última carga dos dados', multiprocess_mode='max'
+)
+LINHAS_DADOS = Gauge(
+    'api_dados_linhas', 'Linhas do snapshot atual', multiprocess_mode='max'
+)
+
+# Séries das fases já resolvidas: evita o lookup de labels no caminho quente
+_fases = {nome: DURACAO_FASES.labels(nome) for nome in FASES}
+
+
+def fase(nome):
+    """
+    Context manager que mede uma fase do atendimento.
+
+    Args:
+        nome: Uma das FASES
+
+    Returns:
+        Timer do prometheus_client (use com with)
+    """
+    return _fases[nome].time()
+
+
+def registrar_consulta_cache(resultado):
+    """
+    Conta uma consulta ao cache (observador de CacheConsultas).
+
+    Args:
+        resultado: 'acerto', 'falha' ou 'coalescida'
+    """
+    CONSULTAS_CACHE.labels(resultado).inc()
+
+
+def registrar_carga(dados):
+    """
+    Registra a duração e o tamanho de um snapshot recém-publicado.
+
+    Args:
+        dados: ConjuntoDados
+    """
+    DURACAO_CARGA.set(dados.duracao_carga)
+    LINHAS_DADOS.set(len(dados.df))
+
+
+def exportar():
+    """
+    Gera o texto das métricas no formato do Prometheus.
+
+    Returns:
+        Tupla (bytes, content-type)
+    """
+    if MULTIPROCESSO:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def processo_encerrado(pid):
+    """Descarta as métricas de um worker que terminou (hook child_exit do gunicorn)"""
+    if MULTIPROCESSO:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,54 @@
+"""
+Normalização de textos para comparações tolerantes a acentos e caixa.
+
+"Além Paraíba", "ALEM PARAIBA" e "alem  paraiba" viram todos "alem paraiba":
+decomposição NFKD sem as marcas combinantes (acentos, cedilha), casefold e
+espaços colapsados. CNPJs são reduzidos aos 14 dígitos.
+"""
+
+import re
+import unicodedata
+
+_ESPACOS = re.compile(r'\s+')
+
+_NAO_DIGITOS = re.compile(r'\D')
+
+# Bloco "Combining Diacritical Marks": acentos, til e cedilha após o NFKD
+_MARCAS = re.compile('[\u0300-\u036f]')
+
+
+def normalizar(texto):
+    """
+    Remove acentos, converte para minúsculas e colapsa espaços.
+
+    Args:
+        texto: Valor a normalizar (não-str vira '')
+
+    Returns:
+        Texto normalizado
+    """
+    if not isinstance(texto, str):
+        return ''
+    if not texto.isascii():
+        texto = _MARCAS.sub('', unicodedata.normalize('NFKD', texto))
+    return _ESPACOS.sub(' ', texto.casefold()).strip()
+
+
+def normalizar_cnpj(cnpj):
+    """
+    Reduz um CNPJ aos 14 dígitos, aceitando pontuação e zeros à esquerda perdidos.
+
+    Ex: "12.345.678/0001-99" -> "12345678000199", "1234567000199" -> "01234567000199"
+
+    Args:
+        cnpj: CNPJ formatado ou só com dígitos
+
+    Returns:
+        Os 14 dígitos, ou '' se o valor não tiver entre 1 e 14 dígitos
+    """
+    if not isinstance(cnpj, str):
+        return ''
+    digitos = _NAO_DIGITOS.sub('', cnpj)
+    if not digitos or len(digitos) > 14:
+        return ''
+    return digitos.zfill(14)
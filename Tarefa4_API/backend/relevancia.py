@@ -0,0 +1,251 @@
+"""
+Ordenação das linhas encontradas por relevância.
+
+Cada linha encontrada recebe uma pontuação pelo tipo de ocorrência da
+consulta em cada coluna pontuada (valor igual > prefixo > início de palavra
+> substring), multiplicado pelo peso da coluna: Razao_Social e
+Nome_Fantasia valem mais que Logradouro. Empates ficam com a razão social
+mais curta (mais próxima da consulta) e depois com a ordem do arquivo.
+
+O que não depende da consulta é montado na carga: os textos de cada valor
+distinto com a pontuação trocada por espaços (para achar inícios de
+palavra) e o comprimento da razão social de cada linha. Na busca, o tipo de
+ocorrência é calculado uma vez por valor distinto das linhas encontradas, e
+pontuação, comprimento e linha viram uma única chave int64 por linha.
+
+A página pedida sai de uma seleção parcial (np.partition) das
+pagina * por_pagina menores chaves, ordenando só essas: a primeira página
+não paga a ordenação de todas as linhas encontradas.
+"""
+
+import re
+
+import numpy as np
+
+from normalizacao import normalizar
+
+# Peso de cada coluna pontuada (as demais só pontuam numa busca restrita a elas)
+PESOS_RELEVANCIA = {
+    'Razao_Social': 3,
+    'Nome_Fantasia': 3,
+    'Logradouro': 1,
+}
+
+# Peso de uma coluna fora de PESOS_RELEVANCIA (busca avançada por campo)
+PESO_PADRAO = 1
+
+# Coluna cujo comprimento desempata linhas com a mesma pontuação
+COLUNA_DESEMPATE = 'Razao_Social'
+
+# Tipos de ocorrência da consulta num valor, do mais relevante ao menos
+IGUAL = 4
+PREFIXO = 3
+INICIO_PALAVRA = 2
+SUBSTRING = 1
+
+# Separadores de palavra (tudo que não é letra ou dígito)
+_SEPARADORES = re.compile(r'[\W_]+')
+
+# Chave int64 por linha: (MAX_PONTUACAO - pontuação) | comprimento | linha
+_BITS_LINHA = 32
+_BITS_COMPRIMENTO = 16
+_MAX_COMPRIMENTO = (1 << _BITS_COMPRIMENTO) - 1
+_MASCARA_LINHA = (1 << _BITS_LINHA) - 1
+_DESLOCAMENTO_PONTUACAO = _BITS_LINHA + _BITS_COMPRIMENTO
+
+
+def palavras_de(texto):
+    """
+    Texto normalizado com os separadores trocados por um espaço e um espaço no início.
+
+    Assim "início de palavra" vira uma busca por ' ' + termo.
+
+    Args:
+        texto: Texto já normalizado
+
+    Returns:
+        String ' palavra palavra ...'
+    """
+    return ' ' + _SEPARADORES.sub(' ', texto)
+
+
+def nivel(texto, palavras, alvo, inicio_palavra):
+    """
+    Tipo de ocorrência do alvo num valor.
+
+    Args:
+        texto: Valor normalizado
+        palavras: palavras_de(texto)
+        alvo: Consulta normalizada
+        inicio_palavra: ' ' + palavras da consulta (None se ela não tem letras/dígitos)
+
+    Returns:
+        IGUAL, PREFIXO, INICIO_PALAVRA, SUBSTRING ou 0 (não contém)
+    """
+    if texto == alvo:
+        return IGUAL
+    if texto.startswith(alvo):
+        return PREFIXO
+    if inicio_palavra is not None and inicio_palavra in palavras:
+        return INICIO_PALAVRA
+    if alvo in texto:
+        return SUBSTRING
+    return 0
+
+
+class IndiceRelevancia:
+    """
+    Atributos de relevância pré-calculados na carga e seleção da página.
+    """
+
+    def __init__(self, indice, pesos=None):
+        """
+        Args:
+            indice: IndiceNgramas do DataFrame (fornece códigos e valores normalizados)
+            pesos: Peso por coluna (default: PESOS_RELEVANCIA)
+        """
+        pesos = PESOS_RELEVANCIA if pesos is None else pesos
+        self._indice = indice
+        self.pesos = {col: peso for col, peso in pesos.items() if col in indice.colunas}
+        self.max_pontuacao = IGUAL * max([PESO_PADRAO, *pesos.values()])
+
+        self._palavras = {}
+        for col in self.pesos:
+            self._palavras_da_coluna(col)
+
+        if COLUNA_DESEMPATE in indice.colunas:
+            codigos, textos = indice.valores_normalizados(COLUNA_DESEMPATE)
+            tamanhos = np.fromiter((len(t) for t in textos), dtype=np.int64, count=len(textos))
+            self._comprimentos = np.minimum(tamanhos, _MAX_COMPRIMENTO).astype(np.uint16)[codigos]
+        else:
+            self._comprimentos = np.zeros(indice.n_linhas, dtype=np.uint16)
+
+    @classmethod
+    def restaurar(cls, indice, palavras, comprimentos, pesos=None):
+        """
+        Reconstrói o índice a partir do que foi gravado por exportar().
+
+        Args:
+            indice: IndiceNgramas restaurado do mesmo snapshot
+            palavras: Dict coluna -> palavras_de() de cada valor distinto
+            comprimentos: Array uint16 do comprimento da razão social por linha
+            pesos: Peso por coluna (default: PESOS_RELEVANCIA)
+
+        Returns:
+            IndiceRelevancia pronto para pontuar
+        """
+        pesos = PESOS_RELEVANCIA if pesos is None else pesos
+        relevancia = cls.__new__(cls)
+        relevancia._indice = indice
+        relevancia.pesos = {col: peso for col, peso in pesos.items() if col in indice.colunas}
+        relevancia.max_pontuacao = IGUAL * max([PESO_PADRAO, *pesos.values()])
+        relevancia._palavras = dict(palavras)
+        relevancia._comprimentos = comprimentos
+        return relevancia
+
+    def exportar(self):
+        """
+        Retorna o que foi pré-calculado na carga, para gravação em disco.
+
+        Returns:
+            Dict com palavras (só das colunas pontuadas) e comprimentos
+        """
+        return {
+            'palavras': {col: self._palavras[col] for col in self.pesos},
+            'comprimentos': self._comprimentos
+        }
+
+    def _palavras_da_coluna(self, coluna):
+        """
+        palavras_de() de cada valor distinto da coluna.
+
+        Pré-calculado na carga para as colunas pontuadas; as demais são
+        montadas na primeira busca restrita a elas e guardadas.
+        """
+        if coluna not in self._palavras:
+            _, textos = self._indice.valores_normalizados(coluna)
+            self._palavras[coluna] = [palavras_de(t) for t in textos]
+        return self._palavras[coluna]
+
+    def pontuar(self, linhas, consulta, coluna=None):
+        """
+        Pontua as linhas encontradas.
+
+        Args:
+            linhas: Posições das linhas encontradas
+            consulta: Termo de busca
+            coluna: Coluna da busca (None para as colunas de PESOS_RELEVANCIA)
+
+        Returns:
+            Array int64 com a pontuação de cada linha, na ordem de linhas
+        """
+        linhas = np.asarray(linhas, dtype=np.int64)
+        alvo = normalizar(consulta)
+        termo = _SEPARADORES.sub(' ', alvo).strip()
+        inicio_palavra = ' ' + termo if termo else None
+
+        if coluna is None:
+            pesos = self.pesos
+        else:
+            pesos = {coluna: self.pesos.get(coluna, PESO_PADRAO)}
+
+        pontuacoes = np.zeros(len(linhas), dtype=np.int64)
+        for col, peso in pesos.items():
+            codigos, textos = self._indice.valores_normalizados(col)
+            palavras = self._palavras_da_coluna(col)
+            # Um teste por valor distinto, não por linha
+            distintos, inversos = np.unique(codigos[linhas], return_inverse=True)
+            niveis = np.fromiter(
+                (nivel(textos[c], palavras[c], alvo, inicio_palavra) for c in distintos.tolist()),
+                dtype=np.int64, count=len(distintos)
+            )
+            np.maximum(pontuacoes, niveis[inversos] * peso, out=pontuacoes)
+        return pontuacoes
+
+    def chaves(self, linhas, consulta, coluna=None):
+        """
+        Chave de ordenação de cada linha encontrada (menor = mais relevante).
+
+        Args:
+            linhas: Posições das linhas encontradas
+            consulta: Termo de busca
+            coluna: Coluna da busca (None para as colunas de PESOS_RELEVANCIA)
+
+        Returns:
+            Array int64, na ordem de linhas: pontuação (invertida), comprimento
+            da razão social e posição da linha, nessa prioridade
+        """
+        linhas = np.asarray(linhas, dtype=np.int64)
+        pontuacoes = self.pontuar(linhas, consulta, coluna)
+        chaves = (self.max_pontuacao - pontuacoes) << _DESLOCAMENTO_PONTUACAO
+        chaves |= self._comprimentos[linhas].astype(np.int64) << _BITS_LINHA
+        chaves |= linhas
+        return chaves
+
+    def pagina(self, chaves, inicio, quantidade):
+        """
+        Seleciona uma página das linhas em ordem de relevância.
+
+        Só as inicio + quantidade menores chaves são ordenadas; as demais
+        ficam de fora por uma seleção parcial O(n).
+
+        Args:
+            chaves: Array de chaves() das linhas encontradas
+            inicio: Quantas linhas pular (ex: (pagina - 1) * por_pagina)
+            quantidade: Tamanho da página
+
+        Returns:
+            Tupla (posições das linhas, pontuações), na ordem de relevância
+        """
+        fim = min(inicio + quantidade, len(chaves))
+        if fim <= inicio:
+            vazio = np.empty(0, dtype=np.int64)
+            return vazio, vazio
+
+        if fim < len(chaves):
+            chaves = np.partition(chaves, fim - 1)[:fim]
+        selecionadas = np.sort(chaves)[inicio:fim]
+
+        posicoes = selecionadas & _MASCARA_LINHA
+        pontuacoes = self.max_pontuacao - (selecionadas >> _DESLOCAMENTO_PONTUACAO)
+        return posicoes, pontuacoes
@@ -0,0 +1,97 @@
+"""
+Serialização JSON das respostas a partir de fragmentos prontos por linha.
+
+O JSON de cada linha do snapshot é gerado uma vez (na primeira vez que a
+linha aparece numa resposta) e guardado como bytes. Uma página de
+resultados é montada concatenando esses fragmentos; só o envelope da
+resposta (contagem, paginação, facetas) é codificado a cada requisição.
+
+Usa orjson quando instalado (pip install orjson); senão, o json da
+biblioteca padrão.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Fragmento(bytes):
+    """JSON já serializado, inserido como está por codificar()"""
+
+
+def dumps(valor):
+    """
+    Serializa um valor sem fragmentos em JSON (bytes UTF-8).
+
+    Args:
+        valor: Valor serializável (dict, list, str, números, None)
+
+    Returns:
+        JSON em bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(valor)
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def codificar(valor):
+    """
+    Serializa um valor que pode conter Fragmentos em dicts e listas.
+
+    Args:
+        valor: Valor serializável, possivelmente com Fragmentos
+
+    Returns:
+        JSON em bytes
+    """
+    if isinstance(valor, Fragmento):
+        return valor
+    if isinstance(valor, dict):
+        partes = [dumps(str(chave)) + b':' + codificar(item) for chave, item in valor.items()]
+        return b'{' + b','.join(partes) + b'}'
+    if isinstance(valor, (list, tuple)):
+        return b'[' + b','.join(codificar(item) for item in valor) + b']'
+    return dumps(valor)
+
+
+class LinhasJson:
+    """
+    Fragmentos JSON das linhas de um DataFrame, gerados sob demanda e guardados.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df: DataFrame do snapshot (imutável)
+        """
+        self._df = df
+        self._fragmentos = [None] * len(df)
+
+    def fragmentos(self, posicoes):
+        """
+        Retorna o fragmento JSON de cada linha, gerando os que faltam.
+
+        As linhas ainda não serializadas são convertidas juntas, com o mesmo
+        to_dict(orient='records') usado antes, então os valores são idênticos.
+
+        Args:
+            posicoes: Posições (iloc) das linhas
+
+        Returns:
+            Lista de Fragmentos, na ordem das posições
+        """
+        posicoes = [int(p) for p in posicoes]
+        cache = self._fragmentos
+        faltam = [p for p in posicoes if cache[p] is None]
+        if faltam:
+            registros = self._df.iloc[faltam].to_dict(orient='records')
+            for posicao, registro in zip(faltam, registros):
+                cache[posicao] = Fragmento(dumps(registro))
+        return [cache[p] for p in posicoes]
+
+    def geradas(self):
+        """Quantidade de linhas que já têm fragmento"""
+        return len(self._fragmentos) - self._fragmentos.count(None)
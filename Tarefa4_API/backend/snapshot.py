@@ -0,0 +1,332 @@
+"""
+Snapshot binário do cadastro de operadoras.
+
+Grava ao lado do CSV uma pasta <csv>.snapshot/<hash>/ com o DataFrame já
+limpo e tipado (códigos por coluna + valores distintos), as listas do índice
+de n-gramas e da busca aproximada, as listas ordenadas do autocompletar e os
+atributos de relevância, em arquivos .npy que podem ser mapeados em memória. Um worker que encontra o
+snapshot da versão atual do CSV não precisa reler nem reindexar o arquivo.
+
+Uso (build offline):
+    python snapshot.py [caminho_do_csv]
+
+Autor: Dave
+Data: Janeiro/2026
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from autocompletar import IndiceAutocompletar
+from dados import ConjuntoDados, assinatura_arquivo, hash_arquivo
+from fuzzy import IndiceFuzzy
+from indice import IndiceNgramas, codificar_coluna
+from relevancia import IndiceRelevancia
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o layout dos arquivos mudar
+VERSAO_FORMATO = 5
+
+
+def pasta_snapshots(caminho_csv):
+    """Retorna a pasta que guarda os snapshots de um CSV"""
+    return caminho_csv + '.snapshot'
+
+
+def _empacotar_textos(textos):
+    """
+    Empacota uma lista de strings em (bytes UTF-8, deslocamentos).
+
+    Args:
+        textos: Lista de strings
+
+    Returns:
+        Tupla (array uint8, array int64 com len(textos) + 1 deslocamentos)
+    """
+    codificados = [texto.encode('utf-8') for texto in textos]
+    deslocamentos = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in codificados], out=deslocamentos[1:])
+    return np.frombuffer(b''.join(codificados), dtype=np.uint8), deslocamentos
+
+
+def _desempacotar_textos(dados, deslocamentos):
+    """Operação inversa de _empacotar_textos"""
+    bruto = dados.tobytes()
+    limites = deslocamentos.tolist()
+    return [bruto[limites[i]:limites[i + 1]].decode('utf-8') for i in range(len(limites) - 1)]
+
+
+def salvar_snapshot(dados, caminho_csv):
+    """
+    Grava o snapshot de um ConjuntoDados ao lado do CSV.
+
+    A pasta é escrita num diretório temporário e renomeada no final, então
+    leitores nunca veem um snapshot pela metade. Snapshots de outras versões
+    são removidos.
+
+    Args:
+        dados: ConjuntoDados carregado do CSV
+        caminho_csv: CSV de origem
+
+    Returns:
+        Caminho da pasta do snapshot
+    """
+    raiz = pasta_snapshots(caminho_csv)
+    destino = os.path.join(raiz, dados.versao)
+    os.makedirs(raiz, exist_ok=True)
+
+    df = dados.df
+    colunas = list(df.columns)
+    codigos = []
+    valores = []
+    for col in colunas:
+        cod, vals = codificar_coluna(df[col])
+        codigos.append(cod)
+        valores.append(vals)
+
+    limites_valores = np.cumsum([0] + [len(vals) for vals in valores])
+    valores_bytes, valores_deslocamentos = _empacotar_textos(
+        [valor for vals in valores for valor in vals]
+    )
+    exportado = dados.indice.exportar()
+    fuzzy = dados.fuzzy.exportar()
+    trigramas_bytes, trigramas_deslocamentos = _empacotar_textos(fuzzy['trigramas'])
+    sugestoes = dados.autocompletar.exportar()
+    nomes_bytes, nomes_deslocamentos = _empacotar_textos(sugestoes['chaves_nomes'])
+    originais_bytes, originais_deslocamentos = _empacotar_textos(sugestoes['valores'])
+    relevancia = dados.relevancia.exportar()
+    colunas_relevancia = list(relevancia['palavras'])
+    limites_palavras = np.cumsum([0] + [len(relevancia['palavras'][col])
+                                        for col in colunas_relevancia])
+    palavras_bytes, palavras_deslocamentos = _empacotar_textos(
+        [texto for col in colunas_relevancia for texto in relevancia['palavras'][col]]
+    )
+
+    temporaria = tempfile.mkdtemp(prefix='.tmp-', dir=raiz)
+    try:
+        arrays = {
+            'codigos': np.vstack(codigos) if codigos else np.empty((0, 0), dtype=np.int32),
+            'limites_valores': limites_valores,
+            'valores_bytes': valores_bytes,
+            'valores_deslocamentos': valores_deslocamentos,
+            'fuzzy_trigramas_bytes': trigramas_bytes,
+            'fuzzy_trigramas_deslocamentos': trigramas_deslocamentos,
+            'fuzzy_linhas': fuzzy['linhas'],
+            'fuzzy_inicios': fuzzy['inicios'],
+            'autocompletar_nomes_bytes': nomes_bytes,
+            'autocompletar_nomes_deslocamentos': nomes_deslocamentos,
+            'autocompletar_valores_bytes': originais_bytes,
+            'autocompletar_valores_deslocamentos': originais_deslocamentos,
+            'autocompletar_donos': sugestoes['donos'],
+            'autocompletar_deslocamentos': sugestoes['deslocamentos'],
+            'relevancia_limites': limites_palavras,
+            'relevancia_palavras_bytes': palavras_bytes,
+            'relevancia_palavras_deslocamentos': palavras_deslocamentos,
+            'relevancia_comprimentos': relevancia['comprimentos'],
+        }
+        if exportado is not None:
+            # Listas de n-gramas: ausentes quando a busca é de outro backend
+            ngramas_bytes, ngramas_deslocamentos = _empacotar_textos(exportado['ngramas'])
+            arrays.update({
+                'ngramas_bytes': ngramas_bytes,
+                'ngramas_deslocamentos': ngramas_deslocamentos,
+                'celulas': exportado['celulas'],
+                'inicios': exportado['inicios'],
+            })
+        for nome, array in arrays.items():
+            np.save(os.path.join(temporaria, nome + '.npy'), array)
+
+        meta = {
+            'formato': VERSAO_FORMATO,
+            'versao': dados.versao,
+            'assinatura': list(dados.assinatura) if dados.assinatura else None,
+            'colunas': colunas,
+            'categoricas': [col for col in colunas
+                            if isinstance(df[col].dtype, pd.CategoricalDtype)],
+            'colunas_fuzzy': fuzzy['colunas'],
+            'colunas_autocompletar': sugestoes['colunas'],
+            'colunas_relevancia': colunas_relevancia,
+            'listas': exportado is not None,
+            'linhas': len(df)
+        }
+        with open(os.path.join(temporaria, 'meta.json'), 'w', encoding='utf-8') as arquivo:
+            json.dump(meta, arquivo, ensure_ascii=False)
+
+        try:
+            os.rename(temporaria, destino)
+        except OSError:
+            # Outro processo já gravou esta versão
+            shutil.rmtree(temporaria, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        raise
+
+    for nome in os.listdir(raiz):
+        if nome != dados.versao and not nome.startswith('.tmp-'):
+            shutil.rmtree(os.path.join(raiz, nome), ignore_errors=True)
+
+    return destino
+
+
+def _ler_meta(pasta):
+    """Lê o meta.json de um snapshot, ou None se ausente/inválido"""
+    try:
+        with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as arquivo:
+            meta = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('formato') == VERSAO_FORMATO else None
+
+
+def localizar_snapshot(caminho_csv, versao=None):
+    """
+    Procura o snapshot válido para o conteúdo atual do CSV.
+
+    Se a assinatura (mtime, tamanho) do CSV bate com a gravada, o snapshot é
+    aceito sem ler o CSV; caso contrário o hash do arquivo decide.
+
+    Args:
+        caminho_csv: CSV de origem
+        versao: Hash do CSV, se já calculado
+
+    Returns:
+        Tupla (pasta, meta) ou None se não houver snapshot válido
+    """
+    raiz = pasta_snapshots(caminho_csv)
+    if not os.path.isdir(raiz):
+        return None
+
+    candidatos = []
+    for nome in os.listdir(raiz):
+        if nome.startswith('.tmp-'):
+            continue
+        meta = _ler_meta(os.path.join(raiz, nome))
+        if meta is not None and meta['versao'] == nome:
+            candidatos.append((os.path.join(raiz, nome), meta))
+    if not candidatos:
+        return None
+
+    assinatura = assinatura_arquivo(caminho_csv)
+    if assinatura is None:
+        return None
+    if versao is None:
+        for pasta, meta in candidatos:
+            if meta['assinatura'] == list(assinatura):
+                return pasta, meta
+        versao = hash_arquivo(caminho_csv)
+
+    for pasta, meta in candidatos:
+        if meta['versao'] == versao:
+            return pasta, meta
+    return None
+
+
+def carregar_snapshot(caminho_csv, versao=None, mmap=False, listas=True):
+    """
+    Carrega o snapshot do CSV, se existir um válido para o conteúdo atual.
+
+    Args:
+        caminho_csv: CSV de origem
+        versao: Hash do CSV, se já calculado
+        mmap: Mapeia os arrays em memória em vez de lê-los
+        listas: Carrega as listas de n-gramas do índice (False quando a
+            busca por substring fica com outro backend)
+
+    Returns:
+        ConjuntoDados com origem 'snapshot', ou None se o snapshot estiver
+        ausente, desatualizado ou sem as listas pedidas
+    """
+    inicio = time.perf_counter()
+    encontrado = localizar_snapshot(caminho_csv, versao)
+    if encontrado is None:
+        return None
+    pasta, meta = encontrado
+    if listas and not meta['listas']:
+        # Gravado com BACKEND_BUSCA=sqlite: o índice em memória precisa das listas
+        return None
+
+    def ler(nome):
+        return np.load(os.path.join(pasta, nome + '.npy'), mmap_mode='r' if mmap else None)
+
+    codigos = ler('codigos')
+    limites = ler('limites_valores').tolist()
+    todos_valores = _desempacotar_textos(ler('valores_bytes'), ler('valores_deslocamentos'))
+    valores = [todos_valores[limites[j]:limites[j + 1]] for j in range(len(meta['colunas']))]
+
+    categoricas = set(meta['categoricas'])
+    df = pd.DataFrame({
+        col: (pd.Categorical.from_codes(codigos[j], categories=valores[j])
+              if col in categoricas
+              else np.array(valores[j], dtype=object)[codigos[j]])
+        for j, col in enumerate(meta['colunas'])
+    })
+
+    if listas:
+        indice = IndiceNgramas.restaurar(
+            meta['colunas'],
+            [codigos[j] for j in range(len(meta['colunas']))],
+            valores,
+            _desempacotar_textos(ler('ngramas_bytes'), ler('ngramas_deslocamentos')),
+            ler('celulas'),
+            ler('inicios')
+        )
+    else:
+        indice = IndiceNgramas.restaurar(
+            meta['colunas'], [codigos[j] for j in range(len(meta['colunas']))], valores
+        )
+
+    fuzzy = IndiceFuzzy.restaurar(
+        meta['colunas_fuzzy'],
+        meta['linhas'],
+        _desempacotar_textos(ler('fuzzy_trigramas_bytes'), ler('fuzzy_trigramas_deslocamentos')),
+        ler('fuzzy_linhas'),
+        ler('fuzzy_inicios')
+    )
+
+    autocompletar = IndiceAutocompletar.restaurar(
+        meta['colunas_autocompletar'],
+        _desempacotar_textos(ler('autocompletar_nomes_bytes'),
+                             ler('autocompletar_nomes_deslocamentos')),
+        _desempacotar_textos(ler('autocompletar_valores_bytes'),
+                             ler('autocompletar_valores_deslocamentos')),
+        ler('autocompletar_donos'),
+        ler('autocompletar_deslocamentos')
+    )
+
+    limites = ler('relevancia_limites').tolist()
+    todas_palavras = _desempacotar_textos(ler('relevancia_palavras_bytes'),
+                                          ler('relevancia_palavras_deslocamentos'))
+    relevancia = IndiceRelevancia.restaurar(
+        indice,
+        {col: todas_palavras[limites[j]:limites[j + 1]]
+         for j, col in enumerate(meta['colunas_relevancia'])},
+        ler('relevancia_comprimentos')
+    )
+
+    assinatura = tuple(meta['assinatura']) if meta['assinatura'] else None
+    return ConjuntoDados(df, meta['versao'], assinatura=assinatura, inicio=inicio,
+                         indice=indice, origem='snapshot', fuzzy=fuzzy,
+                         autocompletar=autocompletar, relevancia=relevancia)
+
+
+def main():
+    """Build offline: lê o CSV e grava o snapshot"""
+    from app import ARQUIVO_CSV, construir_dados
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_CSV
+    dados = construir_dados(caminho, usar_snapshot=False)
+    destino = salvar_snapshot(dados, caminho)
+    print(f"Snapshot gravado em {destino} ({len(dados.df)} linhas, versão {dados.versao})")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,15 +6,44 @@ Execução:
 """
 
 import pytest
+import gzip
+import json
+import logging
+import queue
+import numpy as np
 import pandas as pd
 import os
 import sys
+import threading
+import time
 from unittest.mock import patch
+from prometheus_client import REGISTRY
+from starlette.testclient import TestClient
 
 # Adiciona o diretório pai ao path para importar o módulo
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, limpar_valor
+import app as modulo_app
+import asgi
+from app import app, limpar_valor, paginar, compactar_colunas
+from autocompletar import IndiceAutocompletar
+from busca_sqlite import BuscaSqlite
+from cache import CacheConsultas
+from estaticos import comprimir_estaticos
+from facetas import IndiceFacetas
+from filtros import Filtro, buscar_filtros
+from fuzzy import IndiceFuzzy
+from serializacao import Fragmento, LinhasJson, codificar
+from snapshot import carregar_snapshot
+from indice import IndiceNgramas
+from logs import FiltroAmostragem, _HandlerFila
+from normalizacao import normalizar
+from relevancia import IndiceRelevancia
+
+CAMINHO_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'dados_cadastrais_op.csv'
+)
 
 
 @pytest.fixture
@@ -25,6 +54,15 @@ def client():
         yield client
 
 
+@pytest.fixture(scope='module')
+def dataframe_real():
+    """Fixture que carrega o CSV real de operadoras já limpo"""
+    df = pd.read_csv(CAMINHO_CSV, encoding='utf-8', delimiter=';', quotechar='"')
+    for col in df.columns:
+        df[col] = df[col].apply(limpar_valor)
+    return df
+
+
 @pytest.fixture
 def mock_dataframe():
     """Fixture que cria um DataFrame de teste"""
@@ -64,6 +102,165 @@ class TestLimparValor:
         assert limpar_valor(None) == ''
 
 
+class TestLeituraCsv:
+    """Testes da leitura do CSV em lotes"""
+
+    def test_equivale_leitura_inteira(self, dataframe_real):
+        """Lotes pequenos produzem o mesmo DataFrame que ler o arquivo de uma vez"""
+        esperado = compactar_colunas(dataframe_real.copy())
+        pd.testing.assert_frame_equal(modulo_app.ler_csv(CAMINHO_CSV, tamanho_lote=7), esperado)
+
+    def test_tipos_decididos_pelo_arquivo_todo(self, tmp_path):
+        """Números são limpos só em colunas numéricas no arquivo inteiro"""
+        caminho = tmp_path / 'operadoras.csv'
+        caminho.write_text('A;B;C\n712.0;0123;x\n712;;S/N\n1.5;7;\n', encoding='utf-8')
+
+        df = modulo_app.ler_csv(str(caminho), tamanho_lote=1)
+
+        assert df['A'].tolist() == ['712', '712', '1.5']
+        assert df['B'].tolist() == ['123', '', '7']
+        assert df['C'].tolist() == ['x', 'S/N', '']
+
+    def test_encoding_latin1(self, tmp_path):
+        """Arquivo latin1 é detectado pela amostra e lido uma vez"""
+        caminho = tmp_path / 'operadoras.csv'
+        caminho.write_bytes('Cidade\nSão Paulo\n'.encode('latin1'))
+
+        assert modulo_app.detectar_encoding(str(caminho)) == 'latin1'
+        assert modulo_app.ler_csv(str(caminho))['Cidade'].tolist() == ['São Paulo']
+
+    def test_bytes_invalidos_depois_da_amostra(self, tmp_path, monkeypatch):
+        """Bytes latin1 depois da amostra UTF-8 não interrompem a leitura"""
+        caminho = tmp_path / 'operadoras.csv'
+        caminho.write_bytes('Cidade\nSão Paulo\n'.encode('utf-8') + 'João Pessoa\n'.encode('latin1'))
+        monkeypatch.setattr(modulo_app, 'AMOSTRA_ENCODING', 12)
+
+        assert modulo_app.detectar_encoding(str(caminho)) == 'utf-8'
+        assert modulo_app.ler_csv(str(caminho))['Cidade'].tolist() == ['São Paulo', 'João Pessoa']
+
+
+class TestIndiceNgramas:
+    """Testes para o índice invertido de n-gramas"""
+
+    CONSULTAS = ['a', 'SP', 'uni', 'unimed', 'Odontologia de Grupo', 'são paulo',
+                 'LTDA', '@gmail.com', '0001', 'xyzabc', 'ç']
+
+    def test_equivale_str_contains(self, dataframe_real):
+        """Testa que o índice encontra as mesmas linhas que str.contains nos textos normalizados"""
+        indice = IndiceNgramas(dataframe_real)
+        normalizado = dataframe_real.apply(lambda coluna: coluna.map(normalizar))
+
+        for consulta in self.CONSULTAS:
+            mascara = pd.Series(False, index=dataframe_real.index)
+            for col in normalizado.columns:
+                mascara |= normalizado[col].str.contains(normalizar(consulta), regex=False)
+            esperado = mascara.to_numpy().nonzero()[0].tolist()
+            assert indice.buscar(consulta).tolist() == esperado, consulta
+
+    def test_equivale_str_contains_por_coluna(self, dataframe_real):
+        """Testa a busca restrita a uma coluna"""
+        indice = IndiceNgramas(dataframe_real)
+
+        for campo, consulta in [('UF', 'SP'), ('Razao_Social', 'unimed'),
+                                ('Cidade', 'rio'), ('CNPJ', '0001')]:
+            mascara = dataframe_real[campo].map(normalizar).str.contains(normalizar(consulta), regex=False)
+            esperado = mascara.to_numpy().nonzero()[0].tolist()
+            assert indice.buscar(consulta, coluna=campo).tolist() == esperado
+
+    def test_sem_acentos(self, dataframe_real):
+        """Testa que acentos, caixa e espaços repetidos não mudam o resultado"""
+        indice = IndiceNgramas(dataframe_real)
+
+        esperado = indice.buscar('São Paulo')
+        assert len(esperado) > 0
+        for consulta in ['sao paulo', 'SAO  PAULO', ' são paulo ']:
+            assert np.array_equal(indice.buscar(consulta), esperado), consulta
+        assert np.array_equal(indice.buscar('ALEM PARAIBA', coluna='Cidade'),
+                              indice.buscar('Além Paraíba', coluna='Cidade'))
+
+    def test_dataframe_compactado(self, dataframe_real):
+        """Testa que colunas categóricas dão os mesmos resultados e dicts"""
+        compacto = compactar_colunas(dataframe_real.copy())
+        assert isinstance(compacto['UF'].dtype, pd.CategoricalDtype)
+        assert compacto['CNPJ'].dtype == object
+
+        indice = IndiceNgramas(dataframe_real)
+        indice_compacto = IndiceNgramas(compacto)
+        for consulta in self.CONSULTAS:
+            assert np.array_equal(indice.buscar(consulta), indice_compacto.buscar(consulta))
+
+        linhas = indice_compacto.buscar('unimed')[:5]
+        assert (compacto.iloc[linhas].to_dict(orient='records')
+                == dataframe_real.iloc[linhas].to_dict(orient='records'))
+
+    def test_lotes_pequenos_dao_o_mesmo_indice(self, dataframe_real, monkeypatch):
+        """Testa que construir as listas em muitos lotes dá os mesmos arrays"""
+        inteiro = IndiceNgramas(dataframe_real)
+        fuzzy_inteiro = IndiceFuzzy(dataframe_real)
+        monkeypatch.setattr('indice.PARES_POR_LOTE', 500)
+
+        em_lotes = IndiceNgramas(dataframe_real)
+        fuzzy_em_lotes = IndiceFuzzy(dataframe_real)
+
+        assert np.array_equal(em_lotes._celulas, inteiro._celulas)
+        assert np.array_equal(em_lotes._inicios, inteiro._inicios)
+        assert np.array_equal(fuzzy_em_lotes._linhas, fuzzy_inteiro._linhas)
+        assert np.array_equal(fuzzy_em_lotes._inicios, fuzzy_inteiro._inicios)
+
+    def test_substring_entre_celulas_nao_casa(self, mock_dataframe):
+        """Testa que trigramas de células diferentes não geram falso positivo"""
+        indice = IndiceNgramas(mock_dataframe)
+
+        assert indice.buscar('SPSão').tolist() == []
+
+
+class TestBuscaSqlite:
+    """Testes para o backend de busca em SQLite FTS5"""
+
+    CONSULTAS = TestIndiceNgramas.CONSULTAS + ['"', 'rua ', 'saúde']
+
+    def test_equivale_indice_em_memoria(self, dataframe_real):
+        """Testa que as posições e contagens são as mesmas do IndiceNgramas"""
+        indice = IndiceNgramas(dataframe_real)
+        sqlite = BuscaSqlite.abrir(dataframe_real)
+
+        for consulta in self.CONSULTAS:
+            esperado = indice.buscar(consulta).tolist()
+            assert sqlite.buscar(consulta).tolist() == esperado, consulta
+            assert sqlite.contar(consulta) == len(esperado), consulta
+            for campo in ('Razao_Social', 'Cidade', 'UF'):
+                assert (sqlite.buscar(consulta, coluna=campo).tolist()
+                        == indice.buscar(consulta, coluna=campo).tolist()), (campo, consulta)
+
+    def test_endpoints_com_backend_sqlite(self, client, mock_dataframe, monkeypatch):
+        """Testa que as respostas são idênticas com BACKEND_BUSCA=sqlite"""
+        urls = ['/api/pesquisa?consulta=operadora&facetas=UF',
+                '/api/pesquisa/avancada?campo=Cidade&consulta=s',
+                '/api/pesquisa/avancada?filtro=Cidade:contem:s&filtro=UF:igual:sp',
+                '/api/facetas?consulta=teste']
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            esperado = [client.get(url).get_json() for url in urls]
+        monkeypatch.setattr(modulo_app, 'BACKEND_BUSCA', 'sqlite')
+        with patch('app.carregar_csv', return_value=mock_dataframe.copy()):
+            obtido = [client.get(url).get_json() for url in urls]
+            backend = modulo_app.obter_dados(modulo_app.carregar_csv()).busca.nome
+
+        assert backend == 'sqlite'
+        assert obtido == esperado
+
+    def test_banco_em_arquivo(self, tmp_path, mock_dataframe):
+        """Testa que o banco da versão é reaproveitado e o de outra versão removido"""
+        caminho_csv = str(tmp_path / 'operadoras.csv')
+        BuscaSqlite.abrir(mock_dataframe, versao='v1', caminho_csv=caminho_csv)
+        primeiro = BuscaSqlite.abrir(mock_dataframe, versao='v2', caminho_csv=caminho_csv)
+        gravado = os.path.getmtime(tmp_path / 'operadoras.csv.sqlite' / 'v2.db')
+        segundo = BuscaSqlite.abrir(mock_dataframe, versao='v2', caminho_csv=caminho_csv)
+
+        assert os.listdir(tmp_path / 'operadoras.csv.sqlite') == ['v2.db']
+        assert os.path.getmtime(tmp_path / 'operadoras.csv.sqlite' / 'v2.db') == gravado
+        assert segundo.buscar('rio').tolist() == primeiro.buscar('rio').tolist() == [1]
+
+
 class TestHealthCheck:
     """Testes para o endpoint /teste"""
 
@@ -126,6 +323,141 @@ class TestPesquisaSimples:
         assert data1['contagem'] == data2['contagem']
 
 
+class TestPaginacao:
+    """Testes para a paginação sobre posições de linhas"""
+
+    @pytest.fixture
+    def dataframe_grande(self):
+        """DataFrame com 45 operadoras que casam com 'Operadora'"""
+        return pd.DataFrame({
+            'Registro_ANS': [str(100000 + i) for i in range(45)],
+            'Razao_Social': [f'Operadora {i}' for i in range(45)],
+            'UF': ['SP'] * 45
+        })
+
+    def test_paginar_array_de_posicoes(self):
+        """Testa paginação de um array numpy de posições"""
+        dados = paginar(np.arange(45), 3, 20)
+
+        assert dados['resultados'].tolist() == list(range(40, 45))
+        assert dados['paginacao'] == {
+            'pagina': 3, 'por_pagina': 20, 'total': 45, 'total_paginas': 3
+        }
+
+    def test_ultima_pagina(self, client, dataframe_grande):
+        """Testa que a última página traz só as linhas restantes"""
+        with patch('app.carregar_csv', return_value=dataframe_grande):
+            response = client.get('/api/pesquisa?consulta=operadora&pagina=3')
+
+        data = response.get_json()
+        assert data['contagem'] == 45
+        assert data['paginacao']['total_paginas'] == 3
+        assert [r['Registro_ANS'] for r in data['resultados']] == [
+            str(100000 + i) for i in range(40, 45)
+        ]
+
+    def test_materializa_apenas_pagina(self, client, dataframe_grande):
+        """Testa que só as linhas da página são serializadas"""
+        with patch('app.carregar_csv', return_value=dataframe_grande), \
+                patch('app.serializar_linhas', wraps=modulo_app.serializar_linhas) as espiao:
+            client.get('/api/pesquisa/avancada?campo=UF&consulta=sp&por_pagina=10')
+
+        assert len(espiao.call_args.args[1]) == 10
+
+
+class TestCacheConsultas:
+    """Testes para o cache LRU de consultas"""
+
+    def test_despejo_por_entradas(self):
+        """Testa que a entrada menos usada é despejada"""
+        cache = CacheConsultas(max_entradas=2)
+        cache.guardar((None, 'A'), np.arange(3))
+        cache.guardar((None, 'B'), np.arange(3))
+        cache.obter((None, 'A'))
+        cache.guardar((None, 'C'), np.arange(3))
+
+        assert cache.obter((None, 'B')) is None
+        assert cache.obter((None, 'A')) is not None
+        assert cache.estatisticas()['despejos'] == 1
+
+    def test_despejo_por_bytes(self):
+        """Testa o limite por bytes e que arrays grandes demais não entram"""
+        cache = CacheConsultas(max_entradas=10, max_bytes=100)
+        cache.guardar((None, 'A'), np.arange(10, dtype=np.int64))
+        cache.guardar((None, 'B'), np.arange(10, dtype=np.int64))
+        cache.guardar((None, 'C'), np.arange(20, dtype=np.int64))
+
+        assert cache.obter((None, 'A')) is None
+        assert cache.obter((None, 'C')) is None
+        assert cache.estatisticas()['bytes'] == 80
+
+    def test_paginas_usam_mesma_busca(self, client, mock_dataframe):
+        """Testa que páginas seguintes e variações de caixa acertam o cache"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            client.get('/api/pesquisa?consulta=operadora')
+            antes = modulo_app._cache_consultas.estatisticas()
+            client.get('/api/pesquisa?consulta=OPERADORA&pagina=2')
+            depois = client.get('/api/estatisticas').get_json()['cache']
+
+        assert depois['acertos'] == antes['acertos'] + 1
+        assert depois['falhas'] == antes['falhas']
+
+    def test_limpa_quando_dados_mudam(self, client, mock_dataframe):
+        """Testa que trocar o DataFrame invalida o cache"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            client.get('/api/pesquisa?consulta=SP')
+        outro = mock_dataframe.copy()
+        outro['UF'] = ['RJ', 'RJ']
+        with patch('app.carregar_csv', return_value=outro):
+            data = client.get('/api/pesquisa?consulta=SP').get_json()
+
+        assert data['contagem'] == 0
+
+
+class TestBuscaUnica:
+    """Testes para o agrupamento de buscas simultâneas iguais (single-flight)"""
+
+    def test_requisicoes_simultaneas_compartilham_a_busca(self):
+        """Testa que só a primeira thread calcula e as demais recebem o mesmo array"""
+        cache = CacheConsultas()
+        liberar = threading.Event()
+        chamadas = []
+
+        def calcular():
+            chamadas.append(1)
+            liberar.wait(5)
+            return np.arange(3)
+
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(cache.obter_ou_calcular(('v', 'A'), calcular)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while cache.estatisticas()['coalescidas'] < 4:
+            time.sleep(0.001)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(chamadas) == 1
+        assert all(r is resultados[0] for r in resultados)
+        assert cache.estatisticas()['em_andamento'] == 0
+        assert cache.obter(('v', 'A')) is resultados[0]
+
+    def test_erro_e_repassado_e_nao_fica_preso(self):
+        """Testa que a exceção chega a quem chamou e a chave pode ser recalculada"""
+        cache = CacheConsultas()
+
+        def falhar():
+            raise ValueError('falhou')
+
+        with pytest.raises(ValueError):
+            cache.obter_ou_calcular(('v', 'A'), falhar)
+        assert len(cache.obter_ou_calcular(('v', 'A'), lambda: np.arange(2))) == 2
+
+
 class TestPesquisaAvancada:
     """Testes para o endpoint /api/pesquisa/avancada"""
 
@@ -155,6 +487,843 @@ class TestPesquisaAvancada:
         assert data['resultados'][0]['UF'] == 'SP'
 
 
+class TestRecarga:
+    """Testes para a recarga a quente do CSV"""
+
+    CABECALHO = 'REGISTRO_OPERADORA;CNPJ;Razao_Social;UF\n'
+
+    @pytest.fixture
+    def csv_temporario(self, tmp_path, monkeypatch):
+        """Aponta a aplicação para um CSV temporário com estado limpo"""
+        caminho = tmp_path / 'operadoras.csv'
+        caminho.write_text(self.CABECALHO + '"1";"11";"Operadora Alfa";"SP"\n',
+                           encoding='utf-8')
+        monkeypatch.setattr(modulo_app, 'ARQUIVO_CSV', str(caminho))
+        monkeypatch.setattr(modulo_app, 'RECARGA_INTERVALO', 0)
+        monkeypatch.setattr(modulo_app, '_dados', None)
+        monkeypatch.setattr(modulo_app, '_dados_anterior', None)
+        return caminho
+
+    def test_recarrega_quando_arquivo_muda(self, client, csv_temporario):
+        """Testa a troca de snapshot mantendo o antigo para quem já o tinha"""
+        df_antigo = modulo_app.carregar_csv()
+        versao_antiga = modulo_app._dados.versao
+
+        csv_temporario.write_text(
+            self.CABECALHO + '"1";"11";"Operadora Alfa";"SP"\n"2";"22";"Operadora Beta";"RJ"\n',
+            encoding='utf-8'
+        )
+        assert modulo_app.recarregar_dados() is True
+
+        assert len(modulo_app.carregar_csv()) == 2
+        assert modulo_app._dados.versao != versao_antiga
+        assert modulo_app.obter_dados(df_antigo).versao == versao_antiga
+
+        data = client.get('/api/estatisticas').get_json()
+        assert data['dados']['linhas'] == 2
+        assert data['recarga']['recargas'] >= 1
+
+    def test_arquivo_inalterado_nao_recarrega(self, csv_temporario):
+        """Testa que o mesmo conteúdo não gera novo snapshot"""
+        modulo_app.carregar_csv()
+        dados = modulo_app._dados
+
+        assert modulo_app.recarregar_dados(forcar=True) is False
+        assert modulo_app._dados is dados
+
+    def test_apos_fork_carrega_e_inicia_monitor(self, csv_temporario, monkeypatch):
+        """Testa a preparação de um worker do gunicorn"""
+        monkeypatch.setattr(modulo_app, 'RECARGA_INTERVALO', 60)
+        monkeypatch.setattr(modulo_app, '_monitor', None)
+        modulo_app.apos_fork()
+
+        try:
+            assert modulo_app._dados is not None
+            assert modulo_app._monitor.is_alive()
+        finally:
+            modulo_app._monitor.parar()
+
+    def test_admin_desabilitado_sem_token(self, client, monkeypatch):
+        """Testa que o endpoint administrativo exige ADMIN_TOKEN configurado"""
+        monkeypatch.setattr(modulo_app, 'ADMIN_TOKEN', '')
+        assert client.post('/api/admin/recarregar').status_code == 403
+
+        monkeypatch.setattr(modulo_app, 'ADMIN_TOKEN', 'segredo')
+        response = client.post('/api/admin/recarregar',
+                               headers={'X-Admin-Token': 'errado'})
+        assert response.status_code == 401
+
+
+class TestSnapshot:
+    """Testes para o snapshot binário gravado ao lado do CSV"""
+
+    @pytest.fixture
+    def csv_temporario(self, tmp_path, dataframe_real):
+        """Copia as primeiras linhas do CSV real para um arquivo temporário"""
+        caminho = tmp_path / 'operadoras.csv'
+        dataframe_real.head(50).to_csv(caminho, sep=';', index=False)
+        return str(caminho)
+
+    def test_snapshot_equivale_ao_csv(self, csv_temporario):
+        """Testa que a segunda carga vem do snapshot com os mesmos dados"""
+        do_csv = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+        do_snapshot = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+
+        assert do_csv.origem == 'csv'
+        assert do_snapshot.origem == 'snapshot'
+        assert do_snapshot.versao == do_csv.versao
+        pd.testing.assert_frame_equal(do_snapshot.df, do_csv.df)
+        for consulta in ['unimed', 'SP', 'a', 'ltda']:
+            assert np.array_equal(do_snapshot.busca.buscar(consulta),
+                                  do_csv.busca.buscar(consulta))
+
+    def test_snapshot_guarda_fuzzy_e_autocompletar(self, csv_temporario):
+        """Testa que fuzzy, autocompletar e relevância vêm do snapshot e respondem igual aos do CSV"""
+        do_csv = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+        with patch('dados.IndiceFuzzy', side_effect=AssertionError), \
+                patch('dados.IndiceAutocompletar', side_effect=AssertionError), \
+                patch('dados.IndiceRelevancia', side_effect=AssertionError):
+            do_snapshot = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+
+        for consulta in ['unimed', 'odonto prev', 'sao paulo', 'a']:
+            assert np.array_equal(do_snapshot.fuzzy.buscar(consulta), do_csv.fuzzy.buscar(consulta))
+            assert (do_snapshot.autocompletar.sugerir(consulta, 50)
+                    == do_csv.autocompletar.sugerir(consulta, 50))
+            linhas = do_csv.busca.buscar(consulta)
+            assert np.array_equal(do_snapshot.relevancia.chaves(linhas, consulta),
+                                  do_csv.relevancia.chaves(linhas, consulta))
+
+    def test_snapshot_sem_listas_no_backend_sqlite(self, csv_temporario, monkeypatch):
+        """Testa que o modo sqlite não monta nem grava as listas de n-gramas"""
+        monkeypatch.setattr(modulo_app, 'BACKEND_BUSCA', 'sqlite')
+        do_csv = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+        do_snapshot = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+
+        assert not do_csv.indice.com_listas and not do_snapshot.indice.com_listas
+        assert do_snapshot.origem == 'snapshot'
+        assert np.array_equal(do_snapshot.busca.buscar('unimed'), do_csv.busca.buscar('unimed'))
+        with pytest.raises(RuntimeError):
+            do_csv.indice.buscar('unimed')
+
+        # O backend em memória precisa das listas: o snapshot do sqlite não serve
+        monkeypatch.setattr(modulo_app, 'BACKEND_BUSCA', 'memoria')
+        assert carregar_snapshot(csv_temporario) is None
+        em_memoria = modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+        assert em_memoria.origem == 'csv' and em_memoria.indice.com_listas
+        assert np.array_equal(em_memoria.busca.buscar('unimed'), do_csv.busca.buscar('unimed'))
+
+    def test_snapshot_desatualizado_e_ignorado(self, csv_temporario):
+        """Testa que mudar o CSV invalida o snapshot"""
+        modulo_app.construir_dados(csv_temporario, usar_snapshot=True)
+        with open(csv_temporario, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(';'.join(['999999'] * 20) + '\n')
+
+        assert carregar_snapshot(csv_temporario) is None
+        assert len(modulo_app.construir_dados(csv_temporario, usar_snapshot=True).df) == 51
+
+
+class TestFacetas:
+    """Testes para as contagens por valor (facetas)"""
+
+    def test_equivale_value_counts(self, dataframe_real):
+        """Testa as contagens contra value_counts das linhas encontradas"""
+        compacto = compactar_colunas(dataframe_real.copy())
+        indice = IndiceNgramas(compacto)
+        facetas = IndiceFacetas(compacto, indice)
+        linhas = indice.buscar('unimed')
+
+        for coluna in ['UF', 'Modalidade', 'Regiao_de_Comercializacao']:
+            esperado = dataframe_real.iloc[linhas][coluna].value_counts()
+            obtido = {item['valor']: item['contagem'] for item in facetas.contar(coluna, linhas)}
+            assert obtido == esperado.to_dict()
+
+    def test_endpoint_facetas(self, client, mock_dataframe):
+        """Testa /api/facetas com e sem consulta"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            todas = client.get('/api/facetas?facetas=UF').get_json()
+            busca = client.get('/api/facetas?consulta=teste').get_json()
+
+        assert todas['contagem'] == 2
+        assert {item['valor'] for item in todas['facetas']['UF']} == {'SP', 'RJ'}
+        assert busca['contagem'] == 1
+        assert busca['facetas']['UF'] == [{'valor': 'SP', 'contagem': 1}]
+        assert busca['facetas']['Modalidade'] == [{'valor': 'Medicina de Grupo', 'contagem': 1}]
+
+    def test_parametro_facetas_na_pesquisa(self, client, mock_dataframe):
+        """Testa o parâmetro facetas nas buscas e a validação das colunas"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            sem = client.get('/api/pesquisa?consulta=operadora').get_json()
+            com = client.get('/api/pesquisa?consulta=operadora&facetas=UF,Cidade').get_json()
+            invalida = client.get('/api/pesquisa/avancada?campo=UF&consulta=SP&facetas=Nada')
+
+        assert 'facetas' not in sem
+        assert sorted(item['valor'] for item in com['facetas']['Cidade']) == ['Rio de Janeiro', 'São Paulo']
+        assert invalida.status_code == 400
+
+
+class TestExportacao:
+    """Testes para a exportação em streaming"""
+
+    def test_exporta_ndjson(self, client, mock_dataframe):
+        """Testa que cada linha do NDJSON é uma operadora encontrada"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            response = client.get('/api/pesquisa/exportar?consulta=operadora')
+            registros = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+
+        assert response.status_code == 200
+        assert response.headers['X-Total-Count'] == '2'
+        assert [r['Registro_ANS'] for r in registros] == ['123456', '789012']
+
+    def test_exporta_csv_por_campo_em_blocos(self, client, mock_dataframe, monkeypatch):
+        """Testa o CSV da busca avançada gerado em vários blocos"""
+        monkeypatch.setattr(modulo_app, 'TAMANHO_BLOCO_EXPORTACAO', 1)
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            response = client.get('/api/pesquisa/exportar?consulta=o&campo=Razao_Social&formato=csv')
+            linhas = response.get_data(as_text=True).splitlines()
+
+        assert linhas[0] == ';'.join(mock_dataframe.columns)
+        assert len(linhas) == 3
+
+    def test_exporta_gzip(self, client, mock_dataframe):
+        """Testa a compressão gzip em streaming"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            normal = client.get('/api/pesquisa/exportar?consulta=operadora').get_data()
+            comprimido = client.get('/api/pesquisa/exportar?consulta=operadora',
+                                    headers={'Accept-Encoding': 'gzip'})
+            corpo = comprimido.get_data()
+            recusado = client.get('/api/pesquisa/exportar?consulta=operadora',
+                                  headers={'Accept-Encoding': 'gzip;q=0, identity'})
+
+        assert comprimido.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(corpo) == normal
+        assert 'Content-Encoding' not in recusado.headers
+        assert recusado.get_data() == normal
+
+    def test_formato_invalido(self, client):
+        """Testa erro para formato desconhecido"""
+        response = client.get('/api/pesquisa/exportar?consulta=x&formato=xml')
+
+        assert response.status_code == 400
+
+
+class TestCursor:
+    """Testes para a paginação por cursor"""
+
+    @staticmethod
+    def criar_dataframe(registros):
+        """DataFrame com uma operadora por registro, todas casando com 'Operadora'"""
+        return pd.DataFrame({
+            'REGISTRO_OPERADORA': [str(r) for r in registros],
+            'Razao_Social': [f'Operadora {r}' for r in registros]
+        })
+
+    def percorrer(self, client, url):
+        """Segue os cursores até o fim e retorna os registros de cada página"""
+        paginas = []
+        cursor = ''
+        while cursor is not None:
+            data = client.get(f'{url}&cursor={cursor}').get_json()
+            paginas.append([r['REGISTRO_OPERADORA'] for r in data['resultados']])
+            cursor = data['paginacao']['proximo_cursor']
+        return paginas
+
+    def test_percorre_todas_as_paginas(self, client):
+        """Testa que os cursores entregam as mesmas linhas que pagina/por_pagina"""
+        df = self.criar_dataframe(range(100, 145))
+        with patch('app.carregar_csv', return_value=df):
+            paginas = self.percorrer(client, '/api/pesquisa?consulta=operadora&por_pagina=20')
+            terceira = client.get('/api/pesquisa?consulta=operadora&pagina=3').get_json()
+
+        assert [len(p) for p in paginas] == [20, 20, 5]
+        assert paginas[2] == [r['REGISTRO_OPERADORA'] for r in terceira['resultados']]
+
+    def test_retoma_apos_recarga(self, client):
+        """Testa que o cursor continua pela chave quando os dados mudam"""
+        antigo = self.criar_dataframe(range(100, 110))
+        novo = self.criar_dataframe([1, 2, 3] + list(range(100, 110)))
+        with patch('app.carregar_csv', return_value=antigo):
+            data = client.get('/api/pesquisa?consulta=operadora&por_pagina=4&cursor=').get_json()
+        with patch('app.carregar_csv', return_value=novo):
+            cursor = data['paginacao']['proximo_cursor']
+            seguinte = client.get(f'/api/pesquisa?consulta=operadora&por_pagina=4&cursor={cursor}')
+
+        assert [r['REGISTRO_OPERADORA'] for r in seguinte.get_json()['resultados']] == [
+            '104', '105', '106', '107'
+        ]
+
+    def test_cursor_de_outra_consulta_ou_expirado(self, client):
+        """Testa os erros de cursor malformado, de outra consulta e expirado"""
+        antigo = self.criar_dataframe(range(100, 110))
+        with patch('app.carregar_csv', return_value=antigo):
+            data = client.get('/api/pesquisa?consulta=operadora&por_pagina=4&cursor=').get_json()
+            cursor = data['paginacao']['proximo_cursor']
+            outra = client.get(f'/api/pesquisa/avancada?campo=Razao_Social&consulta=operadora&cursor={cursor}')
+            malformado = client.get('/api/pesquisa?consulta=operadora&cursor=xyz')
+        with patch('app.carregar_csv', return_value=self.criar_dataframe(range(200, 210))):
+            expirado = client.get(f'/api/pesquisa?consulta=operadora&cursor={cursor}')
+
+        assert outra.status_code == 400
+        assert malformado.status_code == 400
+        assert expirado.status_code == 410
+
+
+class TestFuzzy:
+    """Testes para a busca aproximada (modo=fuzzy)"""
+
+    @pytest.fixture
+    def df_fuzzy(self):
+        return pd.DataFrame({
+            'Razao_Social': [
+                'UNIMED BELO HORIZONTE COOPERATIVA DE TRABALHO MÉDICO',
+                'UNIMED CAMPINAS COOPERATIVA DE TRABALHO MÉDICO',
+                'ODONTOPREV S/A',
+                'SÃO FRANCISCO SAÚDE LTDA'
+            ],
+            'Cidade': ['Belo Horizonte', 'Campinas', 'Barueri', 'Ribeirão Preto']
+        })
+
+    def test_tolera_erro_de_digitacao(self, df_fuzzy):
+        """Testa que 'unimed belo orizonte' encontra a UNIMED BELO HORIZONTE primeiro"""
+        resultado = IndiceFuzzy(df_fuzzy).buscar('unimed belo orizonte')
+
+        assert resultado['linha'].tolist() == [0]
+        assert 0.5 <= resultado['pontuacao'][0] < 1
+
+    def test_ignora_acentos(self, df_fuzzy):
+        """Testa que acentos na consulta ou nos dados não importam"""
+        indice = IndiceFuzzy(df_fuzzy)
+
+        assert indice.buscar('sao francisco saude')['linha'][0] == 3
+        assert indice.buscar('RIBEIRÂO PRÊTO')['linha'][0] == 3
+
+    def test_sem_parecidos(self, df_fuzzy):
+        """Testa que consultas sem trigramas em comum não retornam nada"""
+        assert len(IndiceFuzzy(df_fuzzy).buscar('xyzwq')) == 0
+
+    def test_endpoint_fuzzy(self, client, df_fuzzy):
+        """Testa o modo fuzzy da /api/pesquisa e os erros de parâmetro"""
+        with patch('app.carregar_csv', return_value=df_fuzzy):
+            response = client.get('/api/pesquisa?consulta=odontoprevi&modo=fuzzy')
+            invalido = client.get('/api/pesquisa?consulta=odonto&modo=regex')
+            com_cursor = client.get('/api/pesquisa?consulta=odonto&modo=fuzzy&cursor=')
+
+        data = response.get_json()
+        assert data['resultados'][0]['Razao_Social'] == 'ODONTOPREV S/A'
+        assert len(data['pontuacoes']) == len(data['resultados'])
+        assert data['pontuacoes'] == sorted(data['pontuacoes'], reverse=True)
+        assert invalido.status_code == 400
+        assert com_cursor.status_code == 400
+
+    def test_cache_separado_de_coluna_fuzzy(self, client, mock_dataframe):
+        """Testa que uma coluna chamada fuzzy não recebe as linhas em cache da busca fuzzy"""
+        df = mock_dataframe.assign(fuzzy=['nada', 'operadora'])
+        with patch('app.carregar_csv', return_value=df):
+            fuzzy = client.get('/api/pesquisa?consulta=operadora&modo=fuzzy').get_json()
+            coluna = client.get('/api/pesquisa/avancada?campo=fuzzy&consulta=operadora').get_json()
+
+        assert fuzzy['contagem'] == 2
+        assert coluna['contagem'] == 1
+        assert coluna['resultados'][0]['Razao_Social'] == 'Outra Operadora'
+
+
+class TestRelevancia:
+    """Testes para a ordenação por relevância (ordenar=relevancia)"""
+
+    @pytest.fixture
+    def df_relevancia(self):
+        return pd.DataFrame({
+            'Razao_Social': [
+                'ASSOCIAÇÃO AMIGOS DA SAÚDE',
+                'CLÍNICA SAUDEMAX LTDA',
+                'SAÚDE TOTAL PLANOS LTDA',
+                'PREVSAUDE LTDA',
+                'SAÚDE',
+                'ODONTO SUL LTDA'
+            ],
+            'Nome_Fantasia': ['AMIGOS', None, 'SAÚDE TOTAL', None, None, None],
+            'Logradouro': ['RUA A', 'RUA B', 'RUA C', 'RUA D', 'RUA E', 'RUA SAÚDE'],
+            'Cidade': ['Saudades', 'Recife', 'Natal', 'Belém', 'Santos', 'Curitiba']
+        })
+
+    def test_igual_prefixo_palavra_substring(self, df_relevancia):
+        """Testa a ordem igual > prefixo > início de palavra > substring, acima do Logradouro"""
+        indice = IndiceNgramas(df_relevancia)
+        relevancia = IndiceRelevancia(indice)
+        linhas = indice.buscar('saude')
+
+        posicoes, pontuacoes = relevancia.pagina(relevancia.chaves(linhas, 'saude'), 0, 10)
+
+        # Empate em início de palavra: a razão social mais curta vem antes
+        assert posicoes.tolist() == [4, 2, 1, 0, 3, 5]
+        assert pontuacoes.tolist() == [12, 9, 6, 6, 3, 2]
+
+    def test_pagina_igual_a_ordenacao_completa(self, df_relevancia):
+        """Testa que a seleção parcial de cada página coincide com a ordenação completa"""
+        indice = IndiceNgramas(df_relevancia)
+        relevancia = IndiceRelevancia(indice)
+        linhas = indice.buscar('a')
+        chaves = relevancia.chaves(linhas, 'a')
+        ordem = (np.sort(chaves) & 0xFFFFFFFF).tolist()
+
+        paginas = [relevancia.pagina(chaves, inicio, 4)[0].tolist() for inicio in (0, 4, 8)]
+
+        assert sum(paginas, []) == ordem
+        assert relevancia.pagina(chaves, len(chaves), 4)[0].tolist() == []
+
+    def test_campo_especifico(self, df_relevancia):
+        """Testa que a busca por campo pontua só a coluna pedida"""
+        indice = IndiceNgramas(df_relevancia)
+        relevancia = IndiceRelevancia(indice)
+        linhas = indice.buscar('sa', coluna='Cidade')
+
+        posicoes, pontuacoes = relevancia.pagina(relevancia.chaves(linhas, 'sa', 'Cidade'), 0, 10)
+
+        assert posicoes.tolist() == [4, 0]
+        assert pontuacoes.tolist() == [3, 3]
+
+    def test_endpoint_relevancia(self, client, df_relevancia):
+        """Testa ordenar=relevancia nas duas buscas e os erros de parâmetro"""
+        with patch('app.carregar_csv', return_value=df_relevancia):
+            simples = client.get('/api/pesquisa?consulta=saude&ordenar=relevancia&por_pagina=2')
+            segunda = client.get('/api/pesquisa?consulta=saude&ordenar=relevancia'
+                                 '&por_pagina=2&pagina=2')
+            avancada = client.get('/api/pesquisa/avancada?campo=Razao_Social&consulta=saude'
+                                  '&ordenar=relevancia&filtro=Cidade:contem:s')
+            invalido = client.get('/api/pesquisa?consulta=saude&ordenar=nome')
+            com_cursor = client.get('/api/pesquisa?consulta=saude&ordenar=relevancia&cursor=')
+            sem_consulta = client.get('/api/pesquisa/avancada?filtro=Cidade:contem:s'
+                                      '&ordenar=relevancia')
+
+        data = simples.get_json()
+        assert data['contagem'] == 6
+        assert data['paginacao']['total_paginas'] == 3
+        assert [r['Razao_Social'] for r in data['resultados']] == ['SAÚDE', 'SAÚDE TOTAL PLANOS LTDA']
+        assert data['pontuacoes'] == [12, 9]
+        assert [r['Razao_Social'] for r in segunda.get_json()['resultados']] == [
+            'CLÍNICA SAUDEMAX LTDA', 'ASSOCIAÇÃO AMIGOS DA SAÚDE'
+        ]
+        assert [r['Razao_Social'] for r in avancada.get_json()['resultados']] == [
+            'SAÚDE', 'ASSOCIAÇÃO AMIGOS DA SAÚDE'
+        ]
+        assert invalido.status_code == 400
+        assert com_cursor.status_code == 400
+        assert sem_consulta.status_code == 400
+
+    def test_relevancia_com_e_sem_filtro(self, client, df_relevancia):
+        """Testa que as chaves em cache da busca sem filtro não servem à busca filtrada"""
+        url = '/api/pesquisa/avancada?campo=Razao_Social&consulta=saude&ordenar=relevancia'
+        with patch('app.carregar_csv', return_value=df_relevancia):
+            sem_filtro = client.get(url).get_json()
+            com_filtro = client.get(url + '&filtro=Cidade:contem:s').get_json()
+            de_novo = client.get(url).get_json()
+
+        assert sem_filtro['contagem'] == 5
+        assert [r['Cidade'] for r in com_filtro['resultados']] == ['Santos', 'Saudades']
+        assert com_filtro['pontuacoes'] == [12, 6]
+        assert de_novo == sem_filtro
+
+    def test_por_pagina_invalido(self, client, df_relevancia):
+        """Testa que por_pagina < 1 vira 1 com e sem ordenação por relevância"""
+        url = '/api/pesquisa?consulta=saude&por_pagina=-3'
+        with patch('app.carregar_csv', return_value=df_relevancia):
+            arquivo = client.get(url).get_json()
+            relevancia = client.get(url + '&ordenar=relevancia').get_json()
+
+        assert arquivo['paginacao']['por_pagina'] == relevancia['paginacao']['por_pagina'] == 1
+        assert len(arquivo['resultados']) == len(relevancia['resultados']) == 1
+
+
+class TestAutocompletar:
+    """Testes para as sugestões por prefixo"""
+
+    @pytest.fixture
+    def df_nomes(self):
+        return pd.DataFrame({
+            'Razao_Social': ['UNIMED BELO HORIZONTE', 'UNIMED BAURU', 'SÃO FRANCISCO SAÚDE', 'AMIL'],
+            'Nome_Fantasia': ['UNIMED BH', None, 'SÃO FRANCISCO', 'AMIL'],
+            'Cidade': ['Belo Horizonte', 'Bauru', 'Ribeirão Preto', 'Unaí']
+        })
+
+    def test_prefixo_ignora_acentos_e_caixa(self, df_nomes):
+        """Testa que 'sao f' sugere os nomes com 'SÃO F' em ordem alfabética"""
+        indice = IndiceAutocompletar(df_nomes)
+
+        assert indice.sugerir('sao f') == ['SÃO FRANCISCO', 'SÃO FRANCISCO SAÚDE']
+        assert indice.sugerir('unimed', limite=2) == ['UNIMED BAURU', 'UNIMED BELO HORIZONTE']
+
+    def test_inicio_de_palavra_depois_do_nome(self, df_nomes):
+        """Testa que nomes que começam com o prefixo vêm antes dos que só têm a palavra"""
+        assert IndiceAutocompletar(df_nomes).sugerir('b') == ['UNIMED BAURU', 'UNIMED BELO HORIZONTE', 'UNIMED BH']
+        assert IndiceAutocompletar(df_nomes).sugerir('ba') == ['UNIMED BAURU']
+
+    def test_endpoint_autocompletar(self, client, df_nomes):
+        """Testa o endpoint e a validação do prefixo"""
+        with patch('app.carregar_csv', return_value=df_nomes):
+            response = client.get('/api/autocompletar?prefixo=ami')
+            vazio = client.get('/api/autocompletar?prefixo=')
+
+        assert response.get_json()['sugestoes'] == ['AMIL']
+        assert vazio.status_code == 400
+
+
+class TestPesquisaLote:
+    """Testes para POST /api/pesquisa/lote"""
+
+    def test_lote_equivale_buscas_individuais(self, client, mock_dataframe):
+        """Testa contagens e primeiras páginas por item, na ordem enviada"""
+        itens = [
+            {'campo': 'CNPJ', 'consulta': '12345678000199'},
+            {'consulta': 'operadora'},
+            {'campo': 'UF', 'consulta': 'rj'},
+            {'consulta': 'OPERADORA'}
+        ]
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            response = client.post('/api/pesquisa/lote', json={'itens': itens, 'por_pagina': 1})
+            individual = client.get('/api/pesquisa?consulta=operadora&por_pagina=1').get_json()
+
+        assert response.status_code == 200
+        data = response.get_json()['itens']
+        assert [item['contagem'] for item in data] == [1, 2, 1, 2]
+        assert data[0]['resultados'][0]['Razao_Social'] == 'Operadora Teste'
+        assert data[1]['resultados'] == individual['resultados']
+        assert data[2]['resultados'][0]['UF'] == 'RJ'
+
+    def test_itens_invalidos_nao_derrubam_o_lote(self, client, mock_dataframe):
+        """Testa que itens inválidos trazem erro e os demais são respondidos"""
+        itens = [{'campo': 'Inexistente', 'consulta': 'x'}, {'campo': 'UF'}, {'consulta': 'sp'},
+                 {'campo': ['UF'], 'consulta': 'sp'}, {'campo': {'UF': 1}, 'consulta': 'sp'},
+                 {'consulta': '   '}]
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            data = client.post('/api/pesquisa/lote', json={'itens': itens}).get_json()['itens']
+
+        assert 'erro' in data[0] and 'erro' in data[1]
+        assert data[2]['contagem'] == 1
+        assert 'erro' in data[3] and 'erro' in data[4] and 'erro' in data[5]
+
+    def test_corpo_invalido_e_limite(self, client, monkeypatch):
+        """Testa o corpo sem itens e o limite de itens por lote"""
+        monkeypatch.setattr(modulo_app, 'MAX_ITENS_LOTE', 2)
+
+        sem_itens = client.post('/api/pesquisa/lote', json={'consulta': 'x'})
+        grande = client.post('/api/pesquisa/lote', json={'itens': [{'consulta': 'x'}] * 3})
+
+        assert sem_itens.status_code == 400
+        assert grande.status_code == 413
+
+
+class TestOperadoras:
+    """Testes para a busca direta por registro ANS e CNPJ"""
+
+    @pytest.fixture
+    def df_operadoras(self):
+        return pd.DataFrame({
+            'REGISTRO_OPERADORA': ['419761', '421545'],
+            'CNPJ': ['19541931000125', '2869997000153'],
+            'Razao_Social': ['18 DE JULHO ADMINISTRADORA', '2B ODONTOLOGIA']
+        })
+
+    def test_por_registro(self, client, df_operadoras):
+        """Testa a busca pelo registro e o 404 de registro inexistente"""
+        with patch('app.carregar_csv', return_value=df_operadoras):
+            response = client.get('/api/operadoras/421545')
+            ausente = client.get('/api/operadoras/000000')
+
+        assert response.get_json()['Razao_Social'] == '2B ODONTOLOGIA'
+        assert ausente.status_code == 404
+
+    def test_por_cnpj_formatado(self, client, df_operadoras):
+        """Testa CNPJ com pontuação e com o zero à esquerda que o CSV perdeu"""
+        with patch('app.carregar_csv', return_value=df_operadoras):
+            formatado = client.get('/api/operadoras/cnpj/19.541.931/0001-25')
+            com_zero = client.get('/api/operadoras/cnpj/02869997000153')
+            invalido = client.get('/api/operadoras/cnpj/abc')
+
+        assert formatado.get_json()['REGISTRO_OPERADORA'] == '419761'
+        assert com_zero.get_json()['REGISTRO_OPERADORA'] == '421545'
+        assert invalido.status_code == 400
+
+
+class TestFiltros:
+    """Testes para a busca avançada com vários filtros"""
+
+    def test_equivale_mascaras(self, dataframe_real):
+        """Testa que o plano retorna o mesmo que combinar as máscaras do pandas"""
+        indice = IndiceNgramas(dataframe_real)
+        filtros = [
+            Filtro('UF', 'igual', 'sp'),
+            Filtro('Modalidade', 'contem', 'cooperativa'),
+            Filtro('Razao_Social', 'prefixo', 'unimed'),
+        ]
+        mascara = (
+            (dataframe_real['UF'].astype(str).str.upper() == 'SP')
+            & dataframe_real['Modalidade'].astype(str).str.contains('cooperativa', case=False, regex=False)
+            & dataframe_real['Razao_Social'].astype(str).str.upper().str.startswith('UNIMED')
+        )
+
+        esperado = np.flatnonzero(mascara.to_numpy())
+        assert len(esperado) > 0
+        assert np.array_equal(buscar_filtros(indice, filtros), esperado)
+        assert len(buscar_filtros(indice, filtros + [Filtro('UF', 'igual', 'RJ')])) == 0
+
+        # Sem as listas de n-gramas, o contem vai para o backend de busca
+        sem_listas = IndiceNgramas(dataframe_real, listas=False)
+        sqlite = BuscaSqlite.abrir(dataframe_real)
+        assert np.array_equal(buscar_filtros(sem_listas, filtros, sqlite), esperado)
+
+    def test_consulta_so_de_espacos(self, client, mock_dataframe):
+        """Testa que consultas e filtros só de espaços são rejeitados, não casam tudo"""
+        urls = ['/api/pesquisa?consulta=%20',
+                '/api/pesquisa/avancada?campo=UF&consulta=%20%20',
+                '/api/pesquisa/avancada?filtro=UF:contem:%20',
+                '/api/pesquisa/avancada?filtro=UF:igual:%20',
+                '/api/pesquisa/exportar?consulta=%20']
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            respostas = [client.get(url) for url in urls]
+
+        assert [r.status_code for r in respostas] == [400] * len(urls)
+
+    def test_endpoint_com_filtros(self, client, mock_dataframe):
+        """Testa filtros repetidos combinados com campo/consulta"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            response = client.get('/api/pesquisa/avancada?filtro=UF:igual:sp'
+                                  '&campo=Razao_Social&consulta=operadora')
+            nenhum = client.get('/api/pesquisa/avancada?filtro=UF:igual:sp&filtro=Cidade:prefixo:rio')
+
+        data = response.get_json()
+        assert data['contagem'] == 1
+        assert data['resultados'][0]['Razao_Social'] == 'Operadora Teste'
+        assert nenhum.get_json()['contagem'] == 0
+
+    def test_filtros_e_busca_sem_acentos(self, client, mock_dataframe):
+        """Testa que filtros e busca ignoram acentos e caixa"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            filtro = client.get('/api/pesquisa/avancada?filtro=Cidade:igual:SAO%20PAULO').get_json()
+            busca = client.get('/api/pesquisa?consulta=sao%20paulo').get_json()
+
+        assert filtro['contagem'] == 1
+        assert busca['contagem'] == 1
+        assert busca['resultados'][0]['Cidade'] == 'São Paulo'
+
+    def test_filtro_invalido(self, client, mock_dataframe):
+        """Testa formato, campo e operador inválidos"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            for filtro in ['UF', 'Inexistente:igual:SP', 'UF:parecido:SP', 'UF:igual:']:
+                response = client.get(f'/api/pesquisa/avancada?filtro={filtro}')
+                assert response.status_code == 400, filtro
+
+
+class TestSerializacao:
+    """Testes para os fragmentos JSON pré-serializados"""
+
+    def test_codificar_insere_fragmentos(self):
+        """Testa que Fragmentos entram como estão e o resto é serializado"""
+        corpo = codificar({'contagem': 2, 'resultados': [Fragmento(b'{"a":1}'), Fragmento('{"a":"ç"}'.encode('utf-8'))]})
+
+        assert json.loads(corpo) == {'contagem': 2, 'resultados': [{'a': 1}, {'a': 'ç'}]}
+
+    def test_fragmentos_equivalem_to_dict(self, dataframe_real):
+        """Testa que os fragmentos têm os mesmos valores de to_dict e são reaproveitados"""
+        linhas = LinhasJson(dataframe_real)
+        posicoes = [5, 0, 5, 42]
+
+        primeira = linhas.fragmentos(posicoes)
+        segunda = linhas.fragmentos(posicoes)
+
+        assert [json.loads(f) for f in primeira] == dataframe_real.iloc[posicoes].to_dict(orient='records')
+        assert all(a is b for a, b in zip(primeira, segunda))
+        assert linhas.geradas() == 3
+
+
+class TestCacheHttp:
+    """Testes para ETag, compressão e estáticos pré-comprimidos"""
+
+    def test_etag_e_304(self, client, mock_dataframe):
+        """Testa que o If-None-Match com o ETag atual recebe 304 sem refazer a busca"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            primeira = client.get('/api/pesquisa?consulta=operadora')
+            etag = primeira.headers['ETag']
+            with patch('app.buscar_linhas') as busca:
+                repetida = client.get('/api/pesquisa?consulta=operadora',
+                                      headers={'If-None-Match': etag})
+            outra = client.get('/api/pesquisa?consulta=teste', headers={'If-None-Match': etag})
+
+        assert primeira.headers['Cache-Control'] == modulo_app.CACHE_CONTROL_API
+        assert repetida.status_code == 304
+        assert repetida.headers['ETag'] == etag
+        busca.assert_not_called()
+        assert outra.status_code == 200
+
+    def test_etag_muda_com_os_dados(self, client, mock_dataframe):
+        """Testa que a mesma URL tem outro ETag depois de trocar os dados"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            etag = client.get('/api/campos').headers['ETag']
+        with patch('app.carregar_csv', return_value=mock_dataframe.copy()):
+            response = client.get('/api/campos', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_etag_da_versao_usada_pela_resposta(self, client, mock_dataframe):
+        """Testa que uma troca dos dados no meio da requisição não muda o ETag da resposta"""
+        recarregado = mock_dataframe.copy()
+        with patch('app.carregar_csv', side_effect=[mock_dataframe, recarregado, recarregado]):
+            response = client.get('/api/pesquisa?consulta=teste')
+            versao = modulo_app.obter_dados(mock_dataframe).versao
+
+        with app.test_request_context('/api/pesquisa?consulta=teste'):
+            esperado = modulo_app.etag_da_requisicao(versao)
+        assert response.headers['ETag'] == f'W/"{esperado}"'
+
+    def test_comprime_json_acima_do_minimo(self, client, mock_dataframe, monkeypatch):
+        """Testa gzip acima do tamanho mínimo e corpo intacto abaixo dele"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            monkeypatch.setattr(modulo_app, 'COMPRESSAO_MINIMA', 10)
+            comprimida = client.get('/api/pesquisa?consulta=operadora',
+                                    headers={'Accept-Encoding': 'gzip'})
+            monkeypatch.setattr(modulo_app, 'COMPRESSAO_MINIMA', 10 ** 6)
+            pequena = client.get('/api/pesquisa?consulta=operadora',
+                                 headers={'Accept-Encoding': 'gzip'})
+
+        assert comprimida.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(comprimida.data))['contagem'] == 2
+        assert 'Content-Encoding' not in pequena.headers
+        assert pequena.get_json()['contagem'] == 2
+
+    def test_estaticos_pre_comprimidos(self, client, tmp_path, monkeypatch):
+        """Testa que o .gz gravado por estaticos.py é servido com cache imutável"""
+        (tmp_path / 'js').mkdir()
+        conteudo = b'console.log("ok");' * 100
+        (tmp_path / 'js' / 'app.123.js').write_bytes(conteudo)
+        monkeypatch.setattr(modulo_app.app, 'static_folder', str(tmp_path))
+
+        assert comprimir_estaticos(str(tmp_path)) == 1
+        comprimida = client.get('/js/app.123.js', headers={'Accept-Encoding': 'gzip'})
+        simples = client.get('/js/app.123.js')
+
+        assert comprimida.headers['Content-Encoding'] == 'gzip'
+        assert comprimida.mimetype in ('application/javascript', 'text/javascript')
+        assert gzip.decompress(comprimida.data) == conteudo
+        assert 'immutable' in comprimida.headers['Cache-Control']
+        assert simples.data == conteudo
+        comprimida.close()
+        simples.close()
+
+
+class TestAsgi:
+    """Testes para o modo assíncrono (asgi.py)"""
+
+    def test_mesmo_contrato_da_api(self, client, mock_dataframe):
+        """Testa que as rotas da API respondem igual ao app Flask, inclusive o 304"""
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            esperado = client.get('/api/pesquisa?consulta=operadora&facetas=UF')
+            with TestClient(asgi.app) as cliente_asgi:
+                response = cliente_asgi.get('/api/pesquisa?consulta=operadora&facetas=UF')
+                repetida = cliente_asgi.get('/api/pesquisa?consulta=operadora&facetas=UF',
+                                            headers={'If-None-Match': response.headers['ETag']})
+                lote = cliente_asgi.post('/api/pesquisa/lote', json={'itens': [{'consulta': 'teste'}]})
+
+        assert response.status_code == 200
+        assert response.json() == esperado.get_json()
+        assert response.headers['ETag'] == esperado.headers['ETag']
+        assert repetida.status_code == 304
+        assert lote.json()['itens'][0]['contagem'] == 1
+
+    def test_exportacao_em_streaming(self, client, mock_dataframe, monkeypatch):
+        """Testa que a exportação transmitida pelo laço de eventos tem o mesmo conteúdo"""
+        monkeypatch.setattr(modulo_app, 'TAMANHO_BLOCO_EXPORTACAO', 1)
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            esperado = client.get('/api/pesquisa/exportar?consulta=o&formato=csv').get_data()
+            with TestClient(asgi.app) as cliente_asgi:
+                response = cliente_asgi.get('/api/pesquisa/exportar?consulta=o&formato=csv',
+                                            headers={'Accept-Encoding': 'identity'})
+                invalida = cliente_asgi.get('/api/pesquisa/exportar?consulta=x&formato=xml')
+
+        assert response.content == esperado
+        assert response.headers['X-Total-Count'] == '2'
+        assert invalida.status_code == 400
+        assert 'erro' in invalida.json()
+
+    def test_estaticos_pre_comprimidos(self, tmp_path, monkeypatch):
+        """Testa que o .gz é servido pelo laço de eventos com cache imutável"""
+        (tmp_path / 'css').mkdir()
+        conteudo = b'body { margin: 0; }' * 100
+        (tmp_path / 'css' / 'app.123.css').write_bytes(conteudo)
+        monkeypatch.setattr(modulo_app.app, 'static_folder', str(tmp_path))
+        comprimir_estaticos(str(tmp_path))
+
+        cliente_asgi = TestClient(asgi.app)
+        response = cliente_asgi.get('/css/app.123.css', headers={'Accept-Encoding': 'gzip'})
+        inexistente = cliente_asgi.get('/css/../../segredo.css')
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.content == conteudo
+        assert 'immutable' in response.headers['Cache-Control']
+        assert inexistente.status_code == 404
+
+
+class TestMetricas:
+    """Testes para /metrics e a configuração de logging"""
+
+    @staticmethod
+    def amostra(nome, **labels):
+        """Valor atual de uma série do registro padrão (0 se ainda não existe)"""
+        return REGISTRY.get_sample_value(nome, labels) or 0
+
+    def test_latencia_por_rota_e_fases(self, client, mock_dataframe):
+        """Testa o histograma por rota (inclusive o 304) e os tempos das fases"""
+        rota = {'rota': 'pesquisar', 'metodo': 'GET', 'status': '200'}
+        antes = self.amostra('api_requisicao_segundos_count', **rota)
+        antes_304 = self.amostra('api_requisicao_segundos_count', **dict(rota, status='304'))
+        antes_fases = {fase: self.amostra('api_fase_segundos_count', fase=fase)
+                       for fase in ('busca', 'materializacao', 'serializacao')}
+
+        with patch('app.carregar_csv', return_value=mock_dataframe):
+            etag = client.get('/api/pesquisa?consulta=operadora').headers['ETag']
+            client.get('/api/pesquisa?consulta=operadora', headers={'If-None-Match': etag})
+            response = client.get('/metrics')
+
+        assert self.amostra('api_requisicao_segundos_count', **rota) == antes + 1
+        assert self.amostra('api_requisicao_segundos_count', **dict(rota, status='304')) == antes_304 + 1
+        for fase, valor in antes_fases.items():
+            assert self.amostra('api_fase_segundos_count', fase=fase) == valor + 1
+        assert response.status_code == 200
+        assert b'api_resultados_bucket' in response.data
+
+    def test_cache_de_consultas(self, client, mock_dataframe):
+        """Testa que acertos e falhas do cache são contados"""
+        antes_falhas = self.amostra('api_cache_consultas_total', resultado='falha')
+        antes_acertos = self.amostra('api_cache_consultas_total', resultado='acerto')
+
+        with patch('app.carregar_csv', return_value=mock_dataframe.copy()):
+            client.get('/api/pesquisa?consulta=teste')
+            client.get('/api/pesquisa?consulta=TESTE&pagina=2')
+
+        assert self.amostra('api_cache_consultas_total', resultado='falha') == antes_falhas + 1
+        assert self.amostra('api_cache_consultas_total', resultado='acerto') == antes_acertos + 1
+
+    def test_amostragem_mantem_avisos(self):
+        """Testa que a amostragem descarta DEBUG/INFO mas nunca WARNING"""
+        filtro = FiltroAmostragem(0)
+        registro = logging.LogRecord('app', logging.DEBUG, __file__, 1, 'x %s', ('y',), None)
+        aviso = logging.LogRecord('app', logging.WARNING, __file__, 1, 'x', None, None)
+
+        assert not filtro.filter(registro)
+        assert filtro.filter(aviso)
+
+    def test_fila_cheia_descarta_sem_bloquear(self):
+        """Testa que o handler assíncrono não formata e descarta com a fila cheia"""
+        fila = queue.Queue(1)
+        handler = _HandlerFila(fila)
+        registro = logging.LogRecord('app', logging.DEBUG, __file__, 1, 'x %s', ('y',), None)
+        descartados = _HandlerFila.descartados
+
+        handler.handle(registro)
+        handler.handle(registro)
+
+        assert fila.get_nowait().args == ('y',)
+        assert _HandlerFila.descartados == descartados + 1
+
+
 class TestCampos:
     """Testes para o endpoint /api/campos"""
 